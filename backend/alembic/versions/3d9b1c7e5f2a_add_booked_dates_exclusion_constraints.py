@@ -0,0 +1,71 @@
+"""Add booked dates ranges and exclusion constraints
+
+Revision ID: 3d9b1c7e5f2a
+Revises: f449b0ab441f
+Create Date: 2026-10-18 11:12:40.318305
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '3d9b1c7e5f2a'
+down_revision = 'f449b0ab441f'
+branch_labels = None
+depends_on = None
+
+BOOKED_DATES_EXPRESSION = (
+    "daterange((start_date AT TIME ZONE 'UTC')::date, "
+    "(end_date AT TIME ZONE 'UTC')::date, '[]')"
+)
+
+
+def overlapping_bookings(connection, table, status):
+    """
+    Pairs of ids of bookings of the same car with overlapping dates, which would
+    violate the exclusion constraint
+    """
+    return connection.execute(sa.text(
+        'SELECT a.id, b.id FROM {table} a JOIN {table} b '
+        'ON a.car_id = b.car_id AND a.id < b.id AND a.booked_dates && b.booked_dates '
+        "WHERE a.status = '{status}' AND b.status = '{status}' "
+        'ORDER BY a.id, b.id'.format(table=table, status=status))).fetchall()
+
+
+def upgrade():
+    # btree_gist is needed for equality on car_id inside of a GiST index
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+
+    op.add_column('reservation',
+                  sa.Column('booked_dates', postgresql.DATERANGE(),
+                            sa.Computed(BOOKED_DATES_EXPRESSION, persisted=True)))
+    op.add_column('rental',
+                  sa.Column('booked_dates', postgresql.DATERANGE(),
+                            sa.Computed(BOOKED_DATES_EXPRESSION, persisted=True)))
+
+    # bookings of a car overlapping before the constraints are left to be resolved
+    # by hand (cancelled or rescheduled), as a migration can't pick which one stays
+    connection = op.get_bind()
+    overlaps = []
+    for table, status in (('reservation', 'NEW'), ('rental', 'IN_PROGRESS')):
+        overlaps.extend('{} {} and {}'.format(table, a, b)
+                        for a, b in overlapping_bookings(connection, table, status))
+    if overlaps:
+        raise RuntimeError(
+            'bookings of the same car overlap, resolve them before upgrading: {}'
+            .format('; '.join(overlaps)))
+
+    op.create_exclude_constraint('reservation_car_id_booked_dates_excl', 'reservation',
+                                 ('car_id', '='), ('booked_dates', '&&'),
+                                 using='gist', where="status = 'NEW'")
+    op.create_exclude_constraint('rental_car_id_booked_dates_excl', 'rental',
+                                 ('car_id', '='), ('booked_dates', '&&'),
+                                 using='gist', where="status = 'IN_PROGRESS'")
+
+
+def downgrade():
+    op.drop_constraint('rental_car_id_booked_dates_excl', 'rental')
+    op.drop_constraint('reservation_car_id_booked_dates_excl', 'reservation')
+    op.drop_column('rental', 'booked_dates')
+    op.drop_column('reservation', 'booked_dates')
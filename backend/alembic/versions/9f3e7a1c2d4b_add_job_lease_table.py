@@ -0,0 +1,27 @@
+"""Add job lease table
+
+Revision ID: 9f3e7a1c2d4b
+Revises: e1c4a8d2b9f6
+Create Date: 2026-10-18 16:21:47.902114
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9f3e7a1c2d4b'
+down_revision = 'e1c4a8d2b9f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_lease',
+                    sa.Column('name', sa.String(), nullable=False),
+                    sa.Column('next_run_at', sa.DateTime(timezone=True), nullable=False),
+                    sa.Column('holder', sa.String(), nullable=True),
+                    sa.PrimaryKeyConstraint('name'))
+
+
+def downgrade():
+    op.drop_table('job_lease')
@@ -0,0 +1,53 @@
+"""Add composite and partial indexes for booking queries
+
+Revision ID: b5e2f0a4c871
+Revises: 3d9b1c7e5f2a
+Create Date: 2026-10-18 11:41:07.512936
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'b5e2f0a4c871'
+down_revision = '3d9b1c7e5f2a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside of a transaction,
+    # tables stay writable while indexes are built
+    with op.get_context().autocommit_block():
+        op.create_index('ix_reservation_car_id_status_start_date', 'reservation',
+                        ['car_id', 'status', 'start_date'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_reservation_new_start_date', 'reservation',
+                        ['start_date'], unique=False,
+                        postgresql_where=sa.text("status = 'NEW'"),
+                        postgresql_concurrently=True)
+        op.create_index('ix_rental_car_id_status_start_date', 'rental',
+                        ['car_id', 'status', 'start_date'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_rental_in_progress_end_date', 'rental',
+                        ['end_date'], unique=False,
+                        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+                        postgresql_concurrently=True)
+        op.create_index('ix_rental_reservation_id', 'rental',
+                        ['reservation_id'], unique=False,
+                        postgresql_where=sa.text('reservation_id IS NOT NULL'),
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_rental_reservation_id', table_name='rental',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_rental_in_progress_end_date', table_name='rental',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_rental_car_id_status_start_date', table_name='rental',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_reservation_new_start_date', table_name='reservation',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_reservation_car_id_status_start_date', table_name='reservation',
+                      postgresql_concurrently=True)
@@ -0,0 +1,109 @@
+"""Move car images to content-addressed car_image table
+
+Revision ID: e1c4a8d2b9f6
+Revises: b5e2f0a4c871
+Create Date: 2026-10-18 14:02:11.527409
+
+"""
+import base64
+import binascii
+import hashlib
+import re
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e1c4a8d2b9f6'
+down_revision = 'b5e2f0a4c871'
+branch_labels = None
+depends_on = None
+
+# cars (and their images) read at once
+BATCH_SIZE = 100
+
+DATA_URL_PATTERN = re.compile(r"^data:([\w.+-]+/[\w.+-]+);base64,(.*)$", re.DOTALL)
+
+car = sa.table('car',
+               sa.column('id', sa.Integer),
+               sa.column('image_base64', sa.String),
+               sa.column('image_hash', sa.String))
+car_image = sa.table('car_image',
+                     sa.column('hash', sa.String),
+                     sa.column('content_type', sa.String),
+                     sa.column('data', sa.LargeBinary))
+
+
+def upgrade():
+    op.create_table('car_image',
+                    sa.Column('hash', sa.String(length=64), nullable=False),
+                    sa.Column('content_type', sa.String(), nullable=False),
+                    sa.Column('data', sa.LargeBinary(), nullable=False),
+                    sa.PrimaryKeyConstraint('hash'))
+    op.add_column('car', sa.Column('image_hash', sa.String(length=64), nullable=True))
+    op.create_foreign_key('car_image_hash_fkey', 'car', 'car_image', ['image_hash'], ['hash'])
+
+    connection = op.get_bind()
+    image_hashes = set()
+    invalid_car_ids = []
+    last_id = 0
+    while True:
+        # images are read in batches of cars, not all at once
+        rows = connection.execute(
+            sa.select([car.c.id, car.c.image_base64])
+            .where(car.c.image_base64.isnot(None), car.c.id > last_id)
+            .order_by(car.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        for car_id, image_base64 in rows:
+            match = DATA_URL_PATTERN.match(image_base64)
+            try:
+                data = base64.b64decode(match.group(2), validate=True) if match else None
+            except binascii.Error:
+                data = None
+            if data is None:
+                invalid_car_ids.append(car_id)
+                continue
+            image_hash = hashlib.sha256(data).hexdigest()
+            if image_hash not in image_hashes:
+                image_hashes.add(image_hash)
+                connection.execute(car_image.insert().values(
+                    hash=image_hash, content_type=match.group(1), data=data))
+            connection.execute(car.update().where(car.c.id == car_id).values(image_hash=image_hash))
+
+    # image_base64 is dropped below, images which can't be moved would be lost
+    if invalid_car_ids:
+        raise RuntimeError(
+            'image_base64 of cars {} is not a base64 encoded data URL, fix or clear '
+            'it before upgrading'.format(', '.join(map(str, invalid_car_ids))))
+
+    op.drop_column('car', 'image_base64')
+
+
+def downgrade():
+    op.add_column('car', sa.Column('image_base64', sa.String(), nullable=True))
+
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select([car.c.id, car_image.c.content_type, car_image.c.data])
+            .select_from(car.join(car_image, car.c.image_hash == car_image.c.hash))
+            .where(car.c.id > last_id)
+            .order_by(car.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        for car_id, content_type, data in rows:
+            connection.execute(car.update().where(car.c.id == car_id)
+                               .values(image_base64='data:{};base64,{}'.format(
+                                   content_type, base64.b64encode(data).decode())))
+
+    op.drop_constraint('car_image_hash_fkey', 'car', type_='foreignkey')
+    op.drop_column('car', 'image_hash')
+    op.drop_table('car_image')
@@ -1,6 +1,14 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import cars, customers, login, rentals, reservations, users
+from app.api.api_v1.endpoints import (
+    cars,
+    customers,
+    login,
+    rentals,
+    reservations,
+    users,
+    utils,
+)
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
@@ -11,3 +19,4 @@ api_router.include_router(
     reservations.router, prefix="/reservations", tags=["reservations"]
 )
 api_router.include_router(rentals.router, prefix="/rentals", tags=["rentals"])
+api_router.include_router(utils.router, prefix="/utils", tags=["utils"])
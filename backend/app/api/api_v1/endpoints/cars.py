@@ -1,40 +1,69 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import models, schemas, services
 from app.api import deps
-from app.exceptions.instance_not_found import CarNotFoundException
+from app.api.bulk_import import import_rows, read_body
+from app.api.routing import UnitOfWorkRoute
+from app.core.image_variants import (
+    VARIANT_CONTENT_TYPE,
+    ImageVariant,
+    get_variant,
+    schedule_variants,
+)
+from app.exceptions.instance_not_found import (
+    CarImageNotFoundException,
+    CarNotFoundException,
+)
 from app.exceptions.not_enough_permissions import NotEnoughPermissionsException
 from app.schemas.cars_search_query import CarsSearchQuery
+from app.utils.data_url import IMAGE_CONTENT_TYPES
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
+# image URL versioned with its hash (?v=<image_hash>) never changes its content
+VERSIONED_IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+IMAGE_CACHE_CONTROL = "no-cache"
 
-@router.get("/", response_model=List[schemas.Car])
-def get_cars(
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user),
+
+@router.get("/", response_model=schemas.Page[schemas.Car])
+async def get_cars(
+    db: deps.HotSession = Depends(deps.get_hot_read_db),
+    page_params: schemas.PageParams = Depends(deps.get_page_params),
+    current_user: models.User = Depends(deps.get_current_user_hot),
 ) -> Any:
     """
     Retrieve cars.
     """
-    cars = services.car.get_all(db)
+    cars, next_cursor = await deps.run_on_session(
+        db,
+        services.car.get_page,
+        services.car.get_page_async,
+        limit=page_params.limit,
+        after=page_params.after,
+    )
 
-    return cars
+    return {"items": cars, "next_cursor": next_cursor}
 
 
 @router.post("/query", response_model=List[schemas.Car])
-def get_cars_with_query(
+async def get_cars_with_query(
     cars_search_query: CarsSearchQuery,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user),
+    db: deps.HotSession = Depends(deps.get_hot_read_db),
+    current_user: models.User = Depends(deps.get_current_user_hot),
 ) -> Any:
     """
     Retrieve cars with query.
     """
-    cars = services.car.get_by_criteria(db, cars_search_query)
+    cars = await deps.run_on_session(
+        db,
+        services.car.get_by_criteria,
+        services.car.get_by_criteria_async,
+        cars_search_query=cars_search_query,
+    )
 
     return cars
 
@@ -42,7 +71,7 @@ def get_cars_with_query(
 @router.get("/{id}", response_model=schemas.Car)
 def get_car(
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     """
@@ -55,6 +84,66 @@ def get_car(
     return car
 
 
+@router.get(
+    "/{id}/image",
+    response_class=Response,
+    responses={200: {"content": {"image/*": {}}}, 304: {}},
+)
+def get_car_image(
+    id: int,
+    v: Optional[str] = None,
+    variant: Optional[ImageVariant] = None,
+    if_none_match: Optional[str] = Header(None),
+    # primary, <img> requests can't carry read-your-writes header of a new image
+    db: Session = Depends(deps.get_db),
+) -> Any:
+    """
+    Get car image or its resized variant. Public, so that it can be used directly
+    in <img> tags and cached by browsers (ETag is the image hash).
+    """
+    car = services.car.get(db=db, _id=id)
+    if not car:
+        raise CarNotFoundException()
+    if not car.image_hash:
+        raise CarImageNotFoundException()
+
+    variant_data = get_variant(car.image_hash, variant) if variant else None
+    if variant_data:
+        etag = f'"{car.image_hash}-{variant.value}"'
+    else:
+        etag = f'"{car.image_hash}"'
+    # original served in place of missing variant mustn't be cached as the variant
+    immutable = v == car.image_hash and (variant_data or not variant)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": VERSIONED_IMAGE_CACHE_CONTROL
+        if immutable
+        else IMAGE_CACHE_CONTROL,
+        # browsers mustn't render images as another content type (e.g. HTML)
+        "X-Content-Type-Options": "nosniff",
+    }
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    if variant_data:
+        return Response(
+            content=variant_data, media_type=VARIANT_CONTENT_TYPE, headers=headers
+        )
+
+    image = services.car.get_image(db, car.image_hash)
+    if image is None:
+        raise CarImageNotFoundException()
+    if variant:
+        # not generated yet (or cache was cleared), meanwhile original is served
+        schedule_variants(image.hash, image.data)
+    # images stored before uploads were checked may be of any type
+    if image.content_type in IMAGE_CONTENT_TYPES.values():
+        media_type = image.content_type
+    else:
+        media_type = "application/octet-stream"
+    return Response(content=image.data, media_type=media_type, headers=headers)
+
+
 @router.delete("/{id}", response_model=schemas.Car)
 def delete_car(
     *,
@@ -113,3 +202,27 @@ def update_car(
 
     car = services.car.update(db=db, db_obj=car, obj_in=car_update_dto)
     return car
+
+
+@router.post("/bulk", response_model=schemas.BulkImportResult)
+async def create_cars_bulk(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Create cars from CSV (with header) or NDJSON rows of CarCreateDto.
+    Nothing is created if any row is invalid, errors are reported per row.
+    """
+    if not services.user.is_admin(current_user):
+        raise NotEnoughPermissionsException()
+
+    body = await read_body(request)
+    return await run_in_threadpool(
+        import_rows,
+        db,
+        services.car,
+        schemas.CarCreateDto,
+        body,
+        request.headers.get("content-type", ""),
+    )
@@ -1,31 +1,37 @@
-from typing import Any, List
+from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import models, schemas, services
 from app.api import deps
+from app.api.bulk_import import import_rows, read_body
+from app.api.routing import UnitOfWorkRoute
 from app.exceptions.instance_not_found import CustomerNotFoundException
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
-@router.get("/", response_model=List[schemas.Customer])
+@router.get("/", response_model=schemas.Page[schemas.Customer])
 def get_customers(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
+    page_params: schemas.PageParams = Depends(deps.get_page_params),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve customers.
     """
-    customers = services.customer.get_all(db)
-    return customers
+    customers, next_cursor = services.customer.get_page(
+        db, limit=page_params.limit, after=page_params.after
+    )
+    return {"items": customers, "next_cursor": next_cursor}
 
 
 @router.get("/{id}", response_model=schemas.Customer)
 def get_customer(
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     """
@@ -92,3 +98,24 @@ def update_customer(
         db=db, db_obj=customer, obj_in=customer_update_dto
     )
     return customer
+
+
+@router.post("/bulk", response_model=schemas.BulkImportResult)
+async def create_customers_bulk(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Create customers from CSV (with header) or NDJSON rows of CustomerCreateDto.
+    Nothing is created if any row is invalid, errors are reported per row.
+    """
+    body = await read_body(request)
+    return await run_in_threadpool(
+        import_rows,
+        db,
+        services.customer,
+        schemas.CustomerCreateDto,
+        body,
+        request.headers.get("content-type", ""),
+    )
@@ -7,10 +7,11 @@ from sqlalchemy.orm import Session
 
 from app import schemas, services
 from app.api import deps
+from app.api.routing import UnitOfWorkRoute
 from app.core import security
 from app.core.config import settings
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.post("/login/access-token", response_model=schemas.Token)
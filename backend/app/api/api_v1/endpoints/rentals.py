@@ -1,10 +1,12 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app import models, schemas, services
 from app.api import deps
+from app.api.export import ExportResponse, export_response
+from app.api.routing import UnitOfWorkRoute
 from app.exceptions.instance_not_found import RentalNotFoundException
 from app.exceptions.not_enough_permissions import NotEnoughPermissionsException
 from app.models import Rental
@@ -15,25 +17,45 @@ from app.validators import (
     validate_reservation_with_id_exists,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
-@router.get("/", response_model=List[schemas.Rental])
-def get_all_rentals(
-    db: Session = Depends(deps.get_db),
+@router.get("/", response_model=schemas.Page[schemas.Rental])
+async def get_all_rentals(
+    db: deps.HotSession = Depends(deps.get_hot_read_db),
+    page_params: schemas.PageParams = Depends(deps.get_page_params),
+    current_user: models.User = Depends(deps.get_current_user_hot),
+) -> Dict[str, Any]:
+    """
+    Retrieve all rentals.
+    """
+
+    rentals, next_cursor = await deps.run_on_session(
+        db,
+        services.rental.get_page,
+        services.rental.get_page_async,
+        limit=page_params.limit,
+        after=page_params.after,
+    )
+    return {"items": rentals, "next_cursor": next_cursor}
+
+
+@router.get("/active", response_model=List[schemas.Rental])
+def get_active_rentals(
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> List[Rental]:
     """
-    Retrieve all rentals.
+    Retrieve active (in progress) rentals.
     """
 
-    rentals = services.rental.get_all(db)
+    rentals = services.rental.get_active(db)
     return rentals
 
 
 @router.get("/overtime", response_model=List[schemas.Rental])
 def get_overtime_rentals(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> List[Rental]:
     """
@@ -44,10 +66,30 @@ def get_overtime_rentals(
     return rentals
 
 
+@router.get(
+    "/export",
+    response_class=ExportResponse,
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}},
+)
+def export_rentals(
+    status: Optional[RentalStatus] = None,
+    export_params: schemas.ExportParams = Depends(deps.get_export_params),
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Export rentals as CSV or NDJSON, streamed row by row.
+    """
+    statement = services.rental.get_export_statement(
+        start=export_params.start, end=export_params.end, status=status
+    )
+    return export_response(db, statement, export_params.format, "rentals")
+
+
 @router.get("/{id}", response_model=schemas.Rental)
 def get_rental(
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Rental:
     """
@@ -1,35 +1,77 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app import models, schemas, services
 from app.api import deps
+from app.api.export import ExportResponse, export_response
+from app.api.routing import UnitOfWorkRoute
 from app.exceptions.instance_not_found import ReservationNotFoundException
 from app.exceptions.not_enough_permissions import NotEnoughPermissionsException
 from app.models.reservation import Reservation, ReservationStatus
 from app.validators import validate_car_with_id_exists, validate_customer_with_id_exists
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
-@router.get("/", response_model=List[schemas.Reservation])
-def get_all_reservations(
-    db: Session = Depends(deps.get_db),
+@router.get("/", response_model=schemas.Page[schemas.Reservation])
+async def get_all_reservations(
+    db: deps.HotSession = Depends(deps.get_hot_read_db),
+    page_params: schemas.PageParams = Depends(deps.get_page_params),
+    current_user: models.User = Depends(deps.get_current_user_hot),
+) -> Dict[str, Any]:
+    """
+    Retrieve all reservations.
+    """
+
+    reservations, next_cursor = await deps.run_on_session(
+        db,
+        services.reservation.get_page,
+        services.reservation.get_page_async,
+        limit=page_params.limit,
+        after=page_params.after,
+    )
+    return {"items": reservations, "next_cursor": next_cursor}
+
+
+@router.get("/active", response_model=List[schemas.Reservation])
+def get_active_reservations(
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> List[Reservation]:
     """
-    Retrieve all reservations.
+    Retrieve active (new) reservations.
     """
 
-    reservations = services.reservation.get_all(db)
+    reservations = services.reservation.get_active(db)
     return reservations
 
 
+@router.get(
+    "/export",
+    response_class=ExportResponse,
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}},
+)
+def export_reservations(
+    status: Optional[ReservationStatus] = None,
+    export_params: schemas.ExportParams = Depends(deps.get_export_params),
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Export reservations as CSV or NDJSON, streamed row by row.
+    """
+    statement = services.reservation.get_export_statement(
+        start=export_params.start, end=export_params.end, status=status
+    )
+    return export_response(db, statement, export_params.format, "reservations")
+
+
 @router.get("/{id}", response_model=schemas.Reservation)
 def get_reservation(
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Reservation:
     """
@@ -1,24 +1,28 @@
-from typing import Any, List
+from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app import models, schemas, services
 from app.api import deps
+from app.api.routing import UnitOfWorkRoute
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
-@router.get("/", response_model=List[schemas.User])
+@router.get("/", response_model=schemas.Page[schemas.User])
 def read_users(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
+    page_params: schemas.PageParams = Depends(deps.get_page_params),
     current_user: models.User = Depends(deps.get_current_active_admin),
 ) -> Any:
     """
     Retrieve users.
     """
-    users = services.user.get_all(db)
-    return users
+    users, next_cursor = services.user.get_page(
+        db, limit=page_params.limit, after=page_params.after
+    )
+    return {"items": users, "next_cursor": next_cursor}
 
 
 @router.post("/", response_model=schemas.User)
@@ -57,7 +61,7 @@ def read_user_me(
 def read_user_by_id(
     user_id: int,
     current_user: models.User = Depends(deps.get_current_user),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
 ) -> Any:
     """
     Get a specific user by id.
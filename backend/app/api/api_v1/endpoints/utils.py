@@ -0,0 +1,37 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Response
+
+from app import models, schemas
+from app.api import deps
+from app.api.profiling import profile_path
+from app.api.routing import UnitOfWorkRoute
+from app.db.pool import pool_status
+from app.db.session import pool_engines
+from app.exceptions.instance_not_found import ProfileNotFoundException
+
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+
+@router.get("/db-pool", response_model=schemas.DbPools)
+def get_db_pool_status(
+    current_user: models.User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Get connection pools state of the worker process serving the request.
+    """
+    return {name: pool_status(engine) for name, engine in pool_engines().items()}
+
+
+@router.get("/profiles/{name}", response_class=Response)
+def get_profile(
+    name: str, current_user: models.User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Get profile of a request (named in its X-Profile response header)
+    in collapsed stack format.
+    """
+    path = profile_path(name)
+    if path is None or not path.exists():
+        raise ProfileNotFoundException()
+    return Response(content=path.read_text(), media_type="text/plain")
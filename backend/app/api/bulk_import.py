@@ -0,0 +1,68 @@
+import csv
+from itertools import islice
+from typing import Any, List, Type
+
+from fastapi import Request
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.exceptions.bulk_import import (
+    BulkImportInvalidRowsException,
+    BulkImportMalformedBodyException,
+    BulkImportTooLargeException,
+    BulkImportTooManyRowsException,
+    BulkImportUnsupportedFormatException,
+)
+from app.services.base import BaseService
+from app.utils.bulk_import import parse_rows, validate_rows
+
+
+async def read_body(request: Request) -> bytes:
+    """
+    Returns request body, raises BulkImportTooLargeException without reading it
+    whole if it is over BULK_IMPORT_MAX_BYTES (by Content-Length or bytes read)
+    """
+    max_bytes = settings.BULK_IMPORT_MAX_BYTES
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise BulkImportTooLargeException(max_bytes)
+
+    chunks: List[bytes] = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise BulkImportTooLargeException(max_bytes)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def import_rows(
+    db: Session,
+    service: BaseService,
+    schema: Type[BaseModel],
+    body: bytes,
+    content_type: str,
+) -> Any:
+    """
+    Creates objects from CSV or NDJSON rows of schema, all or nothing:
+    if any row is invalid, errors of the rows are raised and nothing is created.
+    Blocking (validation of many rows and COPY), run it in threadpool
+    """
+    try:
+        parsed_rows = parse_rows(body, content_type)
+    except ValueError:
+        raise BulkImportUnsupportedFormatException()
+    try:
+        rows = list(islice(parsed_rows, settings.BULK_IMPORT_MAX_ROWS + 1))
+    except (ValueError, csv.Error):
+        raise BulkImportMalformedBodyException()
+    if len(rows) > settings.BULK_IMPORT_MAX_ROWS:
+        raise BulkImportTooManyRowsException(settings.BULK_IMPORT_MAX_ROWS)
+
+    objs_in, errors = validate_rows(rows, schema, settings.BULK_IMPORT_MAX_ERRORS)
+    if errors:
+        raise BulkImportInvalidRowsException(errors)
+
+    return {"imported": service.create_bulk(db, objs_in=objs_in)}
@@ -1,48 +1,169 @@
-from typing import Generator
+from datetime import datetime
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator, Optional, Union
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import models, schemas, services
-from app.core import security
+from app.api.routing import join_request_unit_of_work
+from app.core import cache, security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.read_routing import reads_from_primary
+from app.db.session import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    SessionLocal,
+)
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
 
-def get_db() -> Generator:
+def get_db(request: Request) -> Generator:
+    try:
+        # objects stay loaded after commit, so that entities (and their relations)
+        # are loaded at most once per request, also when serializing the response
+        db = SessionLocal(expire_on_commit=False)
+        # services only flush, the request commits once
+        join_request_unit_of_work(request, db)
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db(request: Request) -> AsyncGenerator:
+    """
+    Session of async engine, for endpoints defined with async def. They run
+    in the event loop, so that in-flight requests don't occupy threadpool threads
+    """
+    async with AsyncSessionLocal() as db:
+        join_request_unit_of_work(request, db)
+        yield db
+
+
+def _read_session(request: Request) -> Session:
+    if reads_from_primary(request.headers):
+        return SessionLocal(expire_on_commit=False)
+    return ReadSessionLocal(expire_on_commit=False)
+
+
+def get_read_db(request: Request) -> Generator:
+    """
+    Session of read replica, for endpoints that only read.
+    Clients that wrote recently read from primary, so that they see their writes
+    """
+    db = _read_session(request)
     try:
-        db = SessionLocal()
         yield db
     finally:
         db.close()
 
 
+async def get_async_read_db(request: Request) -> AsyncGenerator:
+    """
+    Session of read replica for async endpoints, see get_read_db
+    """
+    if reads_from_primary(request.headers):
+        session_factory = AsyncSessionLocal
+    else:
+        session_factory = AsyncReadSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
+# session of hot read endpoints, see get_hot_read_db
+HotSession = Union[Session, AsyncSession]
+
+
+async def get_hot_read_db(request: Request) -> AsyncGenerator:
+    """
+    Read session of hot read endpoints (defined with async def): with
+    ASYNC_DB_ENDPOINTS an async session, otherwise a sync session, which
+    is used in the threadpool (see run_on_session)
+    """
+    if settings.ASYNC_DB_ENDPOINTS:
+        async for async_db in get_async_read_db(request):
+            yield async_db
+        return
+
+    db = _read_session(request)
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def run_on_session(
+    db: HotSession,
+    function: Callable[..., Any],
+    async_function: Callable[..., Awaitable[Any]],
+    **kwargs: Any,
+) -> Any:
+    """
+    Calls async_function with async session, function with sync session
+    in the threadpool, so that it doesn't block the event loop
+    """
+    if isinstance(db, AsyncSession):
+        return await async_function(db, **kwargs)
+    return await run_in_threadpool(function, db, **kwargs)
+
+
+def get_token_payload(token: str) -> schemas.TokenPayload:
+    token_data = cache.token_payloads.get(token)
+    if token_data is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+            )
+            token_data = schemas.TokenPayload(**payload)
+        except (jwt.JWTError, ValidationError):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Could not validate credentials",
+            )
+        # expired tokens must not be served from the cache
+        cache.token_payloads.set(token, token_data, expires_at=payload.get("exp"))
+    return token_data
+
+
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
 ) -> models.User:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = schemas.TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
-        )
-    user = services.user.get(db, _id=token_data.sub)
+    token_data = get_token_payload(token)
+    user = services.user.get_cached(db, _id=token_data.sub)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(reusable_oauth2)
+) -> models.User:
+    token_data = get_token_payload(token)
+    user = await services.user.get_cached_async(db, _id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
+async def get_current_user_hot(
+    db: HotSession = Depends(get_hot_read_db), token: str = Depends(reusable_oauth2)
+) -> models.User:
+    """
+    Current user of hot read endpoints, looked up by their session
+    """
+    if isinstance(db, AsyncSession):
+        return await get_current_user_async(db, token)
+    return await run_in_threadpool(get_current_user, db, token)
+
+
 def get_current_active_admin(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
@@ -51,3 +172,22 @@ def get_current_active_admin(
             status_code=401, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+def get_page_params(
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, description="next_cursor of previous page"),
+) -> schemas.PageParams:
+    return schemas.PageParams(limit=limit, after=after)
+
+
+def get_export_params(
+    format: schemas.ExportFormat = Query(schemas.ExportFormat.CSV),
+    start: Optional[datetime] = Query(
+        None, description="exclude bookings ending before"
+    ),
+    end: Optional[datetime] = Query(
+        None, description="exclude bookings starting after"
+    ),
+) -> schemas.ExportParams:
+    return schemas.ExportParams(format=format, start=start, end=end)
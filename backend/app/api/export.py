@@ -0,0 +1,63 @@
+import asyncio
+from typing import Iterator
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from starlette.types import Receive, Scope, Send
+
+from app import schemas
+from app.core.config import settings
+from app.utils.export import EXPORT_MEDIA_TYPES, format_rows
+
+
+class ExportResponse(StreamingResponse):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # as StreamingResponse, stops streaming when client disconnects. Coroutines
+        # are wrapped in tasks, asyncio.wait doesn't accept them since Python 3.11
+        tasks = [
+            asyncio.ensure_future(self.stream_response(send)),
+            asyncio.ensure_future(self.listen_for_disconnect(receive)),
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.result()
+
+
+def stream_rows(
+    db: Session, statement: Select, export_format: schemas.ExportFormat
+) -> Iterator[str]:
+    """
+    Streams rows of statement fetched in batches from a server-side cursor,
+    memory use doesn't depend on number of rows
+    """
+    result = db.execute(
+        statement.execution_options(
+            stream_results=True, max_row_buffer=settings.EXPORT_BATCH_SIZE
+        )
+    )
+    try:
+        yield from format_rows(
+            list(result.keys()),
+            result.partitions(settings.EXPORT_BATCH_SIZE),
+            export_format,
+        )
+    finally:
+        result.close()
+
+
+def export_response(
+    db: Session, statement: Select, export_format: schemas.ExportFormat, name: str
+) -> ExportResponse:
+    """
+    Returns response streaming rows of statement as a file attachment. Rows are
+    fetched while the response is sent, the session is closed only after that
+    """
+    filename = f"{name}.{export_format.value}"
+    return ExportResponse(
+        stream_rows(db, statement, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
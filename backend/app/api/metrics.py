@@ -0,0 +1,79 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import metrics, security
+from app.db.pool import pool_status
+from app.db.session import pool_engines
+
+router = APIRouter()
+
+# charset is appended by PlainTextResponse
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+POOL_STATES = ["checked_out", "idle", "overflow", "waiting"]
+
+
+def _pool_values(*keys: str) -> Dict[metrics.Labels, float]:
+    values = {}
+    for name, engine in pool_engines().items():
+        status = pool_status(engine)
+        pool = name[: -len("_pool")]
+        for key in keys:
+            values[(pool, key) if len(keys) > 1 else (pool,)] = status[key]
+    return values
+
+
+# pool status is read when metrics are scraped
+metrics.registry.register(
+    metrics.Gauge(
+        "db_pool_connections",
+        "Connections of database pools by state",
+        ["pool", "state"],
+        function=lambda: _pool_values(*POOL_STATES),
+    )
+)
+metrics.registry.register(
+    metrics.Gauge(
+        "db_pool_size",
+        "Size of database pools",
+        ["pool"],
+        function=lambda: _pool_values("size"),
+    )
+)
+metrics.registry.register(
+    metrics.Counter(
+        "db_pool_checkouts_total",
+        "Connections checked out from database pools",
+        ["pool"],
+        function=lambda: _pool_values("checkouts"),
+    )
+)
+metrics.registry.register(
+    metrics.Counter(
+        "db_pool_timeouts_total",
+        "Checkouts of database pools that timed out",
+        ["pool"],
+        function=lambda: _pool_values("timeouts"),
+    )
+)
+metrics.registry.register(
+    metrics.Gauge(
+        "password_hashing_queue_depth",
+        "Password hashing tasks running or waiting for a worker",
+        function=lambda: {(): security.password_hashing_queue_depth()},
+    )
+)
+
+
+@router.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False,
+)
+def get_metrics() -> Any:
+    """
+    Metrics of the worker process in Prometheus text exposition format.
+    """
+    return PlainTextResponse(
+        metrics.registry.render(), media_type=EXPOSITION_CONTENT_TYPE
+    )
@@ -0,0 +1,121 @@
+"""
+Profiling of single requests on demand. Requests of admins carrying X-Profile
+header are sampled by SamplingProfiler, the profile is stored in PROFILES_DIR (which
+keeps the newest PROFILES_MAX_COUNT of them) and its name is returned in X-Profile
+response header (GET /utils/profiles/{name}).
+Other requests only pay for looking the header up.
+"""
+import logging
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import services
+from app.api import deps
+from app.core.config import settings
+from app.core.profiler import SamplingProfiler
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_FILE_PATTERN = re.compile(r"^\d+-[0-9a-f]{8}\.folded$")
+
+_PROFILE_HEADER_KEY = PROFILE_HEADER.lower().encode()
+
+
+def profile_path(name: str) -> Optional[Path]:
+    """
+    Returns path of stored profile, None if name is not a profile name
+    """
+    if not PROFILE_FILE_PATTERN.match(name):
+        return None
+    return Path(settings.PROFILES_DIR) / name
+
+
+def is_admin_token(authorization: Optional[str]) -> bool:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer":
+        return False
+    try:
+        token_data = deps.get_token_payload(token)
+    except HTTPException:
+        return False
+    db = SessionLocal()
+    try:
+        user = services.user.get_cached(db, _id=token_data.sub)
+        return user is not None and services.user.is_admin(user)
+    finally:
+        db.close()
+
+
+def store_profile(profiler: SamplingProfiler, name: str) -> None:
+    """
+    Writes profile to PROFILES_DIR and removes the oldest ones over PROFILES_MAX_COUNT
+    """
+    profiles_dir = Path(settings.PROFILES_DIR)
+    profiler.write(profiles_dir / name)
+
+    # names start with unix time of the request
+    profiles = sorted(
+        (
+            path
+            for path in profiles_dir.iterdir()
+            if PROFILE_FILE_PATTERN.match(path.name)
+        ),
+        key=lambda path: (int(path.name.split("-", 1)[0]), path.name),
+    )
+    for path in profiles[: max(len(profiles) - settings.PROFILES_MAX_COUNT, 0)]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            # removed by another request meanwhile
+            pass
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests of admins asking for it with X-Profile header
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not any(
+            key == _PROFILE_HEADER_KEY for key, _ in scope["headers"]
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if not await run_in_threadpool(is_admin_token, headers.get("authorization")):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{int(time.time())}-{uuid.uuid4().hex[:8]}.folded"
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_HEADER, name)
+            await send(message)
+
+        profiler = SamplingProfiler(settings.PROFILING_INTERVAL)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profiler.stop()
+            await run_in_threadpool(store_profile, profiler, name)
+            logger.info(
+                f"Profiled {scope['method']} {scope['path']}"
+                f" ({profiler.duration * 1000:.1f} ms,"
+                f" {sum(profiler.samples.values())} samples): {name}"
+            )
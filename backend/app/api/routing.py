@@ -0,0 +1,70 @@
+from typing import Any, Callable, Coroutine, List
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics, tracing
+from app.db import unit_of_work
+
+# key of Request.state holding sessions of the request's unit of work
+SESSIONS = "sessions"
+
+
+class UnitOfWorkRoute(APIRoute):
+    """
+    Route committing changes of its request once, after the endpoint succeeded
+    and before the response is sent (dependencies with yield exit only after that).
+    HTTP exceptions raised by the endpoint are counted by type, the endpoint
+    and the commit are the root span of sampled traces
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            with tracing.start_trace(
+                f"{request.method} {self.path}",
+                **{"http.method": request.method, "http.route": self.path},
+            ) as span:
+                try:
+                    response = await run_unit_of_work(request)
+                except HTTPException as exception:
+                    if span is not None:
+                        span.attributes["http.status_code"] = exception.status_code
+                    raise
+                if span is not None:
+                    span.attributes["http.status_code"] = response.status_code
+                return response
+
+        async def run_unit_of_work(request: Request) -> Response:
+            setattr(request.state, SESSIONS, [])
+            try:
+                response = await handler(request)
+            except HTTPException as exception:
+                metrics.http_exceptions.inc(exception=type(exception).__name__)
+                raise
+
+            for db in getattr(request.state, SESSIONS):
+                if not unit_of_work.has_writes(db):
+                    continue
+                if isinstance(db, AsyncSession):
+                    await db.commit()
+                else:
+                    await run_in_threadpool(db.commit)
+                request.state.wrote = True
+            return response
+
+        return unit_of_work_handler
+
+
+def join_request_unit_of_work(request: Request, db: Any) -> None:
+    """
+    Makes request's route owner of session's unit of work, if the route
+    is a UnitOfWorkRoute (otherwise services commit their changes)
+    """
+    sessions: List[Any] = getattr(request.state, SESSIONS, None)
+    if sessions is not None:
+        sessions.append(db)
+        unit_of_work.begin(db)
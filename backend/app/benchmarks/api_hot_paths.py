@@ -0,0 +1,375 @@
+"""
+Measures latency, queries and memory of API hot paths and compares them to a baseline.
+
+Requests are sent in-process (TestClient) to the app connected to the configured
+database, fill it with app.benchmarks.generate_dataset first to measure realistic
+volumes. Every scenario is warmed up and run --iterations times, p50/p99 latency
+and median number of queries are taken from these runs, memory is the peak
+of Python allocations (tracemalloc) of one more traced run. Bookings are made
+for cars created for the benchmark, they are deleted at the end.
+
+Candidates are compared against the stored baseline (api_hot_paths_baseline.json,
+measured on the seeded database), the exit status is 1 when any scenario
+regressed. Save it again on the deployed revision when results change on purpose
+or to compare on a larger dataset:
+
+    python -m app.benchmarks.api_hot_paths --save-baseline
+    python -m app.benchmarks.api_hot_paths --tolerance 0.2
+"""
+import argparse
+import json
+import logging
+import math
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+)
+
+import pytz
+from fastapi.testclient import TestClient
+from requests import Response
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import services
+from app.core import image_variants, query_stats, security
+from app.core.config import settings
+from app.db.session import (
+    SessionLocal,
+    async_engine,
+    async_replica_engine,
+    engine,
+    replica_engine,
+)
+from app.main import app
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = Path(__file__).with_name("api_hot_paths_baseline.json")
+
+# missed reservations inserted before every run of cancel_missed_reservations
+MISSED_RESERVATIONS = 100
+
+# results compared with tolerance, numbers of queries must not grow at all
+TOLERATED_KEYS = ["p50_ms", "p99_ms", "memory_kib"]
+QUERIES_KEY = "queries"
+
+Results = Dict[str, Dict[str, float]]
+
+
+class Scenario(NamedTuple):
+    name: str
+    # runs i-th measured operation
+    run: Callable[[int], Any]
+    # prepares i-th operation, not measured
+    setup: Optional[Callable[[int], None]] = None
+
+
+class Fixtures(NamedTuple):
+    customer_id: int
+    reservation_car_id: int
+    rental_car_id: int
+    missed_car_id: int
+
+
+def percentile(values: List[float], percent: float) -> float:
+    # nearest-rank percentile
+    ordered = sorted(values)
+    rank = math.ceil(len(ordered) * percent / 100)
+    return ordered[max(rank, 1) - 1]
+
+
+def count_queries() -> ContextManager[List[str]]:
+    """
+    Collects SQL statements executed on engines of the app within the block
+    """
+    return query_stats.count_queries(
+        [
+            engine,
+            replica_engine,
+            async_engine.sync_engine,
+            async_replica_engine.sync_engine,
+        ]
+    )
+
+
+def measure(scenario: Scenario, iterations: int, warmup: int) -> Dict[str, float]:
+    """
+    Returns p50/p99 latency (ms), median number of queries and peak memory (KiB)
+    of a scenario
+    """
+    for i in range(warmup):
+        if scenario.setup:
+            scenario.setup(i)
+        scenario.run(i)
+
+    latencies: List[float] = []
+    queries: List[float] = []
+    for i in range(warmup, warmup + iterations):
+        if scenario.setup:
+            scenario.setup(i)
+        with count_queries() as statements:
+            started_at = time.perf_counter()
+            scenario.run(i)
+            latencies.append(time.perf_counter() - started_at)
+        queries.append(len(statements))
+
+    # tracing slows allocations down, memory is measured on a run of its own
+    i = warmup + iterations
+    if scenario.setup:
+        scenario.setup(i)
+    tracemalloc.start()
+    try:
+        scenario.run(i)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        QUERIES_KEY: percentile(queries, 50),
+        "memory_kib": round(peak / 1024, 1),
+    }
+
+
+def create_fixtures(db: Session) -> Fixtures:
+    """
+    Inserts a customer and cars without bookings, booked by the benchmark
+    """
+    customer_id = db.execute(
+        text("INSERT INTO customer (full_name) VALUES ('Benchmark') RETURNING id")
+    ).scalar()
+    car_ids = [
+        row[0]
+        for row in db.execute(
+            text(
+                "INSERT INTO car (model_name, type, fuel_type, gearbox_type, ac_type,"
+                " number_of_passengers, drive_type, number_of_airbags, price_per_day)"
+                " SELECT 'benchmark ' || i, 'CAR', 'PETROL', 'AUTO', 'AUTO', 4,"
+                " 'FRONT', 6, 100 FROM generate_series(1, 3) i RETURNING id"
+            )
+        )
+    ]
+    db.commit()
+    return Fixtures(customer_id, *car_ids)
+
+
+def delete_fixtures(db: Session, fixtures: Fixtures) -> None:
+    params = {"car_ids": list(fixtures[1:]), "customer_id": fixtures.customer_id}
+    db.execute(text("DELETE FROM rental WHERE car_id = ANY(:car_ids)"), params)
+    db.execute(text("DELETE FROM reservation WHERE car_id = ANY(:car_ids)"), params)
+    db.execute(text("DELETE FROM car WHERE id = ANY(:car_ids)"), params)
+    db.execute(text("DELETE FROM customer WHERE id = :customer_id"), params)
+    db.commit()
+
+
+def get_scenarios(
+    client: TestClient, db: Session, fixtures: Fixtures, now: datetime
+) -> List[Scenario]:
+    api = settings.API_V1_STR
+    login_data = {
+        "username": settings.FIRST_SUPERUSER,
+        "password": settings.FIRST_SUPERUSER_PASSWORD,
+    }
+
+    def post(path: str, **kwargs: Any) -> Callable[[int], Response]:
+        return lambda i: _checked(client.post(f"{api}{path}", **kwargs))
+
+    token = post("/login/access-token", data=login_data)(0).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def get(path: str) -> Callable[[int], Response]:
+        return lambda i: _checked(client.get(f"{api}{path}", headers=headers))
+
+    def booking(car_id: int, i: int) -> Dict[str, Any]:
+        # every booking on a day of its own, bookings never collide
+        start = now.replace(hour=10, minute=0) + timedelta(days=2 * i + 1)
+        return {
+            "car_id": car_id,
+            "customer_id": fixtures.customer_id,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(hours=8)).isoformat(),
+        }
+
+    # statuses of created bookings are replaced by the endpoints anyway
+    def create(path: str, car_id: int, status: str) -> Callable[[int], Response]:
+        return lambda i: _checked(
+            client.post(
+                f"{api}{path}",
+                json={**booking(car_id, i), "status": status},
+                headers=headers,
+            )
+        )
+
+    def insert_missed_reservations(i: int) -> None:
+        db.execute(
+            text(
+                "INSERT INTO reservation"
+                " (car_id, customer_id, start_date, end_date, status)"
+                " SELECT :car_id, :customer_id, d, d + interval '8 hours', 'NEW'"
+                " FROM generate_series(:first, :last, interval '-1 day') d"
+            ),
+            {
+                "car_id": fixtures.missed_car_id,
+                "customer_id": fixtures.customer_id,
+                "first": now - timedelta(days=i * MISSED_RESERVATIONS + 1),
+                "last": now - timedelta(days=(i + 1) * MISSED_RESERVATIONS),
+            },
+        )
+        db.commit()
+
+    availability = {
+        "start": (now + timedelta(days=7)).isoformat(),
+        "end": (now + timedelta(days=14)).isoformat(),
+    }
+    return [
+        Scenario("login", post("/login/access-token", data=login_data)),
+        Scenario("cars_query", post("/cars/query", json={}, headers=headers)),
+        Scenario(
+            "cars_query_availability",
+            post(
+                "/cars/query",
+                json={"availability_dates": availability},
+                headers=headers,
+            ),
+        ),
+        Scenario("cars_list", get("/cars/")),
+        Scenario("customers_list", get("/customers/")),
+        Scenario("reservations_list", get("/reservations/")),
+        Scenario("rentals_list", get("/rentals/")),
+        Scenario(
+            "reservation_create",
+            create("/reservations/", fixtures.reservation_car_id, status="NEW"),
+        ),
+        Scenario(
+            "rental_create",
+            create("/rentals/", fixtures.rental_car_id, status="IN_PROGRESS"),
+        ),
+        Scenario(
+            "cancel_missed_reservations",
+            lambda i: services.reservation.cancel_missed_reservations(db),
+            insert_missed_reservations,
+        ),
+    ]
+
+
+def _checked(response: Response) -> Response:
+    response.raise_for_status()
+    return response
+
+
+def benchmark(
+    client: TestClient,
+    db: Session,
+    iterations: int,
+    warmup: int,
+    only: Optional[List[str]] = None,
+) -> Results:
+    """
+    Runs scenarios (all or only those named) and returns their results by name
+    """
+    fixtures = create_fixtures(db)
+    try:
+        now = datetime.now(tz=pytz.UTC)
+        results: Results = {}
+        for scenario in get_scenarios(client, db, fixtures, now):
+            if only and scenario.name not in only:
+                continue
+            results[scenario.name] = measure(scenario, iterations, warmup)
+            logger.info(f"{scenario.name}: {results[scenario.name]}")
+        return results
+    finally:
+        db.rollback()
+        delete_fixtures(db, fixtures)
+
+
+def compare(
+    results: Mapping[str, Mapping[str, float]],
+    baseline: Mapping[str, Mapping[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """
+    Returns descriptions of results worse than the baseline, scenarios missing
+    in the baseline are not compared
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for key in [*TOLERATED_KEYS, QUERIES_KEY]:
+            base = baseline[name].get(key)
+            if base is None:
+                continue
+            limit = base if key == QUERIES_KEY else base * (1 + tolerance)
+            if result[key] > limit:
+                regressions.append(f"{name} {key}: {result[key]} (baseline {base})")
+    return regressions
+
+
+def run(args: argparse.Namespace) -> int:
+    # startup events are not run, the cancel_missed_reservations task would
+    # execute its queries during measured requests
+    client = TestClient(app)
+    db = SessionLocal()
+    try:
+        results = benchmark(client, db, args.iterations, args.warmup, args.only)
+    finally:
+        db.close()
+        image_variants.shutdown()
+        security.shutdown_password_hashing()
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        logger.info(f"Baseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        logger.warning(f"No baseline at {args.baseline}, results are not compared")
+        return 0
+
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.tolerance
+    )
+    for regression in regressions:
+        logger.error(f"Regression of {regression}")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument(
+        "--only", nargs="+", metavar="SCENARIO", help="run only named scenarios"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store results as the baseline instead of comparing them",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed relative growth of latency and memory (queries must not grow)",
+    )
+    args = parser.parse_args()
+
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
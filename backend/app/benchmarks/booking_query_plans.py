@@ -0,0 +1,215 @@
+"""
+Shows query plans of booking hot paths with and without composite/partial indexes.
+
+Generates a large dataset, runs EXPLAIN ANALYZE on every query with the indexes,
+drops the indexes and runs it again. Everything happens in a single transaction
+which is rolled back at the end, so the database is left untouched.
+
+    python -m app.benchmarks.booking_query_plans --cars 10000 --bookings-per-car 100
+"""
+import argparse
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import pytz
+from sqlalchemy import text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app import services  # noqa: F401 (initialises services before validators)
+from app.db.session import SessionLocal
+from app.models import Rental, Reservation
+from app.models.rental import RentalStatus
+from app.models.reservation import ReservationStatus
+from app.utils.interval import Interval
+from app.validators.availability import intersecting_condition
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEXES = [
+    "ix_reservation_car_id_status_start_date",
+    "ix_reservation_new_start_date",
+    "ix_rental_car_id_status_start_date",
+    "ix_rental_in_progress_end_date",
+    "ix_rental_reservation_id",
+]
+
+
+class Explain(Executable, ClauseElement):
+    def __init__(self, statement: ClauseElement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (ANALYZE, BUFFERS) " + compiler.process(element.statement, **kw)
+
+
+def generate_dataset(db: Session, cars: int, bookings_per_car: int) -> int:
+    """
+    Inserts cars with non overlapping reservations and rentals created from them,
+    every 20th booking is active. Returns id of one of generated cars
+    """
+    customer_id = db.execute(
+        text("INSERT INTO customer (full_name) VALUES ('Benchmark') RETURNING id")
+    ).scalar()
+    car_ids = [
+        row[0]
+        for row in db.execute(
+            text(
+                "INSERT INTO car (model_name, type, fuel_type, gearbox_type, ac_type,"
+                " number_of_passengers, drive_type, number_of_airbags, price_per_day)"
+                " SELECT 'benchmark ' || i, 'CAR', 'PETROL', 'AUTO', 'AUTO', 4,"
+                " 'FRONT', 6, 100 FROM generate_series(1, :cars) i RETURNING id"
+            ),
+            {"cars": cars},
+        )
+    ]
+    params = {
+        "per_car": bookings_per_car,
+        "customer_id": customer_id,
+        "first_car_id": min(car_ids),
+    }
+
+    # bookings every 3 days, half of them in the past
+    db.execute(
+        text(
+            "INSERT INTO reservation"
+            " (car_id, customer_id, start_date, end_date, status)"
+            " SELECT c.id, :customer_id,"
+            " now() + (n - :per_car / 2) * interval '3 days',"
+            " now() + (n - :per_car / 2) * interval '3 days' + interval '1 day',"
+            " (CASE WHEN n % 20 = 0 THEN 'NEW' WHEN n % 3 = 0 THEN 'CANCELLED'"
+            " ELSE 'COLLECTED' END)::reservationstatus"
+            " FROM car c CROSS JOIN generate_series(0, :per_car - 1) n"
+            " WHERE c.id >= :first_car_id"
+        ),
+        params,
+    )
+    # rentals are created from collected reservations
+    db.execute(
+        text(
+            "INSERT INTO rental"
+            " (car_id, customer_id, reservation_id, start_date, end_date, status)"
+            " SELECT car_id, customer_id, id, start_date, end_date,"
+            " (CASE WHEN id % 20 = 1 THEN 'IN_PROGRESS'"
+            " ELSE 'COMPLETED' END)::rentalstatus"
+            " FROM reservation WHERE status = 'COLLECTED' AND car_id >= :first_car_id"
+        ),
+        params,
+    )
+    db.execute(text("ANALYZE car"))
+    db.execute(text("ANALYZE reservation"))
+    db.execute(text("ANALYZE rental"))
+
+    return car_ids[len(car_ids) // 2]
+
+
+def get_queries(db: Session, car_id: int) -> List[Tuple[str, ClauseElement]]:
+    """
+    Returns statements issued by RentalService and ReservationService hot paths
+    """
+    now = datetime.now(tz=pytz.UTC)
+    timeframe = Interval(now, now)
+
+    return [
+        (
+            "ReservationService.get_active_by_car_id",
+            db.query(Reservation)
+            .filter(
+                Reservation.car_id == car_id,
+                Reservation.status == ReservationStatus.NEW,
+            )
+            .statement,
+        ),
+        (
+            "ReservationService.get_missed",
+            db.query(Reservation)
+            .filter(
+                Reservation.status == ReservationStatus.NEW,
+                Reservation.start_date < now,
+            )
+            .statement,
+        ),
+        (
+            "RentalService.get_active_by_car_id",
+            db.query(Rental)
+            .filter(Rental.car_id == car_id, Rental.status == RentalStatus.IN_PROGRESS)
+            .statement,
+        ),
+        (
+            "RentalService.get_overtime",
+            db.query(Rental)
+            .filter(Rental.status == RentalStatus.IN_PROGRESS, Rental.end_date < now)
+            .statement,
+        ),
+        (
+            "is_colliding_with_other_reservations",
+            db.query(Reservation.id)
+            .filter(
+                Reservation.car_id == car_id,
+                Reservation.status == ReservationStatus.NEW,
+                intersecting_condition(Reservation.booked_dates, timeframe),
+            )
+            .statement,
+        ),
+    ]
+
+
+def explain(db: Session, statement: ClauseElement) -> Tuple[str, float]:
+    """
+    Returns query plan and its execution time in milliseconds, measured on warm cache
+    """
+    db.execute(Explain(statement))
+    plan = "\n".join(row[0] for row in db.execute(Explain(statement)))
+    match = re.search(r"Execution Time: ([\d.]+) ms", plan)
+    return plan, float(match.group(1)) if match else float("nan")
+
+
+def run(cars: int, bookings_per_car: int) -> None:
+    db = SessionLocal()
+    try:
+        logger.info(f"Generating {cars} cars with {bookings_per_car} bookings each")
+        car_id = generate_dataset(db, cars, bookings_per_car)
+
+        results: Dict[str, Dict[str, Tuple[str, float]]] = {}
+        for name, statement in get_queries(db, car_id):
+            results[name] = {"after": explain(db, statement)}
+
+        for index in INDEXES:
+            db.execute(text(f"DROP INDEX {index}"))
+
+        for name, statement in get_queries(db, car_id):
+            results[name]["before"] = explain(db, statement)
+
+        for name, result in results.items():
+            print(f"=== {name}")
+            for label in ("before", "after"):
+                plan, execution_time = result[label]
+                print(f"--- {label} ({execution_time:.3f} ms)")
+                print(plan)
+            print()
+
+        print(f"{'query':<45}{'before [ms]':>14}{'after [ms]':>14}")
+        for name, result in results.items():
+            print(f"{name:<45}{result['before'][1]:>14.3f}{result['after'][1]:>14.3f}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--cars", type=int, default=10000)
+    parser.add_argument("--bookings-per-car", type=int, default=100)
+    args = parser.parse_args()
+
+    run(args.cars, args.bookings_per_car)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Generates synthetic dataset for scale testing and writes it with COPY.
+
+Every car gets a history of bookings that never collide (no two bookings of a car
+share a calendar day, see Interval.is_intersecting), spread over the given years
+and FUTURE_DAYS ahead. Past bookings are completed rentals (mostly created from
+collected reservations), cancelled reservations or walk-in rentals, bookings
+in progress are rentals in progress and future ones are new reservations.
+Generated data depends only on parameters (--seed and --now included).
+
+    python -m app.benchmarks.generate_dataset --cars 10000 --customers 1000000 \\
+        --bookings-per-car 2000 --years 6 --seed 0
+"""
+import argparse
+import logging
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from functools import partial
+from random import Random
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.bulk_load import (
+    IteratorFile,
+    copy_csv,
+    drop_foreign_keys,
+    drop_indexes,
+    reset_sequences,
+)
+from app.db.session import SessionLocal
+from app.models.car import AcType, CarType, DriveType, FuelType, GearboxType
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TABLES = ["car", "customer", "reservation", "rental"]
+CAR_COLUMNS = [
+    "id",
+    "model_name",
+    "type",
+    "fuel_type",
+    "gearbox_type",
+    "ac_type",
+    "number_of_passengers",
+    "drive_type",
+    "average_consumption",
+    "number_of_airbags",
+    "price_per_day",
+    "deposit_amount",
+    "loading_capacity",
+    "horsepower",
+]
+CUSTOMER_COLUMNS = ["id", "full_name", "address", "phone_number"]
+RESERVATION_COLUMNS = [
+    "id",
+    "car_id",
+    "customer_id",
+    "start_date",
+    "end_date",
+    "status",
+]
+RENTAL_COLUMNS = [
+    "id",
+    "car_id",
+    "customer_id",
+    "reservation_id",
+    "start_date",
+    "end_date",
+    "status",
+]
+
+# days after now covered by bookings (new reservations)
+FUTURE_DAYS = 90
+# last calendar day of a booking is at most MAX_BOOKING_DAYS after its first day
+MAX_BOOKING_DAYS = 14
+# shares of past bookings which are cancelled reservations and walk-in rentals
+CANCELLED_SHARE = 0.1
+WALK_IN_SHARE = 0.2
+
+# (start date, end date, customer index, reservation status, rental status),
+# booking has a reservation, a rental or both (rental created from reservation)
+Booking = Tuple[datetime, datetime, int, Optional[str], Optional[str]]
+
+
+def generate_bookings(
+    car_index: int,
+    *,
+    seed: int,
+    customers: int,
+    bookings_per_car: int,
+    first_day: date,
+    days: int,
+    now: datetime,
+) -> Iterator[Booking]:
+    """
+    Yields bookings of a car ordered by date. Timeline is split into equal slots,
+    one booking on days of each slot, so bookings never share a calendar day
+    """
+    # random() scaled to ranges is several times faster than randrange()
+    random = Random(f"{seed}:bookings:{car_index}").random
+    for slot in range(bookings_per_car):
+        first_slot_day = slot * days // bookings_per_car
+        slot_days = (slot + 1) * days // bookings_per_car - first_slot_day
+        offset = int(random() * slot_days)
+        length = int(random() * min(slot_days - offset, MAX_BOOKING_DAYS + 1))
+        start_day = first_day + timedelta(days=first_slot_day + offset)
+        start = datetime(
+            start_day.year,
+            start_day.month,
+            start_day.day,
+            8 + int(random() * 5),
+            30 * int(random() * 2),
+            tzinfo=pytz.UTC,
+        )
+        end = start.replace(hour=13 + int(random() * 8)) + timedelta(days=length)
+        customer = int(random() * customers)
+
+        if start > now:
+            yield start, end, customer, "NEW", None
+        elif end >= now:
+            walk_in = random() < WALK_IN_SHARE
+            yield start, end, customer, None if walk_in else "COLLECTED", "IN_PROGRESS"
+        else:
+            share = random()
+            if share < CANCELLED_SHARE:
+                yield start, end, customer, "CANCELLED", None
+            elif share < CANCELLED_SHARE + WALK_IN_SHARE:
+                yield start, end, customer, None, "COMPLETED"
+            else:
+                yield start, end, customer, "COLLECTED", "COMPLETED"
+
+
+def _csv(*values: object) -> str:
+    # generated values contain no separators or quotes
+    return ",".join("" if value is None else str(value) for value in values) + "\n"
+
+
+def _car_rows(seed: int, cars: int, first_id: int) -> Iterator[str]:
+    rng = Random(f"{seed}:cars")
+    for index in range(cars):
+        car_type = rng.choice(list(CarType))
+        yield _csv(
+            first_id + index,
+            f"Model {rng.randrange(200)}",
+            car_type.name,
+            rng.choice(list(FuelType)).name,
+            rng.choice(list(GearboxType)).name,
+            rng.choice(list(AcType)).name,
+            rng.choice((2, 4, 5, 7, 9)),
+            rng.choice(list(DriveType)).name,
+            round(rng.uniform(3, 15), 1),
+            rng.choice((2, 4, 6, 8)),
+            f"{rng.randrange(50, 1000)}.00",
+            f"{rng.randrange(0, 5000, 500)}.00",
+            rng.randrange(500, 5000) if car_type == CarType.TRUCK else None,
+            rng.randrange(250, 700) if car_type == CarType.SPORT else None,
+        )
+
+
+def _customer_rows(seed: int, customers: int, first_id: int) -> Iterator[str]:
+    rng = Random(f"{seed}:customers")
+    for index in range(customers):
+        yield _csv(
+            first_id + index,
+            f"Customer {first_id + index}",
+            f"ul. Testowa {rng.randrange(1, 200)} Szczecin",
+            f"{rng.randrange(100000000, 1000000000)}",
+        )
+
+
+def _booking_rows(
+    cars: int,
+    first_ids: Dict[str, int],
+    bookings: Callable[[int], Iterator[Booking]],
+    rentals_file: IO[bytes],
+) -> Iterator[str]:
+    """
+    Yields reservation rows car by car, rental rows of the same bookings
+    are written to rentals_file (they are copied after reservations)
+    """
+    reservation_id = first_ids["reservation"]
+    rental_id = first_ids["rental"]
+    for car_index in range(cars):
+        car_id = first_ids["car"] + car_index
+        reservations: List[str] = []
+        rentals: List[str] = []
+        for start, end, customer, reservation_status, rental_status in bookings(
+            car_index
+        ):
+            customer_id = first_ids["customer"] + customer
+            start_date, end_date = start.isoformat(), end.isoformat()
+            booking_reservation_id = None
+            if reservation_status:
+                booking_reservation_id = reservation_id
+                reservations.append(
+                    _csv(
+                        reservation_id,
+                        car_id,
+                        customer_id,
+                        start_date,
+                        end_date,
+                        reservation_status,
+                    )
+                )
+                reservation_id += 1
+            if rental_status:
+                rentals.append(
+                    _csv(
+                        rental_id,
+                        car_id,
+                        customer_id,
+                        booking_reservation_id,
+                        start_date,
+                        end_date,
+                        rental_status,
+                    )
+                )
+                rental_id += 1
+        rentals_file.write("".join(rentals).encode())
+        yield "".join(reservations)
+
+
+def generate(
+    db: Session,
+    *,
+    cars: int,
+    customers: int,
+    bookings_per_car: int,
+    years: float,
+    seed: int,
+    now: datetime,
+    replace: bool = False,
+) -> Dict[str, int]:
+    """
+    Writes generated dataset in a single transaction, ids continue after
+    existing rows (unless replace deletes them). Returns numbers of rows by table
+    """
+    days = round(years * 365) + FUTURE_DAYS
+    if bookings_per_car > days:
+        raise ValueError(f"At most {days} bookings per car fit in {years} years")
+
+    generated: Dict[str, int] = {}
+    try:
+        db.execute(text("SET LOCAL maintenance_work_mem = '256MB'"))
+        if replace:
+            truncated = ", ".join(f'"{table}"' for table in TABLES)
+            db.execute(text(f"TRUNCATE {truncated} CASCADE"))
+        definitions = drop_indexes(db, TABLES) + drop_foreign_keys(db, TABLES)
+
+        first_ids = {
+            table: db.execute(
+                text(f'SELECT coalesce(max(id), 0) + 1 FROM "{table}"')
+            ).scalar()
+            for table in TABLES
+        }
+        bookings = partial(
+            generate_bookings,
+            seed=seed,
+            customers=customers,
+            bookings_per_car=bookings_per_car,
+            first_day=now.date() - timedelta(days=days - FUTURE_DAYS),
+            days=days,
+            now=now,
+        )
+        sources = {
+            "car": (CAR_COLUMNS, _car_rows(seed, cars, first_ids["car"])),
+            "customer": (
+                CUSTOMER_COLUMNS,
+                _customer_rows(seed, customers, first_ids["customer"]),
+            ),
+        }
+        for table, (columns, rows) in sources.items():
+            generated[table] = copy_csv(db, table, columns, IteratorFile(rows))
+            logger.info(f"Generated {generated[table]} rows of {table}")
+
+        # rentals reference reservations, they are generated together
+        # and rentals are kept on disk until reservations are copied
+        with tempfile.TemporaryFile() as rentals_file:
+            reservations = _booking_rows(cars, first_ids, bookings, rentals_file)
+            generated["reservation"] = copy_csv(
+                db, "reservation", RESERVATION_COLUMNS, IteratorFile(reservations)
+            )
+            logger.info(f"Generated {generated['reservation']} rows of reservation")
+            rentals_file.seek(0)
+            generated["rental"] = copy_csv(db, "rental", RENTAL_COLUMNS, rentals_file)
+            logger.info(f"Generated {generated['rental']} rows of rental")
+
+        for definition in definitions:
+            db.execute(text(definition))
+        reset_sequences(db, TABLES)
+        for table in TABLES:
+            db.execute(text(f'ANALYZE "{table}"'))
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return generated
+
+
+def run(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        started_at = time.perf_counter()
+        generate(
+            db,
+            cars=args.cars,
+            customers=args.customers,
+            bookings_per_car=args.bookings_per_car,
+            years=args.years,
+            seed=args.seed,
+            now=args.now,
+            replace=args.replace,
+        )
+        logger.info(f"Dataset generated in {time.perf_counter() - started_at:.2f} s")
+    finally:
+        db.close()
+
+
+def main() -> None:
+    today = datetime.now(tz=pytz.UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--cars", type=int, default=1000)
+    parser.add_argument("--customers", type=int, default=100000)
+    parser.add_argument("--bookings-per-car", type=int, default=500)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--now",
+        type=lambda value: datetime.fromisoformat(value).replace(tzinfo=pytz.UTC),
+        default=today,
+        help="date bookings are in the past or future of (default today),"
+        " fix it to generate the same dataset on other days",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="delete existing cars, customers and bookings first",
+    )
+    args = parser.parse_args()
+
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Generates load of a rental desk's traffic mix and reports throughput and latency.
+
+Worker threads send a weighted mix of car searches (/cars/query with
+availability_dates), reservations, conversions of these reservations to rentals,
+returns of the rentals and logins. Stages are run at every --rate (requests per
+second, 0 sends as fast as the workers can), latency of paced requests is measured
+from the time they were due, so it grows once the server is saturated. Booking
+collisions (ReservationCollisionException, RentalCollisionException) are counted
+apart from errors.
+
+Without --url the app is served in-process by a single uvicorn worker, point
+--url to a server started separately to measure N workers. Bookings made by
+the load test are kept, run it on a disposable (generated) dataset:
+
+    python -m app.benchmarks.load_test --rate 20 50 100 --concurrency 16
+    gunicorn app.main:app -k uvicorn.workers.UvicornWorker -w 4 &
+    python -m app.benchmarks.load_test --url http://127.0.0.1:8000 --rate 200
+"""
+import argparse
+import asyncio
+import logging
+import socket
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import count
+from random import Random
+from typing import Any, Callable, Deque, Dict, Iterator, List, Tuple
+
+import pytz
+import requests
+import uvicorn
+
+from app.benchmarks.api_hot_paths import percentile
+from app.core import query_stats
+from app.core.config import settings
+from app.exceptions.rental import RentalCollisionException
+from app.exceptions.reservation import ReservationCollisionException
+from app.main import app
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+# request logs of the app served in-process, N+1 warnings are kept
+logging.getLogger(query_stats.__name__).setLevel(logging.WARNING)
+
+# relative weights of operations in the traffic mix
+MIX = {"search": 60, "reserve": 15, "convert": 10, "return": 10, "login": 5}
+
+# bookings start within BOOKING_DAYS from now and last up to MAX_BOOKING_DAYS
+BOOKING_DAYS = 60
+MAX_BOOKING_DAYS = 3
+
+OK = "ok"
+ERROR = "error"
+COLLISIONS = {
+    ReservationCollisionException().detail: "reservation_collision",
+    RentalCollisionException().detail: "rental_collision",
+}
+
+
+class LoadStats:
+    """
+    Thread-safe latencies and outcomes of requests by operation
+    """
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.outcomes: Dict[str, Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, latency: float, outcome: str) -> None:
+        with self._lock:
+            self.latencies[operation].append(latency)
+            self.outcomes[operation][outcome] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Returns throughput (requests/s) and, by operation, number of requests,
+        p50/p90/p99 latency (ms) and rates of outcomes other than success
+        """
+        operations: Dict[str, Dict[str, float]] = {}
+        for operation, latencies in sorted(self.latencies.items()):
+            outcomes = self.outcomes[operation]
+            operations[operation] = {
+                "requests": len(latencies),
+                **{
+                    f"p{percent}_ms": round(percentile(latencies, percent) * 1000, 1)
+                    for percent in (50, 90, 99)
+                },
+                **{
+                    f"{outcome}_rate": round(outcomes[outcome] / len(latencies), 4)
+                    for outcome in [ERROR, *COLLISIONS.values()]
+                    if outcomes[outcome]
+                },
+            }
+        requests_total = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "throughput": round(requests_total / elapsed, 1),
+            "operations": operations,
+        }
+
+
+class RentalDesk:
+    """
+    Sends operations of the traffic mix, bookings made are converted
+    and returned by later operations
+    """
+
+    def __init__(
+        self,
+        url: str,
+        car_ids: List[int],
+        customer_ids: List[int],
+        mix: Dict[str, int],
+        stats: LoadStats,
+    ):
+        self.url = url + settings.API_V1_STR
+        self.car_ids = car_ids
+        self.customer_ids = customer_ids
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.stats = stats
+        self.reservations: Deque[Dict[str, Any]] = deque()
+        self.rentals: Deque[Dict[str, Any]] = deque()
+        self.headers: Dict[str, str] = {}
+
+    def authenticate(self, session: requests.Session) -> None:
+        response = self.login(session, Random())
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def login(self, session: requests.Session, rng: Random) -> requests.Response:
+        return session.post(
+            f"{self.url}/login/access-token",
+            data={
+                "username": settings.FIRST_SUPERUSER,
+                "password": settings.FIRST_SUPERUSER_PASSWORD,
+            },
+        )
+
+    def search(self, session: requests.Session, rng: Random) -> requests.Response:
+        start, end = self._dates(rng)
+        return session.post(
+            f"{self.url}/cars/query",
+            json={"availability_dates": {"start": start, "end": end}},
+            headers=self.headers,
+        )
+
+    def reserve(self, session: requests.Session, rng: Random) -> requests.Response:
+        start, end = self._dates(rng)
+        response = session.post(
+            f"{self.url}/reservations/",
+            json={
+                "car_id": rng.choice(self.car_ids),
+                "customer_id": rng.choice(self.customer_ids),
+                "start_date": start,
+                "end_date": end,
+                "status": "NEW",
+            },
+            headers=self.headers,
+        )
+        if response.ok:
+            self.reservations.append(response.json())
+        return response
+
+    def convert(self, session: requests.Session, rng: Random) -> requests.Response:
+        reservation = self.reservations.popleft()
+        response = session.post(
+            f"{self.url}/rentals/",
+            json={
+                "car_id": reservation["car_id"],
+                "customer_id": reservation["customer_id"],
+                "reservation_id": reservation["id"],
+                "start_date": reservation["start_date"],
+                "end_date": reservation["end_date"],
+                "status": "IN_PROGRESS",
+            },
+            headers=self.headers,
+        )
+        if response.ok:
+            self.rentals.append(response.json())
+        return response
+
+    def return_(self, session: requests.Session, rng: Random) -> requests.Response:
+        rental = self.rentals.popleft()
+        return session.put(
+            f"{self.url}/rentals/{rental['id']}",
+            json={
+                "car_id": rental["car_id"],
+                "customer_id": rental["customer_id"],
+                "reservation_id": rental["reservation_id"],
+                "start_date": rental["start_date"],
+                "end_date": rental["end_date"],
+                "status": "COMPLETED",
+            },
+            headers=self.headers,
+        )
+
+    def send(self, session: requests.Session, rng: Random) -> Tuple[str, str]:
+        """
+        Sends a random operation, returns its name and outcome. Until there are
+        bookings to convert or return, reservations are made instead
+        """
+        operation = rng.choices(self.operations, self.weights)[0]
+        if (operation == "convert" and not self.reservations) or (
+            operation == "return" and not self.rentals
+        ):
+            operation = "reserve"
+        send: Callable[[requests.Session, Random], requests.Response] = getattr(
+            self, "return_" if operation == "return" else operation
+        )
+        try:
+            response = send(session, rng)
+        except IndexError:
+            # booking taken by another worker in the meantime
+            return self.send(session, rng)
+
+        return operation, outcome(response)
+
+    def _dates(self, rng: Random) -> Tuple[str, str]:
+        today = datetime.now(tz=pytz.UTC).replace(hour=0, minute=0, second=0)
+        start = today + timedelta(days=rng.randint(1, BOOKING_DAYS), hours=10)
+        end = start + timedelta(days=rng.randint(0, MAX_BOOKING_DAYS), hours=8)
+        return start.isoformat(), end.isoformat()
+
+
+def outcome(response: requests.Response) -> str:
+    """
+    Returns outcome of a booking request, 400 responses other than collisions
+    (including bodies that are not JSON, e.g. of a proxy) are errors
+    """
+    if response.ok:
+        return OK
+    if response.status_code != 400:
+        return ERROR
+    try:
+        body = response.json()
+    except ValueError:
+        return ERROR
+    detail = body.get("detail") if isinstance(body, dict) else None
+    return COLLISIONS.get(detail, ERROR) if isinstance(detail, str) else ERROR
+
+
+def get_ids(
+    session: requests.Session, url: str, headers: Dict[str, str], limit: int
+) -> List[int]:
+    response = session.get(url, params={"limit": limit}, headers=headers)
+    response.raise_for_status()
+    return [item["id"] for item in response.json()["items"]]
+
+
+def run_stage(
+    desk: RentalDesk, rate: float, concurrency: int, duration: float, seed: int
+) -> Dict[str, Any]:
+    """
+    Sends the traffic mix for duration seconds, paced at rate requests
+    per second (if not 0) by concurrency workers. Returns summary of the stage
+    """
+    desk.stats = LoadStats()
+    slots = count()
+    started_at = time.perf_counter()
+    ends_at = started_at + duration
+
+    def work(worker: int) -> None:
+        rng = Random(f"{seed}:{worker}")
+        with requests.Session() as session:
+            while True:
+                due_at = started_at + next(slots) / rate if rate else None
+                if due_at:
+                    time.sleep(max(due_at - time.perf_counter(), 0))
+                sent_at = time.perf_counter()
+                if sent_at >= ends_at:
+                    return
+                operation, outcome = desk.send(session, rng)
+                desk.stats.record(
+                    operation, time.perf_counter() - (due_at or sent_at), outcome
+                )
+
+    workers = [
+        threading.Thread(target=work, args=(worker,)) for worker in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return desk.stats.summary(time.perf_counter() - started_at)
+
+
+@contextmanager
+def serve_app() -> Iterator[str]:
+    """
+    Serves the app by uvicorn in a thread, yields its URL
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    host, port = sock.getsockname()
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    # signals can only be handled in the main thread
+    server.install_signal_handlers = lambda: None  # type: ignore
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve([sock])))
+    thread.start()
+    try:
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("Server failed to start")
+            time.sleep(0.05)
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+        sock.close()
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """
+    Parses mix given as comma separated operation=weight pairs
+    """
+    mix = {}
+    for pair in value.split(","):
+        operation, _, weight = pair.partition("=")
+        if operation not in MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation {operation}")
+        mix[operation] = int(weight)
+    return mix
+
+
+def run(args: argparse.Namespace, url: str) -> None:
+    with requests.Session() as session:
+        desk = RentalDesk(url, [], [], args.mix, LoadStats())
+        desk.authenticate(session)
+        desk.car_ids = get_ids(session, f"{desk.url}/cars/", desk.headers, args.cars)
+        desk.customer_ids = get_ids(
+            session, f"{desk.url}/customers/", desk.headers, settings.MAX_PAGE_SIZE
+        )
+    if not desk.car_ids or not desk.customer_ids:
+        raise RuntimeError("There must be cars and customers to book")
+
+    for rate in args.rate:
+        summary = run_stage(desk, rate, args.concurrency, args.duration, args.seed)
+        target = f"{rate:g} req/s" if rate else "unlimited"
+        logger.info(
+            f"Target {target}, {args.concurrency} workers:"
+            f" {summary['throughput']} req/s"
+        )
+        for operation, stats in summary["operations"].items():
+            logger.info(f"  {operation}: {stats}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--url", help="base URL of a running server (default serves the app)"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        nargs="+",
+        default=[0],
+        help="target requests per second of each stage, 0 is unlimited",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds per stage")
+    parser.add_argument(
+        "--cars",
+        type=int,
+        default=settings.MAX_PAGE_SIZE,
+        help="number of cars booked, fewer cars collide more often",
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=MIX,
+        help="operation=weight pairs, default "
+        + ",".join(f"{operation}={weight}" for operation, weight in MIX.items()),
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.url:
+        run(args, args.url)
+    else:
+        with serve_app() as url:
+            run(args, url)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+import os
 import secrets
+import tempfile
 from typing import Any, Dict, List, Optional, Union
 
 from dotenv import find_dotenv, load_dotenv
@@ -14,6 +16,18 @@ class Settings(BaseSettings):
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
 
+    # authenticated users (and decoded tokens) cached by every worker process,
+    # changes of a user made by other processes are seen after the TTL at the latest
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
+    # bcrypt runs in a dedicated process pool, hashes with a different cost factor
+    # are rehashed on login. Requests over workers + queue size are rejected (503),
+    # keep it well below the size of the request threadpool
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASHING_WORKERS: int = 2
+    PASSWORD_HASHING_QUEUE_SIZE: int = 8
+
     # BACKEND_CORS_ORIGINS is a JSON-formatted list of origins
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
@@ -43,6 +57,95 @@ class Settings(BaseSettings):
             path=f"/{values.get('POSTGRES_DB') or ''}",
         )
 
+    # connection pool of each worker process, a request holds one connection
+    # at a time, so size + overflow should cover the threadpool of sync endpoints.
+    # Checkouts wait up to DB_POOL_TIMEOUT seconds, connections older than
+    # DB_POOL_RECYCLE seconds are replaced (-1 never). Pre-ping tests connections
+    # on every checkout (a round trip), without it dropped connections fail
+    # the statement using them and the pool is invalidated
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = True
+
+    # same database through asyncpg. With ASYNC_DB_ENDPOINTS, hot read endpoints
+    # (lists of cars, rentals and reservations, car search) use it in the event
+    # loop, their concurrency is bounded by the pool (size + overflow) instead of
+    # the threadpool. By default they use sync sessions in the threadpool
+    ASYNC_DB_ENDPOINTS: bool = False
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+    ASYNC_DB_POOL_SIZE: int = 10
+    ASYNC_DB_MAX_OVERFLOW: int = 10
+
+    @validator("SQLALCHEMY_ASYNC_DATABASE_URI", pre=True)
+    def assemble_async_db_connection(
+        cls, v: Optional[str], values: Dict[str, Any]
+    ) -> Any:
+        if isinstance(v, str):
+            return v
+        sync_uri = values.get("SQLALCHEMY_DATABASE_URI") or ""
+        return "postgresql+asyncpg://" + sync_uri.split("://", 1)[-1]
+
+    # optional streaming replica serving endpoints that only read. For
+    # READ_PRIMARY_WINDOW_SECONDS after a write, the client (echoing
+    # X-Read-Primary-Until header) reads from primary, so it sees its own writes.
+    # Keep it above the usual replication lag
+    SQLALCHEMY_REPLICA_DATABASE_URI: Optional[str] = None
+    SQLALCHEMY_ASYNC_REPLICA_DATABASE_URI: Optional[str] = None
+    READ_PRIMARY_WINDOW_SECONDS: int = 5
+
+    @validator("SQLALCHEMY_ASYNC_REPLICA_DATABASE_URI", pre=True)
+    def assemble_async_replica_db_connection(
+        cls, v: Optional[str], values: Dict[str, Any]
+    ) -> Any:
+        if isinstance(v, str):
+            return v
+        replica_uri = values.get("SQLALCHEMY_REPLICA_DATABASE_URI")
+        if not replica_uri:
+            return None
+        return "postgresql+asyncpg://" + replica_uri.split("://", 1)[-1]
+
+    # keyset pagination of list endpoints
+    DEFAULT_PAGE_SIZE: int = 100
+    MAX_PAGE_SIZE: int = 1000
+
+    # resized car images, cached on disk and generated by a process pool. Images
+    # over IMAGE_VARIANTS_QUEUE_SIZE waiting or being resized are not scheduled
+    CAR_IMAGE_VARIANTS_DIR: str = os.path.join(
+        tempfile.gettempdir(), "car_image_variants"
+    )
+    IMAGE_WORKERS: int = 2
+    IMAGE_VARIANTS_QUEUE_SIZE: int = 32
+
+    # POST /cars/bulk and POST /customers/bulk, invalid rows reported at most
+    BULK_IMPORT_MAX_ROWS: int = 100000
+    BULK_IMPORT_MAX_BYTES: int = 64 * 1024 * 1024
+    BULK_IMPORT_MAX_ERRORS: int = 100
+
+    # rows fetched from server-side cursor (and sent) at once by export endpoints
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # rows updated (and locked) by a single statement of the missed reservations job
+    CANCEL_MISSED_RESERVATIONS_BATCH_SIZE: int = 1000
+
+    # requests executing the same statement more than this many times (N+1 queries)
+    # are logged as warnings, None disables the check
+    QUERY_REPEAT_WARNING_THRESHOLD: Optional[int] = None
+
+    # requests of admins with X-Profile header are profiled, sampling their stacks
+    # every PROFILING_INTERVAL seconds. Profiles are kept in PROFILES_DIR, older
+    # ones are removed when there are more than PROFILES_MAX_COUNT
+    PROFILING_INTERVAL: float = 0.001
+    PROFILES_DIR: str = os.path.join(tempfile.gettempdir(), "profiles")
+    PROFILES_MAX_COUNT: int = 100
+
+    # share of requests traced (0 disables tracing), spans of the route handler,
+    # services, validators and SQL statements are written as OTLP JSON lines
+    # to TRACING_EXPORT_PATH (None is stdout)
+    TRACING_SAMPLE_RATE: float = 0
+    TRACING_EXPORT_PATH: Optional[str] = None
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"  # type: ignore
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
@@ -0,0 +1,139 @@
+"""
+Fixed-size variants of car images. They are generated in a process pool,
+off the request path, and cached on disk by hash of the source image.
+An image is scheduled at most once at a time and not again after its
+generation failed, at most IMAGE_VARIANTS_QUEUE_SIZE images are queued.
+"""
+import enum
+import functools
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ImageVariant(str, enum.Enum):
+    THUMBNAIL = "thumbnail"
+    PREVIEW = "preview"
+
+
+# bounding boxes, aspect ratio of source image is kept
+VARIANT_SIZES: Dict[ImageVariant, Tuple[int, int]] = {
+    ImageVariant.THUMBNAIL: (500, 250),
+    ImageVariant.PREVIEW: (1000, 500),
+}
+VARIANT_CONTENT_TYPE = "image/jpeg"
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+# hashes of images being generated (or waiting for a worker) and of images
+# whose generation failed, requests of their variants don't submit them again
+_pending: Set[str] = set()
+_failed: Set[str] = set()
+
+
+def variant_path(image_hash: str, variant: ImageVariant) -> Path:
+    return (
+        Path(settings.CAR_IMAGE_VARIANTS_DIR)
+        / image_hash[:2]
+        / f"{image_hash}_{variant.value}.jpg"
+    )
+
+
+def get_variant(image_hash: str, variant: ImageVariant) -> Optional[bytes]:
+    """
+    Returns cached variant of image or None if it's not generated (yet)
+    """
+    try:
+        return variant_path(image_hash, variant).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def generate_variants(image_hash: str, data: bytes) -> None:
+    """
+    Generates missing variants of image, runs in worker process
+    """
+    for variant, size in VARIANT_SIZES.items():
+        path = variant_path(image_hash, variant)
+        if path.exists():
+            continue
+
+        image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+        image.thumbnail(size, Image.LANCZOS)
+        if image.mode in ("RGBA", "LA", "P"):
+            # JPEG has no transparency, flatten on white background
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        else:
+            image = image.convert("RGB")
+
+        # written under temporary name and renamed, so readers never see partial files
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, "JPEG", quality=85, optimize=True, progressive=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def _variants_done(image_hash: str, future: Future) -> None:
+    exception = future.exception()
+    with _lock:
+        _pending.discard(image_hash)
+        if exception:
+            _failed.add(image_hash)
+    if exception:
+        logger.error(
+            f"Generating variants of image {image_hash} failed", exc_info=exception
+        )
+
+
+def schedule_variants(image_hash: str, data: bytes) -> Optional[Future]:
+    """
+    Submits generation of image variants to the process pool. Returns None
+    if the image is already scheduled, failed before or the queue is full
+    """
+    global _executor
+    with _lock:
+        if image_hash in _pending or image_hash in _failed:
+            return None
+        if len(_pending) >= settings.IMAGE_VARIANTS_QUEUE_SIZE:
+            # variants of requested images are scheduled again by later requests
+            logger.warning(f"Image variants queue is full, {image_hash} skipped")
+            return None
+        if _executor is None:
+            # spawned (not forked) workers don't inherit threads and connections
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        _pending.add(image_hash)
+        future = _executor.submit(generate_variants, image_hash, data)
+
+    future.add_done_callback(functools.partial(_variants_done, image_hash))
+    return future
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
@@ -0,0 +1,42 @@
+"""
+Leases of scheduled jobs. Every instance (uvicorn worker, replica) schedules
+the same jobs, the lease makes sure that only one of them runs each job per tick.
+"""
+import os
+import socket
+from datetime import timedelta
+
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import JobLease
+
+HOLDER = f"{socket.gethostname()}:{os.getpid()}"
+
+# lease expires a bit before the next tick, so that timer jitter doesn't skip it
+LEASE_FRACTION_OF_PERIOD = 0.9
+
+
+def acquire_job_lease(db: Session, name: str, period: timedelta) -> bool:
+    """
+    Returns True if job's lease was free and now belongs to this instance
+    for (almost) one period of the job, False if other instance runs the job
+    in this tick. A single statement, committed right away
+    """
+    next_run_at = func.now() + literal(period * LEASE_FRACTION_OF_PERIOD)
+    statement = insert(JobLease).values(
+        name=name, next_run_at=next_run_at, holder=HOLDER
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[JobLease.name],
+        set_={
+            "next_run_at": statement.excluded.next_run_at,
+            "holder": statement.excluded.holder,
+        },
+        where=JobLease.next_run_at <= func.now(),
+    ).returning(JobLease.name)
+
+    acquired = db.execute(statement).first() is not None
+    db.commit()
+    return acquired
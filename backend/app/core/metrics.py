@@ -0,0 +1,274 @@
+"""
+In-process metrics rendered in Prometheus text exposition format (GET /metrics).
+Values are local to a worker process, so every worker must be scraped on its own.
+Deployments run a single worker per pod, trading the cores of a pod for correct
+metrics: capacity is scaled with replicas (see k8s/backend-deployment.yaml).
+"""
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.query_stats import current_stats
+
+# label values of a sample, in order of labelnames of its metric
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        for value in values
+    )
+    return (
+        "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+    )
+
+
+class Metric:
+    """
+    Thread-safe values of a metric by label values. Values of metrics with
+    a function are not stored, they are returned by the function when rendered
+    """
+
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], Dict[Labels, float]]] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def _labels(self, labels: Dict[str, object]) -> Labels:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        """
+        Yields (name suffix, label values, value) of every sample
+        """
+        if self.function:
+            values = self.function()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield "", labels, value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for suffix, labels, value in self.samples():
+            names = self.labelnames + (("le",) if suffix == "_bucket" else ())
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, labels)}"
+                f" {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        with self._lock:
+            self._values[self._labels(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+        # observations of every bucket (not cumulative) and their sum by labels
+        self._observations: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._labels(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._observations.setdefault(
+                key, ([0] * len(self.buckets), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        with self._lock:
+            observations = {
+                key: (list(counts), total[0])
+                for key, (counts, total) in self._observations.items()
+            }
+        for labels, (counts, total) in sorted(observations.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield "_bucket", labels + (_format_value(bound),), cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time of serving HTTP requests, until the whole response is sent",
+        ["method", "route", "status"],
+    )
+)
+requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests being served")
+)
+request_queries = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "SQL statements executed by HTTP requests",
+        ["method", "route"],
+        buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+    )
+)
+http_exceptions = registry.register(
+    Counter(
+        "http_exceptions_total",
+        "HTTP exceptions raised by endpoints (e.g. booking collisions), by type",
+        ["exception"],
+    )
+)
+password_hashing_duration = registry.register(
+    Histogram(
+        "password_hashing_duration_seconds",
+        "Time of hashing and verifying passwords, waiting for a worker included",
+        ["operation"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    )
+)
+cancel_missed_reservations_duration = registry.register(
+    Histogram(
+        "cancel_missed_reservations_duration_seconds",
+        "Time of runs of the missed reservations job",
+    )
+)
+cancelled_missed_reservations = registry.register(
+    Counter(
+        "cancel_missed_reservations_cancelled_total",
+        "Reservations cancelled by the missed reservations job",
+    )
+)
+
+
+def route_path(scope: Scope) -> str:
+    """
+    Returns path template of the route serving the request (e.g. /cars/{id}),
+    concrete paths would make a time series of every id
+    """
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records duration, number of SQL statements and concurrency of requests
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = time.perf_counter()
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_flight.dec()
+            method, route = scope["method"], route_path(scope)
+            request_duration.observe(
+                time.perf_counter() - started_at,
+                method=method,
+                route=route,
+                status=status_code,
+            )
+            stats = current_stats()
+            if stats is not None:
+                request_queries.observe(stats.count, method=method, route=route)
@@ -0,0 +1,137 @@
+"""
+Sampling profiler of single requests. Stacks of the threads working on the request
+(the event loop while it runs the request's task, threadpool threads running
+functions submitted from the request's context) are sampled by a thread of the
+profiler, time the request spends awaiting I/O in the event loop is not sampled.
+Profiles are written in collapsed stack format ("frame;frame;frame count" lines)
+read by flamegraph.pl, speedscope and other flame graph tools.
+"""
+import asyncio
+import contextvars
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures.thread import _WorkItem  # type: ignore
+from pathlib import Path
+from types import FrameType
+from typing import List, Optional
+
+_profiler: contextvars.ContextVar[
+    Optional["SamplingProfiler"]
+] = contextvars.ContextVar("request_profiler", default=None)
+
+# frames of threadpool threads running a submitted function
+_WORK_ITEM_CODE = _WorkItem.run.__code__
+
+# while profiling, threads holding the GIL are asked to release it every
+# sampling interval (instead of every 5 ms), so that the sampler gets to run
+_switch_interval_lock = threading.Lock()
+_active_profilers = 0
+_switch_interval = sys.getswitchinterval()
+
+
+def _profiling_started(interval: float) -> None:
+    global _active_profilers, _switch_interval
+    with _switch_interval_lock:
+        if not _active_profilers:
+            _switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(interval, _switch_interval))
+        _active_profilers += 1
+
+
+def _profiling_stopped() -> None:
+    global _active_profilers
+    with _switch_interval_lock:
+        _active_profilers -= 1
+        if not _active_profilers:
+            sys.setswitchinterval(_switch_interval)
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    name = f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+    # ";" separates frames of collapsed stacks
+    return name.replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Samples stacks of the threads working on the current request every interval
+    seconds, from start() until stop(). Has to be started in the request's task
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_event_loop()
+        self._task = asyncio.current_task()
+        self._loop_thread_id = threading.get_ident()
+        # inherited by contexts copied for the threadpool
+        self._token = _profiler.set(self)
+        _profiling_started(self.interval)
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self.started_at
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            _profiling_stopped()
+        if self._token:
+            _profiler.reset(self._token)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        own_thread_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread_id:
+                continue
+            if thread_id == self._loop_thread_id:
+                if asyncio.current_task(self._loop) is self._task:
+                    self._record("event loop", frame)
+            elif self._runs_request_work(frame):
+                self._record("threadpool", frame)
+
+    def _runs_request_work(self, frame: Optional[FrameType]) -> bool:
+        # run_in_threadpool submits Context.run of a context copied in the request
+        while frame is not None:
+            if frame.f_code is _WORK_ITEM_CODE:
+                function = getattr(frame.f_locals.get("self"), "fn", None)
+                context = getattr(function, "__self__", None)
+                return (
+                    isinstance(context, contextvars.Context)
+                    and context.get(_profiler) is self
+                )
+            frame = frame.f_back
+        return False
+
+    def _record(self, thread: str, frame: Optional[FrameType]) -> None:
+        stack: List[str] = []
+        while frame is not None:
+            stack.append(_frame_name(frame))
+            frame = frame.f_back
+        stack.append(thread)
+        self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """
+        Returns samples in collapsed stack format
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.collapsed())
@@ -0,0 +1,196 @@
+"""
+Per-request SQL statistics. Statements executed on any engine while serving
+a request are counted and timed, totals are sent in X-Query-Count and
+Server-Timing response headers and logged with the request (fields of the log
+record, see REQUEST_LOG_FIELDS). Requests repeating one statement more than
+QUERY_REPEAT_WARNING_THRESHOLD times (N+1 queries) are logged as warnings.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# extra fields of request log records
+REQUEST_LOG_FIELDS = [
+    "method",
+    "path",
+    "status_code",
+    "query_count",
+    "db_time_ms",
+    "slowest_statement_ms",
+    "slowest_statement",
+]
+
+# key of Connection.info holding start times of executing statements
+STARTED_AT = "query_stats_started_at"
+
+
+class QueryStats:
+    """
+    Statements executed while serving a request
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements: Counter = Counter()
+        # sync endpoints execute in threadpool
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.statements[statement] += 1
+            if duration >= self.slowest_duration:
+                self.slowest_duration = duration
+                self.slowest_statement = statement
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Returns statements (bound parameters are not part of them) executed
+        more than threshold times, with their counts
+        """
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count > threshold
+        ]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """
+    Returns statistics of the request being served, None outside of requests
+    """
+    return _request_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    if _request_stats.get() is not None:
+        conn.info.setdefault(STARTED_AT, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    stats = _request_stats.get()
+    started_at = conn.info.get(STARTED_AT)
+    if stats is not None and started_at:
+        stats.record(statement, time.perf_counter() - started_at.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _statement_failed(exception_context: Any) -> None:
+    started_at = exception_context.connection.info.get(STARTED_AT)
+    if started_at:
+        started_at.pop()
+
+
+@contextmanager
+def count_queries(engines: Iterable[Engine]) -> Iterator[List[str]]:
+    """
+    Collects SQL statements executed on engines within the block, in any request
+    or thread (unlike request statistics)
+    """
+    statements: List[str] = []
+
+    def before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, *args: Any
+    ) -> None:
+        statements.append(statement)
+
+    # each engine once, replica engines are the primary ones without a replica
+    counted_engines = set(engines)
+    for engine in counted_engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for engine in counted_engines:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def log_request(scope: Scope, status_code: Optional[int], stats: QueryStats) -> None:
+    fields = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "status_code": status_code,
+        "query_count": stats.count,
+        "db_time_ms": round(stats.duration * 1000, 1),
+        "slowest_statement_ms": round(stats.slowest_duration * 1000, 1),
+        "slowest_statement": stats.slowest_statement,
+    }
+    logger.info(
+        f"{fields['method']} {fields['path']} {status_code}: {stats.count} queries"
+        f" in {fields['db_time_ms']} ms",
+        extra=fields,
+    )
+
+    threshold = settings.QUERY_REPEAT_WARNING_THRESHOLD
+    if threshold is None:
+        return
+    for statement, count in stats.repeated(threshold):
+        logger.warning(
+            f"{fields['method']} {fields['path']} executed the same statement"
+            f" {count} times: {statement}",
+            extra={**fields, "repeated_statement": statement, "repeat_count": count},
+        )
+
+
+class QueryStatsMiddleware:
+    """
+    Collects SQL statistics of requests, adds them to response headers and logs them
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        status_code = None
+
+        async def send_with_stats(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # statements of streamed bodies are only logged
+                headers = MutableHeaders(scope=message)
+                headers.append(QUERY_COUNT_HEADER, str(stats.count))
+                headers.append(SERVER_TIMING_HEADER, stats.server_timing())
+            await send(message)
+
+        token = _request_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _request_stats.reset(token)
+            log_request(scope, status_code, stats)
@@ -0,0 +1,70 @@
+"""
+Read-your-writes for endpoints served by a read replica. Responses to requests
+that committed a write carry a deadline until which the client reads from primary,
+clients echo it in requests (stateless, so it holds across workers and instances).
+"""
+import time
+from typing import Mapping
+
+from starlette.datastructures import MutableHeaders, State
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+READ_PRIMARY_UNTIL_HEADER = "X-Read-Primary-Until"
+
+
+def request_wrote(request_state: State) -> bool:
+    """
+    Returns True if request committed a write (set by UnitOfWorkRoute)
+    """
+    return getattr(request_state, "wrote", False)
+
+
+def read_primary_until() -> str:
+    """
+    Returns deadline (unix time) of reading from primary after a write
+    """
+    return str(int(time.time()) + settings.READ_PRIMARY_WINDOW_SECONDS)
+
+
+def reads_from_primary(headers: Mapping[str, str]) -> bool:
+    """
+    Returns True if request should read from primary, because its client wrote recently.
+    Deadlines later than a write made now would get are not issued by the server,
+    they are ignored, so that clients can't move their reads to primary for good
+    """
+    try:
+        deadline = float(headers.get(READ_PRIMARY_UNTIL_HEADER, 0))
+    except ValueError:
+        return False
+    now = time.time()
+    return now < deadline <= now + settings.READ_PRIMARY_WINDOW_SECONDS
+
+
+class ReadPrimaryAfterWriteMiddleware:
+    """
+    Adds read-from-primary deadline to responses of requests that committed a write
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # shared with Request.state of the endpoint
+        request_state = State(scope.setdefault("state", {}))
+
+        async def send_with_deadline(message: Message) -> None:
+            if message["type"] == "http.response.start" and request_wrote(
+                request_state
+            ):
+                MutableHeaders(scope=message).append(
+                    READ_PRIMARY_UNTIL_HEADER, read_primary_until()
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_deadline)
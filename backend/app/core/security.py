@@ -1,15 +1,39 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Callable, Optional, Tuple, TypeVar, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
+from app.core import metrics
 from app.core.config import settings
+from app.exceptions.password_hashing import PasswordHashingOverloadedException
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    # hashes with any other cost factor need update
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+_hashing_executor: Optional[ProcessPoolExecutor] = None
+_hashing_lock = threading.Lock()
+# hashing tasks running or waiting for a worker
+_hashing_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASHING_WORKERS + settings.PASSWORD_HASHING_QUEUE_SIZE
+)
+_hashing_queue_depth = 0
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
@@ -25,9 +49,96 @@ def create_access_token(
     return encoded_jwt
 
 
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _get_hashing_executor(
+    broken: Optional[ProcessPoolExecutor] = None,
+) -> ProcessPoolExecutor:
+    """
+    Returns password hashing process pool, which is created on first use
+    and recreated if it is the broken one
+    """
+    global _hashing_executor
+    with _hashing_lock:
+        if _hashing_executor is not None and _hashing_executor is broken:
+            _hashing_executor.shutdown(wait=False)
+            _hashing_executor = None
+        if _hashing_executor is None:
+            # spawned (not forked) workers don't inherit threads and connections
+            _hashing_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hashing_executor
+
+
+def _run_hashing(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Runs fn in password hashing process pool and waits for the result,
+    raises PasswordHashingOverloadedException if the pool's queue is full.
+    The pool breaks if a worker dies (e.g. killed when out of memory), then
+    it is recreated and fn is retried once
+    """
+    global _hashing_queue_depth
+    if not _hashing_slots.acquire(blocking=False):
+        raise PasswordHashingOverloadedException()
+
+    started_at = time.perf_counter()
+    with _hashing_lock:
+        _hashing_queue_depth += 1
+    try:
+        executor = _get_hashing_executor()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            executor = _get_hashing_executor(broken=executor)
+            return executor.submit(fn, *args).result()
+    finally:
+        with _hashing_lock:
+            _hashing_queue_depth -= 1
+        _hashing_slots.release()
+        metrics.password_hashing_duration.observe(
+            time.perf_counter() - started_at, operation=fn.__name__.strip("_")
+        )
+
+
+def password_hashing_queue_depth() -> int:
+    """
+    Returns number of password hashing tasks running or waiting for a worker
+    """
+    return _hashing_queue_depth
+
+
+def shutdown_password_hashing() -> None:
+    global _hashing_executor
+    with _hashing_lock:
+        if _hashing_executor is not None:
+            _hashing_executor.shutdown()
+            _hashing_executor = None
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    valid, _ = verify_and_update_password(plain_password, hashed_password)
+    return valid
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Returns whether password is valid and its new hash
+    if the current one has to be updated (e.g. cost factor has changed)
+    """
+    return _run_hashing(_verify_and_update, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _run_hashing(_hash, password)
@@ -0,0 +1,268 @@
+"""
+Lightweight tracing. A sampled share (TRACING_SAMPLE_RATE) of requests is traced,
+spans are opened for the route handler, service methods, validators and SQL
+statements, and every finished trace is written as a line of OTLP JSON
+(ExportTraceServiceRequest, as read by the collector's otlpjsonfile receiver)
+to TRACING_EXPORT_PATH or stdout. Outside of sampled traces, traced functions
+only look a context variable up.
+"""
+import functools
+import inspect
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SERVICE_NAME = "rentally-backend"
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_ERROR = 2
+
+# key of Connection.info holding spans of executing statements
+SPANS = "tracing_spans"
+
+
+class Trace:
+    """
+    Spans of a sampled trace, they are exported when its root span ends
+    """
+
+    def __init__(self) -> None:
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List["Span"] = []
+        # spans end in threadpool threads as well
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span") -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+class Span:
+    def __init__(
+        self,
+        trace: Trace,
+        parent: Optional["Span"],
+        name: str,
+        kind: int,
+        attributes: Dict[str, Any],
+    ):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_time = time.time_ns()
+        self.end_time = 0
+        self.error: Optional[str] = None
+
+    def end(self, exception: Optional[BaseException] = None) -> None:
+        self.end_time = time.time_ns()
+        if exception is not None:
+            self.error = str(exception) or type(exception).__name__
+            self.attributes["exception.type"] = type(exception).__name__
+        self.trace.add(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            # 64-bit integers are strings in OTLP JSON
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.error is not None:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    """
+    Returns trace as OTLP ExportTraceServiceRequest
+    """
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [span.to_otlp() for span in trace.spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def export(trace: Trace) -> None:
+    line = json.dumps(to_otlp(trace), separators=(",", ":")) + "\n"
+    with _export_lock:
+        if settings.TRACING_EXPORT_PATH:
+            with open(settings.TRACING_EXPORT_PATH, "a") as f:
+                f.write(line)
+        else:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+
+@contextmanager
+def _open_span(
+    trace: Trace, name: str, kind: int, attributes: Dict[str, Any]
+) -> Iterator[Span]:
+    span = Span(trace, _current_span.get(), name, kind, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exception:
+        span.end(exception)
+        raise
+    else:
+        span.end()
+    finally:
+        _current_span.reset(token)
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Root span of a sampled share of requests, None is yielded for the rest
+    """
+    if _current_span.get() is not None or random.random() >= (
+        settings.TRACING_SAMPLE_RATE
+    ):
+        yield None
+        return
+
+    trace = Trace()
+    try:
+        with _open_span(trace, name, SPAN_KIND_SERVER, attributes) as span:
+            yield span
+    finally:
+        export(trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Child of current span, None is yielded outside of sampled traces
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with _open_span(parent.trace, name, SPAN_KIND_INTERNAL, attributes) as child:
+        yield child
+
+
+def traced(function: F, name: Optional[str] = None) -> F:
+    """
+    Wraps function (or coroutine function) in a span named as the function
+    """
+    span_name = name or function.__qualname__
+
+    if inspect.iscoroutinefunction(function):
+
+        @functools.wraps(function)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _current_span.get() is None:
+                return await function(*args, **kwargs)
+            with span(span_name):
+                return await function(*args, **kwargs)
+
+        return async_wrapper  # type: ignore
+
+    @functools.wraps(function)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if _current_span.get() is None:
+            return function(*args, **kwargs)
+        with span(span_name):
+            return function(*args, **kwargs)
+
+    return wrapper  # type: ignore
+
+
+def trace_methods(cls: type) -> None:
+    """
+    Wraps public methods defined by cls in spans named by their qualified name
+    (static methods and generators, whose work runs after returning, are left alone)
+    """
+    for name, member in list(vars(cls).items()):
+        if (
+            name.startswith("_")
+            or not inspect.isfunction(member)
+            or inspect.isgeneratorfunction(member)
+            or inspect.isasyncgenfunction(member)
+        ):
+            continue
+        setattr(cls, name, traced(member))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    parent = _current_span.get()
+    if parent is None:
+        return
+    attributes = {"db.system": "postgresql", "db.statement": statement}
+    operation = statement.split(None, 1)[0].upper() if statement else "SQL"
+    conn.info.setdefault(SPANS, []).append(
+        Span(parent.trace, parent, operation, SPAN_KIND_CLIENT, attributes)
+    )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    spans = conn.info.get(SPANS)
+    if spans and _current_span.get() is not None:
+        spans.pop().end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _statement_failed(exception_context: Any) -> None:
+    spans = exception_context.connection.info.get(SPANS)
+    if spans and _current_span.get() is not None:
+        spans.pop().end(exception_context.original_exception)
@@ -1,6 +1,6 @@
 from typing import Any
 
-from sqlalchemy.ext.declarative.api import as_declarative, declared_attr
+from sqlalchemy.ext.declarative import as_declarative, declared_attr
 
 
 @as_declarative()
@@ -0,0 +1,102 @@
+"""
+Helpers of bulk loads: COPY of CSV streams, and dropping indexes and foreign keys
+for the duration of a load (they are recreated in the same transaction)
+"""
+from typing import IO, Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# bytes sent to the server at once
+COPY_BUFFER_SIZE = 1 << 16
+
+
+class IteratorFile:
+    """
+    Read-only binary file of text chunks produced by iterator,
+    lets COPY stream generated rows. Reads may return less than size
+    """
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._chunk = b""
+        self._position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while self._position >= len(self._chunk):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return b""
+            self._chunk, self._position = chunk.encode(), 0
+
+        start = self._position
+        end = len(self._chunk) if size < 0 else start + size
+        self._position = min(end, len(self._chunk))
+        return self._chunk[start:end]
+
+
+def copy_csv(db: Session, table: str, columns: List[str], f: IO[bytes]) -> int:
+    """
+    Copies UTF-8 CSV file (without header) to table in session's transaction,
+    the file is streamed. Returns number of copied rows
+    """
+    statement = "COPY \"{}\" ({}) FROM STDIN WITH (FORMAT csv, ENCODING 'UTF8')".format(
+        table, ", ".join(columns)
+    )
+    # bytes are sent as they are, the server decodes them
+    with db.connection().connection.cursor() as cursor:
+        cursor.copy_expert(statement, f, size=COPY_BUFFER_SIZE)
+        return cursor.rowcount
+
+
+def drop_indexes(db: Session, tables: List[str]) -> List[str]:
+    """
+    Drops indexes of tables that don't back constraints (building them
+    once after COPY is much faster than updating them row by row), returns
+    statements recreating them
+    """
+    indexes = db.execute(
+        text(
+            "SELECT i.indexname, i.indexdef FROM pg_indexes i"
+            " WHERE i.schemaname = current_schema() AND i.tablename = ANY(:tables)"
+            " AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid ="
+            " (quote_ident(i.schemaname) || '.' || quote_ident(i.indexname))::regclass)"
+        ),
+        {"tables": tables},
+    ).all()
+    for name, _ in indexes:
+        db.execute(text(f'DROP INDEX "{name}"'))
+    return [definition for _, definition in indexes]
+
+
+def drop_foreign_keys(db: Session, tables: List[str]) -> List[str]:
+    """
+    Drops foreign keys of tables (checked by a single join when they are
+    added back, not by a trigger per row), returns statements recreating them
+    """
+    foreign_keys = db.execute(
+        text(
+            "SELECT c.conrelid::regclass::text, c.conname, pg_get_constraintdef(c.oid)"
+            " FROM pg_constraint c JOIN pg_class t ON t.oid = c.conrelid"
+            " WHERE c.contype = 'f' AND t.relname = ANY(:tables)"
+            " AND t.relnamespace = current_schema()::regnamespace"
+        ),
+        {"tables": tables},
+    ).all()
+    for table, name, _ in foreign_keys:
+        db.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+    return [
+        f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'
+        for table, name, definition in foreign_keys
+    ]
+
+
+def reset_sequences(db: Session, tables: List[str]) -> None:
+    for table in tables:
+        # next id follows the highest loaded one
+        db.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'),"
+                f' coalesce(max(id), 1), max(id) IS NOT NULL) FROM "{table}"'
+            )
+        )
@@ -0,0 +1,220 @@
+"""
+Loads CSV snapshot of the database (backend/db_dump) with COPY.
+
+Tables are loaded in dependency order in a single transaction, car images
+(stored as data URLs in snapshots) are moved to car_image table, indexes and
+foreign keys are built after loading and sequences are reset. The database
+must be migrated to the current revision.
+
+    python -m app.db.load_dump --dir db_dump --replace
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.bulk_load import copy_csv, drop_foreign_keys, drop_indexes, reset_sequences
+from app.db.session import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DUMP_DIR = Path(__file__).resolve().parents[2] / "db_dump"
+DUMP_FILE = "rentally_public_{}.csv"
+
+# revision of the schema snapshots were taken at, columns below are its layout
+DUMP_REVISION = "f449b0ab441f"
+
+# columns of headerless snapshot files, tables in dependency order
+DUMP_COLUMNS: Dict[str, List[str]] = {
+    "user": ["id", "full_name", "email", "hashed_password", "is_admin"],
+    "car": [
+        "id",
+        "model_name",
+        "type",
+        "fuel_type",
+        "gearbox_type",
+        "ac_type",
+        "number_of_passengers",
+        "drive_type",
+        "average_consumption",
+        "number_of_airbags",
+        "boot_capacity",
+        "price_per_day",
+        "deposit_amount",
+        "mileage_limit",
+        "image_base64",
+        "loading_capacity",
+        "boot_width",
+        "boot_height",
+        "boot_length",
+        "horsepower",
+        "zero_to_hundred_time",
+        "engine_capacity",
+    ],
+    "customer": ["id", "full_name", "address", "phone_number"],
+    "reservation": ["id", "car_id", "customer_id", "start_date", "end_date", "status"],
+    "rental": [
+        "id",
+        "car_id",
+        "customer_id",
+        "reservation_id",
+        "start_date",
+        "end_date",
+        "status",
+    ],
+}
+
+# car images are copied to a staging table and moved to car_image from there
+CAR_STAGING_TABLE = "car_dump"
+CAR_IMAGE_COLUMN = "image_base64"
+
+
+# base64 encoded data URL, as accepted by the e1c4a8d2b9f6 migration
+DATA_URL_PATTERN = r"^data:[\w.+-]+/[\w.+-]+;base64,[A-Za-z0-9+/]*={0,2}$"
+
+
+class DumpError(Exception):
+    pass
+
+
+def _load_cars(db: Session, path: Path) -> int:
+    columns = DUMP_COLUMNS["car"]
+    db.execute(
+        text(
+            f"CREATE TEMPORARY TABLE {CAR_STAGING_TABLE}"
+            f" (LIKE car INCLUDING DEFAULTS, {CAR_IMAGE_COLUMN} text) ON COMMIT DROP"
+        )
+    )
+    with path.open("rb") as f:
+        copied = copy_csv(db, CAR_STAGING_TABLE, columns, f)
+
+    # images which can't be moved would be lost, the load is aborted as the
+    # e1c4a8d2b9f6 migration is
+    invalid_car_ids = (
+        db.execute(
+            text(
+                f"SELECT id FROM {CAR_STAGING_TABLE}"
+                f" WHERE {CAR_IMAGE_COLUMN} IS NOT NULL AND NOT ("
+                f"{CAR_IMAGE_COLUMN} ~ :pattern"
+                f" AND length(split_part({CAR_IMAGE_COLUMN}, ',', 2)) % 4 = 0)"
+                " ORDER BY id"
+            ),
+            {"pattern": DATA_URL_PATTERN},
+        )
+        .scalars()
+        .all()
+    )
+    if invalid_car_ids:
+        raise DumpError(
+            f"image_base64 of cars {', '.join(map(str, invalid_car_ids))}"
+            " is not a base64 encoded data URL"
+        )
+
+    # content-addressed as in the e1c4a8d2b9f6 migration
+    db.execute(
+        text(
+            f"UPDATE {CAR_STAGING_TABLE}"
+            " SET image_hash = encode(sha256(decode(split_part("
+            f"{CAR_IMAGE_COLUMN}, ',', 2), 'base64')), 'hex')"
+            f" WHERE {CAR_IMAGE_COLUMN} IS NOT NULL"
+        )
+    )
+    db.execute(
+        text(
+            "INSERT INTO car_image (hash, content_type, data)"
+            " SELECT DISTINCT ON (image_hash) image_hash,"
+            f" substring({CAR_IMAGE_COLUMN} from '^data:([^;]+);base64,'),"
+            f" decode(split_part({CAR_IMAGE_COLUMN}, ',', 2), 'base64')"
+            f" FROM {CAR_STAGING_TABLE} WHERE image_hash IS NOT NULL"
+            " ON CONFLICT DO NOTHING"
+        )
+    )
+    car_columns = ", ".join(
+        column for column in columns + ["image_hash"] if column != CAR_IMAGE_COLUMN
+    )
+    db.execute(
+        text(
+            f"INSERT INTO car ({car_columns})"
+            f" SELECT {car_columns} FROM {CAR_STAGING_TABLE}"
+        )
+    )
+    return copied
+
+
+def load_dump(db: Session, dump_dir: Path, replace: bool = False) -> Dict[str, int]:
+    """
+    Loads snapshot files of dump_dir, returns numbers of loaded rows by table.
+    With replace, existing data of dumped tables is deleted first
+    """
+    revision_path = dump_dir / DUMP_FILE.format("alembic_version")
+    if revision_path.exists():
+        revision = revision_path.read_text().strip()
+        if revision != DUMP_REVISION:
+            raise DumpError(
+                f"Snapshot of revision {revision} can't be loaded,"
+                f" only {DUMP_REVISION} layout is supported"
+            )
+
+    tables = list(DUMP_COLUMNS)
+    loaded: Dict[str, int] = {}
+    try:
+        # timestamps without time zone in snapshots are in UTC
+        db.execute(text("SET LOCAL timezone = 'UTC'"))
+        db.execute(text("SET LOCAL maintenance_work_mem = '256MB'"))
+        if replace:
+            truncated = ", ".join(f'"{table}"' for table in [*tables, "car_image"])
+            db.execute(text(f"TRUNCATE {truncated} CASCADE"))
+        definitions = drop_indexes(db, tables) + drop_foreign_keys(db, tables)
+
+        for table, columns in DUMP_COLUMNS.items():
+            path = dump_dir / DUMP_FILE.format(table)
+            if not path.exists():
+                continue
+            if table == "car":
+                loaded[table] = _load_cars(db, path)
+            else:
+                with path.open("rb") as f:
+                    loaded[table] = copy_csv(db, table, columns, f)
+
+        for definition in definitions:
+            db.execute(text(definition))
+        reset_sequences(db, tables)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return loaded
+
+
+def run(dump_dir: Path, replace: bool) -> None:
+    db = SessionLocal()
+    try:
+        started_at = time.perf_counter()
+        loaded = load_dump(db, dump_dir, replace)
+        for table, rows in loaded.items():
+            logger.info(f"Loaded {rows} rows to {table}")
+        logger.info(f"Snapshot loaded in {time.perf_counter() - started_at:.2f} s")
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--dir", type=Path, default=DUMP_DIR)
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="delete existing users, cars, customers and bookings first",
+    )
+    args = parser.parse_args()
+
+    run(args.dir, args.replace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Connection pools recording how long checkouts wait, reported by GET /utils/db-pool
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """
+    Counters of connection checkouts, wait time includes opening new connections
+    and pre-ping round trips
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self._lock = threading.Lock()
+
+    def checkout_started(self) -> float:
+        with self._lock:
+            self.waiting += 1
+        return time.perf_counter()
+
+    def checkout_finished(self, started_at: float, timed_out: bool) -> None:
+        wait_time = time.perf_counter() - started_at
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+
+class TimedQueuePool(QueuePool):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self) -> Any:
+        started_at = self.stats.checkout_started()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.checkout_finished(started_at, timed_out)
+
+    def recreate(self) -> "TimedQueuePool":
+        # disposed engines get a new pool, statistics are kept
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedAsyncAdaptedQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Returns current state of engine's connection pool and its checkout statistics
+    """
+    pool = engine.pool
+    stats = pool.stats
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # negative while not all connections of the pool are opened yet
+        "overflow": max(pool.overflow(), 0),
+        "waiting": stats.waiting,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_time_avg_ms": stats.wait_time_total / stats.checkouts * 1000
+        if stats.checkouts
+        else 0.0,
+        "wait_time_max_ms": stats.wait_time_max * 1000,
+    }
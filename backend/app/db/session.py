@@ -1,7 +1,76 @@
+from typing import Dict, Type
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import Pool
 
 from app.core.config import settings
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
+
+
+def _engine(uri: str, poolclass: Type[Pool] = TimedQueuePool) -> Engine:
+    return create_engine(
+        uri,
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+def _async_engine(uri: str) -> AsyncEngine:
+    return create_async_engine(
+        uri,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=settings.ASYNC_DB_POOL_SIZE,
+        max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+
+engine = _engine(settings.SQLALCHEMY_DATABASE_URI)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = _async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URI)
+# lazy loading is not possible in async sessions, objects must stay loaded after commit
+AsyncSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine,
+    class_=AsyncSession,
+)
+
+# reads go to primary when there is no replica
+if settings.SQLALCHEMY_REPLICA_DATABASE_URI:
+    replica_engine = _engine(settings.SQLALCHEMY_REPLICA_DATABASE_URI)
+    async_replica_engine = _async_engine(settings.SQLALCHEMY_ASYNC_REPLICA_DATABASE_URI)
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+AsyncReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_replica_engine,
+    class_=AsyncSession,
+)
+
+
+def pool_engines() -> Dict[str, Engine]:
+    """
+    Returns engines by name of their connection pool, replica pools
+    only if replica is configured
+    """
+    engines = {"sync_pool": engine, "async_pool": async_engine.sync_engine}
+    if replica_engine is not engine:
+        engines["replica_pool"] = replica_engine
+        engines["async_replica_pool"] = async_replica_engine.sync_engine
+    return engines
@@ -0,0 +1,115 @@
+"""
+Unit of work: changes made by services are only flushed and committed together,
+once, by the owner of the unit of work. Request sessions are owned by the route
+(see app.api.routing), elsewhere the outermost unit_of_work block commits.
+"""
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction
+
+# key of Session.info marking sessions with transaction managed by a unit of work
+UNIT_OF_WORK = "unit_of_work"
+
+# key of Session.info set once current transaction writes
+WROTE = "wrote"
+
+# key of Session.info holding callbacks run after current transaction commits
+AFTER_COMMIT = "after_commit"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session: Session, flush_context: Any) -> None:
+    session.info[WROTE] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_executed(orm_execute_state: ORMExecuteState) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[WROTE] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    session.info.pop(WROTE, None)
+    for callback in session.info.pop(AFTER_COMMIT, []):
+        callback()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, previous: SessionTransaction) -> None:
+    session.info.pop(WROTE, None)
+    session.info.pop(AFTER_COMMIT, None)
+
+
+def begin(db: Any) -> None:
+    """
+    Makes the caller owner of session's unit of work, services only flush
+    """
+    db.info[UNIT_OF_WORK] = True
+
+
+def mark_wrote(db: Any) -> None:
+    """
+    Marks writes made bypassing the ORM (e.g. COPY on the DBAPI connection)
+    """
+    db.info[WROTE] = True
+
+
+def has_writes(db: Any) -> bool:
+    return bool(db.info.get(WROTE) or db.new or db.dirty or db.deleted)
+
+
+def after_commit(db: Any, callback: Callable[[], None]) -> None:
+    """
+    Runs callback once changes of current transaction are committed
+    (e.g. invalidation of caches), it's dropped on rollback
+    """
+    db.info.setdefault(AFTER_COMMIT, []).append(callback)
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[None]:
+    """
+    Block of changes committed together. Nested blocks (and blocks
+    in request sessions) join the outer unit of work
+    """
+    if db.info.get(UNIT_OF_WORK):
+        yield
+        return
+
+    begin(db)
+    try:
+        yield
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK, None)
+
+
+@asynccontextmanager
+async def async_unit_of_work(db: AsyncSession) -> AsyncIterator[None]:
+    """
+    unit_of_work of async sessions
+    """
+    if db.info.get(UNIT_OF_WORK):
+        yield
+        return
+
+    begin(db)
+    try:
+        yield
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK, None)
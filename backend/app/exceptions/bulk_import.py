@@ -0,0 +1,32 @@
+from typing import Any, Dict, List
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+
+class BulkImportInvalidRowsException(HTTPException):
+    def __init__(self, errors: List[Dict[str, Any]]):
+        # same shape as validation errors of request bodies, loc starts with row number
+        super().__init__(422, jsonable_encoder(errors))
+
+
+class BulkImportMalformedBodyException(HTTPException):
+    def __init__(self):
+        super().__init__(400, "Bulk import body is not valid UTF-8 CSV or NDJSON")
+
+
+class BulkImportTooLargeException(HTTPException):
+    def __init__(self, max_bytes: int):
+        super().__init__(413, f"Bulk import body is limited to {max_bytes} bytes")
+
+
+class BulkImportTooManyRowsException(HTTPException):
+    def __init__(self, max_rows: int):
+        super().__init__(413, f"Bulk import is limited to {max_rows} rows")
+
+
+class BulkImportUnsupportedFormatException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            415, "Bulk import accepts text/csv or application/x-ndjson bodies"
+        )
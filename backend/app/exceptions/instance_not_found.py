@@ -11,6 +11,16 @@ class CarNotFoundException(InstanceNotFoundException):
         super().__init__("Car")
 
 
+class CarImageNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(404, "Car has no image")
+
+
+class ProfileNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(404, "Profile not found")
+
+
 class CustomerNotFoundException(InstanceNotFoundException):
     def __init__(self):
         super().__init__("Customer")
@@ -0,0 +1,10 @@
+from fastapi import HTTPException
+
+
+class PasswordHashingOverloadedException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            503,
+            "Too many concurrent logins, try again later",
+            headers={"Retry-After": "1"},
+        )
@@ -1,11 +1,23 @@
+from datetime import timedelta
+
 from fastapi import FastAPI
 from fastapi_utils.tasks import repeat_every
 from starlette.middleware.cors import CORSMiddleware
 
 from app import services
+from app.api import metrics
 from app.api.api_v1.api import api_router
+from app.api.profiling import PROFILE_HEADER, ProfilingMiddleware
+from app.core import image_variants, security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.job_lease import acquire_job_lease
+from app.core.metrics import MetricsMiddleware
+from app.core.query_stats import QUERY_COUNT_HEADER, QueryStatsMiddleware
+from app.core.read_routing import (
+    READ_PRIMARY_UNTIL_HEADER,
+    ReadPrimaryAfterWriteMiddleware,
+)
+from app.db.session import SessionLocal, async_engine
 
 app = FastAPI(openapi_url=f"{settings.API_V1_STR}/openapi.json")
 
@@ -17,14 +29,43 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[READ_PRIMARY_UNTIL_HEADER, QUERY_COUNT_HEADER, PROFILE_HEADER],
     )
 
+app.add_middleware(ReadPrimaryAfterWriteMiddleware)
+app.add_middleware(MetricsMiddleware)
+# statements of all middlewares below are counted
+app.add_middleware(QueryStatsMiddleware)
+# outermost, profiles cover all middlewares (and don't count admin checks)
+app.add_middleware(ProfilingMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(metrics.router)
+
+
+CANCEL_MISSED_RESERVATIONS_PERIOD = timedelta(minutes=1)
 
 
 @app.on_event("startup")
-@repeat_every(seconds=60)  # 1 minute
+@repeat_every(seconds=CANCEL_MISSED_RESERVATIONS_PERIOD.total_seconds())
 def cancel_missed_reservations_task() -> None:
     db = SessionLocal()
-    services.reservation.cancel_missed_reservations(db)
-    db.close()
+    try:
+        # every instance ticks, only the one holding the lease runs the job
+        if acquire_job_lease(
+            db, "cancel_missed_reservations", CANCEL_MISSED_RESERVATIONS_PERIOD
+        ):
+            services.reservation.cancel_missed_reservations(db)
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+def shutdown_workers() -> None:
+    image_variants.shutdown()
+    security.shutdown_password_hashing()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine() -> None:
+    await async_engine.dispose()
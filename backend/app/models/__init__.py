@@ -1,5 +1,7 @@
 from .car import Car
+from .car_image import CarImage
 from .customer import Customer
+from .job_lease import JobLease
 from .rental import Rental
 from .reservation import Reservation
 from .user import User
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Computed
+from sqlalchemy.dialects.postgresql import DATERANGE
+from sqlalchemy.orm import deferred
+
+# Calendar days (in UTC) occupied by a booking, both ends inclusive.
+# Two bookings sharing a day are colliding, see Interval.is_intersecting
+BOOKED_DATES_EXPRESSION = (
+    "daterange((start_date AT TIME ZONE 'UTC')::date, "
+    "(end_date AT TIME ZONE 'UTC')::date, '[]')"
+)
+
+
+def booked_dates_column() -> Column:
+    """
+    Returns generated column with booked dates range,
+    deferred as it's used only in SQL conditions and exclusion constraints
+    """
+    return deferred(
+        Column(DATERANGE, Computed(BOOKED_DATES_EXPRESSION, persisted=True))
+    )
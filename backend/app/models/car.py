@@ -1,7 +1,7 @@
 import enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, Enum, Float, Integer, Numeric, String
+from sqlalchemy import Column, Enum, Float, ForeignKey, Integer, Numeric, String
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -61,7 +61,7 @@ class Car(Base):
     price_per_day = Column(Numeric(10, 2), index=True, nullable=False)
     deposit_amount = Column(Numeric(10, 2), nullable=True)
     mileage_limit = Column(Float, nullable=True)
-    image_base64 = Column(String, nullable=True)
+    image_hash = Column(String(64), ForeignKey("car_image.hash"), nullable=True)
     reservations = relationship("Reservation")
     rentals = relationship("Rental")
 
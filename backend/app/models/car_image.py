@@ -0,0 +1,12 @@
+from sqlalchemy import Column, LargeBinary, String
+
+from app.db.base_class import Base
+
+
+class CarImage(Base):
+    __tablename__ = "car_image"
+
+    # sha256 of data, identical images are stored once
+    hash = Column(String(64), primary_key=True)
+    content_type = Column(String, nullable=False)
+    data = Column(LargeBinary, nullable=False)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, String
+
+from app.db.base_class import Base
+
+
+class JobLease(Base):
+    __tablename__ = "job_lease"
+
+    # scheduled job runs on the instance which moved next_run_at forward
+    name = Column(String, primary_key=True)
+    next_run_at = Column(DateTime(timezone=True), nullable=False)
+    holder = Column(String, nullable=True)
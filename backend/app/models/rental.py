@@ -1,10 +1,12 @@
 import enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, func
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
+from app.models.booked_dates import booked_dates_column
 
 
 # fmt: off
@@ -24,6 +26,29 @@ if TYPE_CHECKING:
 
 
 class Rental(Base):
+    __table_args__ = (
+        # active rentals of the same car cannot overlap
+        ExcludeConstraint(
+            ("car_id", "="),
+            ("booked_dates", "&&"),
+            name="rental_car_id_booked_dates_excl",
+            using="gist",
+            where="status = 'IN_PROGRESS'",
+        ),
+        Index("ix_rental_car_id_status_start_date", "car_id", "status", "start_date"),
+        # reservations are always loaded together with their rental
+        Index(
+            "ix_rental_reservation_id",
+            "reservation_id",
+            postgresql_where=text("reservation_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_rental_in_progress_end_date",
+            "end_date",
+            postgresql_where=text("status = 'IN_PROGRESS'"),
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     car_id = Column(Integer, ForeignKey("car.id"), nullable=False)
     car = relationship("Car", back_populates="rentals", lazy=False)
@@ -33,4 +58,5 @@ class Rental(Base):
     reservation = relationship("Reservation", back_populates="rental", lazy=False)
     start_date = Column(DateTime(timezone=True), default=func.now(), nullable=False)
     end_date = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    booked_dates = booked_dates_column()
     status = Column(Enum(RentalStatus), nullable=False)
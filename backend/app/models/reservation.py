@@ -1,10 +1,12 @@
 import enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, func
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
+from app.models.booked_dates import booked_dates_column
 
 
 # fmt: off
@@ -25,6 +27,25 @@ if TYPE_CHECKING:
 
 
 class Reservation(Base):
+    __table_args__ = (
+        # active reservations of the same car cannot overlap
+        ExcludeConstraint(
+            ("car_id", "="),
+            ("booked_dates", "&&"),
+            name="reservation_car_id_booked_dates_excl",
+            using="gist",
+            where="status = 'NEW'",
+        ),
+        Index(
+            "ix_reservation_car_id_status_start_date", "car_id", "status", "start_date"
+        ),
+        Index(
+            "ix_reservation_new_start_date",
+            "start_date",
+            postgresql_where=text("status = 'NEW'"),
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     car_id = Column(Integer, ForeignKey("car.id"), nullable=False)
     car = relationship("Car", back_populates="reservations", lazy=False)
@@ -32,5 +53,6 @@ class Reservation(Base):
     customer = relationship("Customer", back_populates="reservations", lazy=False)
     start_date = Column(DateTime(timezone=True), default=func.now(), nullable=False)
     end_date = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    booked_dates = booked_dates_column()
     status = Column(Enum(ReservationStatus), nullable=False)
     rental = relationship("Rental", back_populates="reservation", lazy=False)
@@ -1,5 +1,9 @@
+from .bulk_import import BulkImportResult
 from .car import Car, CarCreateDto, CarInDB, CarUpdateDto
 from .customer import Customer, CustomerCreateDto, CustomerInDB, CustomerUpdateDto
+from .db_pool import DbPools, DbPoolStatus
+from .export import ExportFormat, ExportParams
+from .page import Page, PageParams
 from .token import Token, TokenPayload
 from .user import User, UserCreateDto, UserInDB, UserUpdateDto
 
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+# Result of POST /cars/bulk and POST /customers/bulk
+class BulkImportResult(BaseModel):
+    imported: int
@@ -4,6 +4,7 @@ from typing import Optional
 from pydantic.main import BaseModel
 
 from app.models.car import AcType, CarType, DriveType, FuelType, GearboxType
+from app.utils.data_url import ImageDataUrl
 
 
 # Shared properties
@@ -21,7 +22,6 @@ class CarBase(BaseModel):
     price_per_day: Decimal
     deposit_amount: Optional[Decimal]
     mileage_limit: Optional[float]
-    image_base64: Optional[str]
 
     # TRUCK RELATED
     loading_capacity: Optional[float]
@@ -35,17 +35,25 @@ class CarBase(BaseModel):
     engine_capacity: Optional[float]
 
 
+# Image upload, stored in car_image table and served by GET /cars/{id}/image
+class CarImageUpload(BaseModel):
+    # base64 encoded data URL of PNG, JPEG, WebP or GIF image, on update None
+    # keeps the current image
+    image_base64: Optional[ImageDataUrl]
+
+
 # Properties to receive via API on creation
-class CarCreateDto(CarBase):
+class CarCreateDto(CarBase, CarImageUpload):
     pass
 
 
-class CarUpdateDto(CarBase):
+class CarUpdateDto(CarBase, CarImageUpload):
     pass
 
 
 class CarInDBBase(CarBase):
     id: Optional[int] = None
+    image_hash: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# State of a connection pool of the worker process serving the request,
+# counters and wait times are totals since the process started
+class DbPoolStatus(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    waiting: int
+    checkouts: int
+    timeouts: int
+    wait_time_avg_ms: float
+    wait_time_max_ms: float
+
+
+# replica pools are reported only if replica is configured
+class DbPools(BaseModel):
+    sync_pool: DbPoolStatus
+    async_pool: DbPoolStatus
+    replica_pool: Optional[DbPoolStatus] = None
+    async_replica_pool: Optional[DbPoolStatus] = None
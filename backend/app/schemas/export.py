@@ -0,0 +1,17 @@
+import enum
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+# Parameters of export endpoints, bookings overlapping [start, end] are exported
+class ExportParams(BaseModel):
+    format: ExportFormat = ExportFormat.CSV
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
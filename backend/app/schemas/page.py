@@ -0,0 +1,18 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+from pydantic.generics import GenericModel
+
+ItemType = TypeVar("ItemType")
+
+
+# Keyset pagination parameters, `after` is id of the last item of previous page
+class PageParams(BaseModel):
+    limit: int
+    after: Optional[int] = None
+
+
+# Page of items ordered by id, `next_cursor` is None on the last page
+class Page(GenericModel, Generic[ItemType]):
+    items: List[ItemType]
+    next_cursor: Optional[int] = None
@@ -1,17 +1,46 @@
-from typing import Any, Generic, List, Optional, Type, TypeVar
+import enum
+import io
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
+from app.core.tracing import trace_methods
 from app.db.base_class import Base
+from app.db.unit_of_work import async_unit_of_work, mark_wrote, unit_of_work
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# key of Session.info holding objects looked up by id during the session
+LOOKUP_CACHE = "lookup_cache"
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text(value: Any) -> str:
+    """
+    Returns value formatted as a field of COPY text format
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy Enum columns store names of members
+        value = value.name
+    return str(value).translate(COPY_ESCAPES)
+
 
 class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # calls of services are spans of sampled traces (see app.core.tracing)
+        trace_methods(cls)
+
     def __init__(self, model: Type[ModelType]):
         """
         Base service object with default methods to Create, Read, Update, Delete (CRUD).
@@ -22,36 +51,174 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         * `schema`: A Pydantic model (schema) class
         """
         self.model = model
+        # attributes set by update, objects expired on commit have no loaded values
+        self._columns = inspect(model).column_attrs.keys()
 
     def get(self, db: Session, _id: Any) -> Optional[ModelType]:
-        return db.query(self.model).get(_id)
+        """
+        Returns object by id. Session's identity map holds only weak references,
+        found objects are kept alive until the session (request) ends,
+        so that repeated lookups in validators and services don't hit the database
+        """
+        obj = db.query(self.model).get(_id)
+        if obj is not None:
+            db.info.setdefault(LOOKUP_CACHE, {})[(self.model, _id)] = obj
+        return obj
 
     def get_all(self, db: Session) -> List[ModelType]:
         return db.query(self.model).all()
 
+    def get_page(
+        self, db: Session, *, limit: int, after: Optional[int] = None
+    ) -> Tuple[List[ModelType], Optional[int]]:
+        """
+        Returns up to `limit` objects with id greater than `after` (ordered by id)
+        and cursor of the next page, which is None if there are no more objects
+        """
+        objects = db.execute(self._page_statement(limit, after)).unique().scalars()
+        return self._split_page(objects.all(), limit)
+
+    def _page_statement(self, limit: int, after: Optional[int]) -> Select:
+        statement = select(self.model).order_by(self.model.id)
+        if after is not None:
+            statement = statement.filter(self.model.id > after)
+
+        # one extra row tells whether there is a next page
+        return statement.limit(limit + 1)
+
+    @staticmethod
+    def _split_page(
+        objects: List[ModelType], limit: int
+    ) -> Tuple[List[ModelType], Optional[int]]:
+        if len(objects) > limit:
+            return objects[:limit], objects[limit - 1].id
+        return objects, None
+
+    def _export_statement(self, *conditions: Any) -> Select:
+        """
+        Returns statement selecting columns of objects matching conditions
+        (ordered by id), without relationships and generated columns
+        """
+        table = self.model.__table__
+        columns = [column for column in table.columns if column.computed is None]
+        return select(*columns).filter(*conditions).order_by(table.c.id)
+
+    # Changes are only flushed within a unit of work, so that they are committed
+    # together with other changes of the request (see app.db.unit_of_work)
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
-        db.add(db_obj)
-        db.commit()
+        with unit_of_work(db):
+            db.add(db_obj)
+            db.flush()
         db.refresh(db_obj)
         return db_obj
 
+    def create_bulk(self, db: Session, *, objs_in: List[CreateSchemaType]) -> int:
+        """
+        Creates objects with a single COPY statement, returns number of created
+        objects. They aren't loaded back, use it for imports of many rows
+        """
+        return self._copy(db, [obj_in.dict() for obj_in in objs_in])
+
+    def _copy(self, db: Session, rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+
+        columns = [column for column in self._columns if column in rows[0]]
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_text(row[column]) for column in columns))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        preparer = db.get_bind().dialect.identifier_preparer
+        statement = "COPY {} ({}) FROM STDIN".format(
+            preparer.format_table(self.model.__table__),
+            ", ".join(preparer.quote(column) for column in columns),
+        )
+        with unit_of_work(db):
+            # COPY runs on DBAPI connection of the session, in its transaction
+            with db.connection().connection.cursor() as cursor:
+                cursor.copy_expert(statement, buffer)
+            mark_wrote(db)
+        return len(rows)
+
     def update(
         self, db: Session, *, db_obj: ModelType, obj_in: UpdateSchemaType
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
-        db.commit()
+        with unit_of_work(db):
+            for field in self._columns:
+                if field in update_data:
+                    setattr(db_obj, field, update_data[field])
+            db.add(db_obj)
+            db.flush()
         db.refresh(db_obj)
         return db_obj
 
     def remove(self, db: Session, *, _id: int) -> ModelType:
-        obj = db.query(self.model).get(_id)
-        db.delete(obj)
-        db.commit()
+        with unit_of_work(db):
+            obj = db.query(self.model).get(_id)
+            db.delete(obj)
+            db.flush()
+        return obj
+
+    # Async variants, for endpoints using deps.get_async_db
+
+    async def get_async(self, db: AsyncSession, _id: Any) -> Optional[ModelType]:
+        """
+        Returns object by id, see get
+        """
+        obj = await db.get(self.model, _id)
+        if obj is not None:
+            db.info.setdefault(LOOKUP_CACHE, {})[(self.model, _id)] = obj
+        return obj
+
+    async def get_all_async(self, db: AsyncSession) -> List[ModelType]:
+        result = await db.execute(select(self.model))
+        return result.unique().scalars().all()
+
+    async def get_page_async(
+        self, db: AsyncSession, *, limit: int, after: Optional[int] = None
+    ) -> Tuple[List[ModelType], Optional[int]]:
+        """
+        Returns page of objects and cursor of the next page, see get_page
+        """
+        result = await db.execute(self._page_statement(limit, after))
+        return self._split_page(result.unique().scalars().all(), limit)
+
+    async def create_async(
+        self, db: AsyncSession, *, obj_in: CreateSchemaType
+    ) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)  # type: ignore
+        async with async_unit_of_work(db):
+            db.add(db_obj)
+            await db.flush()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update_async(
+        self, db: AsyncSession, *, db_obj: ModelType, obj_in: UpdateSchemaType
+    ) -> ModelType:
+        update_data = obj_in.dict(exclude_unset=True)
+        async with async_unit_of_work(db):
+            for field in self._columns:
+                if field in update_data:
+                    setattr(db_obj, field, update_data[field])
+            db.add(db_obj)
+            await db.flush()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove_async(self, db: AsyncSession, *, _id: int) -> ModelType:
+        async with async_unit_of_work(db):
+            obj = await db.get(self.model, _id)
+            await db.delete(obj)
+            await db.flush()
         return obj
+
+
+trace_methods(BaseService)
@@ -1,13 +1,22 @@
-from typing import List, Optional
+import hashlib
+from typing import List, Optional, Tuple
 
-from sqlalchemy import and_
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import BooleanClauseList
 
+from app.core.image_variants import schedule_variants
+from app.db.unit_of_work import async_unit_of_work, unit_of_work
 from app.models.car import Car
+from app.models.car_image import CarImage
 from app.schemas.car import CarCreateDto, CarUpdateDto
-from app.schemas.cars_search_query import AvailabilityDatesRange, CarsSearchQuery
+from app.schemas.cars_search_query import CarsSearchQuery
 from app.services.base import BaseService
-from app.validators.availability import is_car_available_in_dates
+from app.utils.data_url import ImageDataUrl
+from app.validators.availability import car_available_in_dates_condition
 
 
 class CarService(BaseService[Car, CarCreateDto, CarUpdateDto]):
@@ -17,34 +26,115 @@ class CarService(BaseService[Car, CarCreateDto, CarUpdateDto]):
         """
         Returns cars matching criteria given in CarsSearchQuery
         """
+        return db.query(Car).filter(self._criteria_condition(cars_search_query)).all()
+
+    async def get_by_criteria_async(
+        self, db: AsyncSession, cars_search_query: CarsSearchQuery
+    ) -> List[Car]:
+        result = await db.execute(
+            select(Car).filter(self._criteria_condition(cars_search_query))
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    def _criteria_condition(cars_search_query: CarsSearchQuery) -> BooleanClauseList:
         conditions = cars_search_query.to_conditions()
-        found_cars = db.query(Car).filter(and_(*conditions)).all()
 
         availability_dates = cars_search_query.availability_dates
-        found_cars = self._filter_by_availability_dates(
-            db, found_cars, availability_dates
-        )
+        if availability_dates:
+            conditions.append(
+                car_available_in_dates_condition(
+                    availability_dates.start, availability_dates.end
+                )
+            )
 
-        return found_cars
+        return and_(*conditions)
 
-    def _filter_by_availability_dates(
-        self,
-        db: Session,
-        cars: List[Car],
-        availability_dates: Optional[AvailabilityDatesRange],
-    ) -> List[Car]:
+    def get_image(self, db: Session, image_hash: str) -> Optional[CarImage]:
+        return db.query(CarImage).get(image_hash)
+
+    def store_image(self, db: Session, image_base64: str) -> str:
         """
-        Given list of cars, returns filtered list of cars that excludes cars that are not available in given dates
+        Stores image given as data URL in content-addressed car_image table
+        and schedules generation of its variants, returns its hash
         """
-        if availability_dates:
-            cars = [
-                _car
-                for _car in cars
-                if is_car_available_in_dates(
-                    db, _car.id, availability_dates.start, availability_dates.end
+        statement, image_hash, data = self._image_insert(image_base64)
+        db.execute(statement)
+        schedule_variants(image_hash, data)
+        return image_hash
+
+    async def store_image_async(self, db: AsyncSession, image_base64: str) -> str:
+        statement, image_hash, data = self._image_insert(image_base64)
+        await db.execute(statement)
+        schedule_variants(image_hash, data)
+        return image_hash
+
+    @staticmethod
+    def _image_insert(image_base64: str) -> Tuple[Insert, str, bytes]:
+        # images of validated DTOs are decoded already
+        image = ImageDataUrl.validate(image_base64)
+        image_hash = hashlib.sha256(image.data).hexdigest()
+        statement = (
+            insert(CarImage)
+            .values(hash=image_hash, content_type=image.content_type, data=image.data)
+            .on_conflict_do_nothing()
+        )
+        return statement, image_hash, image.data
+
+    def create(self, db: Session, *, obj_in: CarCreateDto) -> Car:
+        db_obj = Car(**jsonable_encoder(obj_in, exclude={"image_base64"}))
+        with unit_of_work(db):
+            if obj_in.image_base64:
+                db_obj.image_hash = self.store_image(db, obj_in.image_base64)
+
+            db.add(db_obj)
+            db.flush()
+        db.refresh(db_obj)
+        return db_obj
+
+    async def create_async(self, db: AsyncSession, *, obj_in: CarCreateDto) -> Car:
+        db_obj = Car(**jsonable_encoder(obj_in, exclude={"image_base64"}))
+        async with async_unit_of_work(db):
+            if obj_in.image_base64:
+                db_obj.image_hash = await self.store_image_async(
+                    db, obj_in.image_base64
+                )
+
+            db.add(db_obj)
+            await db.flush()
+        await db.refresh(db_obj)
+        return db_obj
+
+    def create_bulk(self, db: Session, *, objs_in: List[CarCreateDto]) -> int:
+        with unit_of_work(db):
+            rows = []
+            for obj_in in objs_in:
+                row = obj_in.dict(exclude={"image_base64"})
+                row["image_hash"] = (
+                    self.store_image(db, obj_in.image_base64)
+                    if obj_in.image_base64
+                    else None
+                )
+                rows.append(row)
+            return self._copy(db, rows)
+
+    def update(self, db: Session, *, db_obj: Car, obj_in: CarUpdateDto) -> Car:
+        with unit_of_work(db):
+            if obj_in.image_base64:
+                db_obj.image_hash = self.store_image(db, obj_in.image_base64)
+
+            return super().update(db, db_obj=db_obj, obj_in=obj_in)
+
+    async def update_async(
+        self, db: AsyncSession, *, db_obj: Car, obj_in: CarUpdateDto
+    ) -> Car:
+        async with async_unit_of_work(db):
+            if obj_in.image_base64:
+                db_obj.image_hash = await self.store_image_async(
+                    db, obj_in.image_base64
                 )
-            ]
-        return cars
+
+            return await super().update_async(db, db_obj=db_obj, obj_in=obj_in)
 
 
 car = CarService(Car)
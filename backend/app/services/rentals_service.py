@@ -1,9 +1,11 @@
 from datetime import datetime
-from typing import List, Union
+from typing import List, Optional, Union
 
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
 from app import services
+from app.db.unit_of_work import unit_of_work
 from app.exceptions.rental import (
     RentalAndReservationDifferenceException,
     RentalCollisionException,
@@ -19,6 +21,8 @@ from app.utils.interval import Interval
 from app.validators.availability import (
     is_colliding_with_other_rentals,
     is_colliding_with_other_reservations,
+    lock_car_bookings,
+    raise_on_collision,
 )
 from app.validators.general import (
     is_date_in_the_past,
@@ -57,6 +61,7 @@ class RentalService(BaseService[Rental, RentalCreateDto, RentalUpdateDto]):
         Validates that new rental doesn't collide with other reservation or rental
         """
         rental_timeframe = Interval(_rental.start_date, _rental.end_date)
+        lock_car_bookings(db, _rental.car_id)
 
         if is_colliding_with_other_reservations(
             db, _rental.car_id, rental_timeframe, _rental.reservation_id
@@ -73,6 +78,7 @@ class RentalService(BaseService[Rental, RentalCreateDto, RentalUpdateDto]):
         Validates that updated rental doesn't collide with other reservation or rental (apart from itself)
         """
         rental_timeframe = Interval(_rental.start_date, _rental.end_date)
+        lock_car_bookings(db, _rental.car_id)
 
         if is_colliding_with_other_reservations(
             db, _rental.car_id, rental_timeframe, _rental.reservation_id
@@ -95,30 +101,34 @@ class RentalService(BaseService[Rental, RentalCreateDto, RentalUpdateDto]):
         """
         Creates new rental
         """
-        validate_start_date_before_end_date(obj_in.start_date, obj_in.end_date)
-        self.validate_availability_on_create(db, obj_in)
-        self.validate_start_date_in_future(obj_in.start_date)
-        self.validate_in_sync_with_reservation(db, obj_in)
+        with unit_of_work(db):
+            validate_start_date_before_end_date(obj_in.start_date, obj_in.end_date)
+            self.validate_availability_on_create(db, obj_in)
+            self.validate_start_date_in_future(obj_in.start_date)
+            self.validate_in_sync_with_reservation(db, obj_in)
 
-        # update reservation status to COLLECTED
-        if obj_in.reservation_id:
-            services.reservation.mark_collected(
-                db=db, reservation_id=obj_in.reservation_id
-            )
+            # reservation becomes COLLECTED in the same transaction as the rental
+            if obj_in.reservation_id:
+                services.reservation.mark_collected(
+                    db=db, reservation_id=obj_in.reservation_id
+                )
 
-        obj_in.status = RentalStatus.IN_PROGRESS
-        return super().create(db=db, obj_in=obj_in)
+            obj_in.status = RentalStatus.IN_PROGRESS
+            with raise_on_collision(db, RentalCollisionException):
+                return super().create(db=db, obj_in=obj_in)
 
     def update(self, db: Session, *, db_obj: Rental, obj_in: RentalUpdateDto) -> Rental:
         """
         Updates given rental
         """
-        self.validate_old_status_on_update(db_obj.status)  # type: ignore
-        validate_start_date_before_end_date(obj_in.start_date, obj_in.end_date)
-        self.validate_availability_on_update(db, obj_in, db_obj.id)
-        self.validate_in_sync_with_reservation(db, obj_in)
+        with unit_of_work(db):
+            self.validate_old_status_on_update(db_obj.status)  # type: ignore
+            validate_start_date_before_end_date(obj_in.start_date, obj_in.end_date)
+            self.validate_availability_on_update(db, obj_in, db_obj.id)
+            self.validate_in_sync_with_reservation(db, obj_in)
 
-        return super().update(db=db, db_obj=db_obj, obj_in=obj_in)
+            with raise_on_collision(db, RentalCollisionException):
+                return super().update(db=db, db_obj=db_obj, obj_in=obj_in)
 
     def get_active_by_car_id(self, db: Session, car_id: int) -> List[Rental]:
         """
@@ -147,5 +157,24 @@ class RentalService(BaseService[Rental, RentalCreateDto, RentalUpdateDto]):
             .all()
         )
 
+    def get_export_statement(
+        self,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        status: Optional[RentalStatus] = None,
+    ) -> Select:
+        """
+        Returns statement of rentals overlapping given dates, with given status
+        """
+        conditions = []
+        if start is not None:
+            conditions.append(Rental.end_date >= start)
+        if end is not None:
+            conditions.append(Rental.start_date <= end)
+        if status is not None:
+            conditions.append(Rental.status == status)
+        return self._export_statement(*conditions)
+
 
 rental = RentalService(Rental)
@@ -1,8 +1,15 @@
+import logging
+import time
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
+from sqlalchemy import and_, func, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
+from app.core import metrics
+from app.core.config import settings
+from app.db.unit_of_work import unit_of_work
 from app.exceptions.instance_not_found import ReservationNotFoundException
 from app.exceptions.rental import RentalCollisionException
 from app.exceptions.reservation import (
@@ -20,12 +27,16 @@ from app.utils.interval import Interval
 from app.validators.availability import (
     is_colliding_with_other_rentals,
     is_colliding_with_other_reservations,
+    lock_car_bookings,
+    raise_on_collision,
 )
 from app.validators.general import (
     is_date_in_the_past,
     validate_start_date_before_end_date,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class ReservationService(
     BaseService[Reservation, ReservationCreateDto, ReservationUpdateDto]
@@ -44,6 +55,7 @@ class ReservationService(
         Validates that new reservation doesn't collide with other reservation or rental
         """
         reservation_timeframe = Interval(_reservation.start_date, _reservation.end_date)
+        lock_car_bookings(db, _reservation.car_id)
 
         if is_colliding_with_other_reservations(
             db, _reservation.car_id, reservation_timeframe
@@ -65,6 +77,7 @@ class ReservationService(
         Validates that updated reservation doesn't collide with other reservation (apart from itself) or rental
         """
         reservation_timeframe = Interval(_reservation.start_date, _reservation.end_date)
+        lock_car_bookings(db, _reservation.car_id)
 
         if is_colliding_with_other_reservations(
             db, _reservation.car_id, reservation_timeframe, current_reservation_id
@@ -105,12 +118,14 @@ class ReservationService(
         """
         Creates new reservation
         """
-        validate_start_date_before_end_date(obj_in.start_date, obj_in.end_date)
-        self.validate_availability_on_create(db, obj_in)
-        self.validate_start_date_in_future(obj_in.start_date)
+        with unit_of_work(db):
+            validate_start_date_before_end_date(obj_in.start_date, obj_in.end_date)
+            self.validate_availability_on_create(db, obj_in)
+            self.validate_start_date_in_future(obj_in.start_date)
 
-        obj_in.status = ReservationStatus.NEW
-        return super().create(db=db, obj_in=obj_in)
+            obj_in.status = ReservationStatus.NEW
+            with raise_on_collision(db, ReservationCollisionException):
+                return super().create(db=db, obj_in=obj_in)
 
     def update(
         self, db: Session, *, db_obj: Reservation, obj_in: ReservationUpdateDto
@@ -118,16 +133,18 @@ class ReservationService(
         """
         Updates reservation
         """
-        self.validate_old_status_on_update(db_obj.status)  # type: ignore
-        validate_start_date_before_end_date(obj_in.start_date, obj_in.end_date)
-        self.validate_availability_on_update(db, obj_in, db_obj.id)
-        self.validate_rental_relation(
-            db_obj.status,  # type: ignore
-            obj_in.status,
-            db_obj.rental,  # type: ignore
-        )
+        with unit_of_work(db):
+            self.validate_old_status_on_update(db_obj.status)  # type: ignore
+            validate_start_date_before_end_date(obj_in.start_date, obj_in.end_date)
+            self.validate_availability_on_update(db, obj_in, db_obj.id)
+            self.validate_rental_relation(
+                db_obj.status,  # type: ignore
+                obj_in.status,
+                db_obj.rental,  # type: ignore
+            )
 
-        return super().update(db=db, db_obj=db_obj, obj_in=obj_in)
+            with raise_on_collision(db, ReservationCollisionException):
+                return super().update(db=db, db_obj=db_obj, obj_in=obj_in)
 
     def mark_collected(self, db: Session, reservation_id: int) -> Reservation:
         """
@@ -145,20 +162,24 @@ class ReservationService(
         self, db: Session, reservation_id: int, status: ReservationStatus
     ) -> Reservation:
         """
-        Updates reservation's status
+        Updates reservation's status. Collected and cancelled reservations
+        don't book the car, so availability is not validated
         """
-        _reservation = self.get(db=db, _id=reservation_id)
-        if not _reservation:
-            raise ReservationNotFoundException()
+        with unit_of_work(db):
+            _reservation = self.get(db=db, _id=reservation_id)
+            if not _reservation:
+                raise ReservationNotFoundException()
 
-        reservation_update_dto = ReservationUpdateDto(
-            car_id=_reservation.car_id,
-            customer_id=_reservation.customer_id,
-            start_date=_reservation.start_date,
-            end_date=_reservation.end_date,
-            status=status,
-        )
-        return self.update(db=db, db_obj=_reservation, obj_in=reservation_update_dto)
+            self.validate_old_status_on_update(_reservation.status)  # type: ignore
+            self.validate_rental_relation(
+                _reservation.status,  # type: ignore
+                status,
+                _reservation.rental,  # type: ignore
+            )
+
+            _reservation.status = status
+            db.flush()
+        return _reservation
 
     def get_active_by_car_id(self, db: Session, car_id: int) -> List[Reservation]:
         """
@@ -197,13 +218,67 @@ class ReservationService(
             .all()
         )
 
-    def cancel_missed_reservations(self, db: Session) -> None:
+    def cancel_missed_reservations(self, db: Session) -> int:
+        """
+        Cancels all "missed" (start_date < now) reservations with set-based updates
+        of bounded batches, each committed on its own. Returns number of cancelled
+        reservations. Reservations having a rental cannot be cancelled and are skipped
+        """
+        started_at = time.perf_counter()
+        batch_size = settings.CANCEL_MISSED_RESERVATIONS_BATCH_SIZE
+        cancelled = 0
+        while True:
+            batch = (
+                select([Reservation.id])
+                .where(
+                    and_(
+                        Reservation.status == ReservationStatus.NEW,
+                        Reservation.start_date < func.now(),
+                        ~Reservation.rental.any(),
+                    )
+                )
+                .limit(batch_size)
+                # rows locked by other transactions are left for the next run
+                .with_for_update(skip_locked=True)
+            )
+            cancelled_ids = db.execute(
+                update(Reservation.__table__)
+                .where(Reservation.id.in_(batch))
+                .values(status=ReservationStatus.CANCELLED)
+                .returning(Reservation.id)
+            ).fetchall()
+            db.commit()
+
+            cancelled += len(cancelled_ids)
+            if len(cancelled_ids) < batch_size:
+                break
+
+        metrics.cancel_missed_reservations_duration.observe(
+            time.perf_counter() - started_at
+        )
+        metrics.cancelled_missed_reservations.inc(cancelled)
+        if cancelled:
+            logger.info(f"Cancelled {cancelled} missed reservations")
+        return cancelled
+
+    def get_export_statement(
+        self,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        status: Optional[ReservationStatus] = None,
+    ) -> Select:
         """
-        Cancels all "missed" (start_date < now) reservations
+        Returns statement of reservations overlapping given dates, with given status
         """
-        missed_reservations = self.get_missed(db)
-        for _reservation in missed_reservations:
-            self.mark_cancelled(db, _reservation.id)
+        conditions = []
+        if start is not None:
+            conditions.append(Reservation.end_date >= start)
+        if end is not None:
+            conditions.append(Reservation.start_date <= end)
+        if status is not None:
+            conditions.append(Reservation.status == status)
+        return self._export_statement(*conditions)
 
 
 reservation = ReservationService(Reservation)
@@ -1,14 +1,53 @@
-from typing import Optional
+from functools import partial
+from typing import Any, Dict, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import get_password_hash, verify_password
+from app.core import cache
+from app.core.security import get_password_hash, verify_and_update_password
+from app.db.unit_of_work import after_commit, async_unit_of_work, unit_of_work
 from app.models.user import User
 from app.schemas.user import UserCreateDto, UserUpdateDto
 from app.services.base import BaseService
 
 
+def _snapshot(_user: User) -> Dict[str, Any]:
+    return {c.key: getattr(_user, c.key) for c in User.__table__.columns}
+
+
+def _from_snapshot(snapshot: Dict[str, Any]) -> User:
+    _user = User(**snapshot)
+    make_transient_to_detached(_user)
+    return _user
+
+
 class UserService(BaseService[User, UserCreateDto, UserUpdateDto]):
+    def get_cached(self, db: Session, _id: Any) -> Optional[User]:
+        """
+        Returns user by id, served from cache of user snapshots without a query
+        (attached to the session as if it was loaded)
+        """
+        snapshot = cache.users.get(_id)
+        if snapshot is None:
+            _user = self.get(db, _id=_id)
+            if _user:
+                cache.users.set(_id, _snapshot(_user))
+            return _user
+
+        return db.merge(_from_snapshot(snapshot), load=False)
+
+    async def get_cached_async(self, db: AsyncSession, _id: Any) -> Optional[User]:
+        snapshot = cache.users.get(_id)
+        if snapshot is None:
+            _user = await self.get_async(db, _id=_id)
+            if _user:
+                cache.users.set(_id, _snapshot(_user))
+            return _user
+
+        return await db.merge(_from_snapshot(snapshot), load=False)
+
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         """
         Returns user by email
@@ -25,8 +64,9 @@ class UserService(BaseService[User, UserCreateDto, UserUpdateDto]):
             full_name=obj_in.full_name,
             is_admin=obj_in.is_admin,
         )
-        db.add(db_obj)
-        db.commit()
+        with unit_of_work(db):
+            db.add(db_obj)
+            db.flush()
         db.refresh(db_obj)
         return db_obj
 
@@ -40,7 +80,52 @@ class UserService(BaseService[User, UserCreateDto, UserUpdateDto]):
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
             obj_in.hashed_password = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=obj_in)
+        with unit_of_work(db):
+            _user = super().update(db, db_obj=db_obj, obj_in=obj_in)
+            after_commit(db, partial(cache.users.pop, _user.id))
+        return _user
+
+    def remove(self, db: Session, *, _id: int) -> User:
+        """
+        Removes user
+        """
+        with unit_of_work(db):
+            _user = super().remove(db, _id=_id)
+            after_commit(db, partial(cache.users.pop, _id))
+        return _user
+
+    async def create_async(self, db: AsyncSession, *, obj_in: UserCreateDto) -> User:
+        db_obj = User(
+            email=obj_in.email,
+            hashed_password=await run_in_threadpool(get_password_hash, obj_in.password),
+            full_name=obj_in.full_name,
+            is_admin=obj_in.is_admin,
+        )
+        async with async_unit_of_work(db):
+            db.add(db_obj)
+            await db.flush()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update_async(
+        self, db: AsyncSession, *, db_obj: User, obj_in: UserUpdateDto
+    ) -> User:
+        update_data = obj_in.dict(exclude_unset=True)
+        if update_data["password"]:
+            # waits for the password hashing pool
+            obj_in.hashed_password = await run_in_threadpool(
+                get_password_hash, update_data["password"]
+            )
+        async with async_unit_of_work(db):
+            _user = await super().update_async(db, db_obj=db_obj, obj_in=obj_in)
+            after_commit(db, partial(cache.users.pop, _user.id))
+        return _user
+
+    async def remove_async(self, db: AsyncSession, *, _id: int) -> User:
+        async with async_unit_of_work(db):
+            _user = await super().remove_async(db, _id=_id)
+            after_commit(db, partial(cache.users.pop, _id))
+        return _user
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         """
@@ -49,8 +134,17 @@ class UserService(BaseService[User, UserCreateDto, UserUpdateDto]):
         _user = self.get_by_email(db, email=email)
         if not _user:
             return None
-        if not verify_password(password, _user.hashed_password):
+        valid, new_hashed_password = verify_and_update_password(
+            password, _user.hashed_password
+        )
+        if not valid:
             return None
+        if new_hashed_password:
+            # rehashed with current cost factor
+            with unit_of_work(db):
+                _user.hashed_password = new_hashed_password
+                db.flush()
+                after_commit(db, partial(cache.users.pop, _user.id))
         return _user
 
     def is_admin(self, _user: User) -> bool:
@@ -0,0 +1,48 @@
+from _pytest.monkeypatch import MonkeyPatch
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.tests.utils.car import create_test_car
+from app.tests.utils.customer import create_test_customer
+from app.tests.utils.rental import create_test_rental
+from app.tests.utils.reservation import create_test_reservation
+from app.tests.utils.utils import get_datetime
+
+
+def test_hot_read_endpoints_async(
+    client: TestClient,
+    superuser_token_headers: dict,
+    db: Session,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "ASYNC_DB_ENDPOINTS", True)
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    rental = create_test_rental(
+        db, car, customer, get_datetime(2030, 9, 1), get_datetime(2030, 9, 2)
+    )
+    reservation = create_test_reservation(
+        db, car, customer, get_datetime(2030, 9, 3), get_datetime(2030, 9, 4)
+    )
+
+    for path, obj in (
+        ("/cars/", car),
+        ("/rentals/", rental),
+        ("/reservations/", reservation),
+    ):
+        response = client.get(
+            f"{settings.API_V1_STR}{path}",
+            params={"after": obj.id - 1, "limit": 1},
+            headers=superuser_token_headers,
+        )
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["items"]] == [obj.id]
+
+    response = client.post(
+        f"{settings.API_V1_STR}/cars/query",
+        json={"model_name": car.model_name},
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    assert car.id in [item["id"] for item in response.json()]
@@ -1,8 +1,25 @@
+import base64
+import hashlib
+import json
+from pathlib import Path
+
+from _pytest.monkeypatch import MonkeyPatch
+from fastapi.encoders import jsonable_encoder
 from fastapi.testclient import TestClient
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app import services
 from app.core.config import settings
-from app.tests.utils.car import create_test_car
+from app.core.image_variants import generate_variants
+from app.models import Car
+from app.models.car_image import CarImage
+from app.tests.utils.car import (
+    create_test_car,
+    get_test_car_create_dto,
+    get_test_image_base64,
+)
+from app.utils.data_url import decode_data_url
 
 
 def test_create_car(
@@ -108,3 +125,143 @@ def test_delete_car_no_permissions(
         f"{settings.API_V1_STR}/cars/{car.id}", headers=normal_user_token_headers,
     )
     assert response.status_code == 401
+
+
+def test_get_car_image(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    data = jsonable_encoder(get_test_car_create_dto())
+    data["image_base64"] = get_test_image_base64(size=(40, 20))
+    _, image_data = decode_data_url(data["image_base64"])
+    response = client.post(
+        f"{settings.API_V1_STR}/cars/", headers=superuser_token_headers, json=data,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert "image_base64" not in content
+    image_hash = content["image_hash"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/cars/{content['id']}/image?v={image_hash}"
+    )
+    assert response.status_code == 200
+    assert response.content == image_data
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["etag"] == f'"{image_hash}"'
+    assert "immutable" in response.headers["cache-control"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/cars/{content['id']}/image",
+        headers={"If-None-Match": f'"{image_hash}"'},
+    )
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_get_car_image_not_checked(client: TestClient, db: Session) -> None:
+    # stored before uploads were checked (by the migration or a dump)
+    car = create_test_car(db)
+    data = b"<script>alert(1)</script>"
+    image = CarImage(
+        hash=hashlib.sha256(data).hexdigest(), content_type="text/html", data=data
+    )
+    db.merge(image)
+    db.flush()
+    car.image_hash = image.hash
+    db.commit()
+
+    response = client.get(f"{settings.API_V1_STR}/cars/{car.id}/image")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["x-content-type-options"] == "nosniff"
+
+
+def test_get_car_image_variant(
+    client: TestClient, db: Session, tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "CAR_IMAGE_VARIANTS_DIR", str(tmp_path))
+    car_create_dto = get_test_car_create_dto()
+    car_create_dto.image_base64 = get_test_image_base64()
+    car = services.car.create(db=db, obj_in=car_create_dto)
+    url = f"{settings.API_V1_STR}/cars/{car.id}/image?v={car.image_hash}"
+
+    # variant is not generated yet, original is served and not cached
+    response = client.get(f"{url}&variant=thumbnail")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["cache-control"] == "no-cache"
+
+    _, data = decode_data_url(car_create_dto.image_base64)
+    generate_variants(car.image_hash, data)
+
+    response = client.get(f"{url}&variant=thumbnail")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["etag"] == f'"{car.image_hash}-thumbnail"'
+    assert "immutable" in response.headers["cache-control"]
+    assert len(response.content) < len(data)
+
+    response = client.get(f"{url}&variant=huge")
+    assert response.status_code == 422
+
+
+def test_get_car_image_not_exists(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    car = create_test_car(db)
+
+    response = client.get(f"{settings.API_V1_STR}/cars/{car.id}/image")
+    assert response.status_code == 404
+
+
+def test_create_car_invalid_image(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    data = jsonable_encoder(get_test_car_create_dto())
+    png = base64.b64encode(b"\x89PNG\r\n\x1a\n not really").decode()
+    jpeg = get_test_image_base64(size=(20, 10), image_format="JPEG").split(",")[1]
+    html = base64.b64encode(b"<script>alert(1)</script>").decode()
+    for image_base64 in (
+        "not an image",
+        f"data:text/html;base64,{html}",
+        f"data:image/svg+xml;base64,{html}",
+        f"data:image/png;base64,{png}",
+        # content type must match the data
+        f"data:image/png;base64,{jpeg}",
+    ):
+        data["image_base64"] = image_base64
+        response = client.post(
+            f"{settings.API_V1_STR}/cars/", headers=superuser_token_headers, json=data,
+        )
+        assert response.status_code == 422
+
+
+def test_create_cars_bulk(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    last_id = db.query(func.max(Car.id)).scalar() or 0
+    body = "\n".join(
+        json.dumps({**jsonable_encoder(get_test_car_create_dto()), "model_name": name})
+        for name in ("Foo", "Bar")
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/cars/bulk",
+        headers={**superuser_token_headers, "Content-Type": "application/x-ndjson"},
+        data=body,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"imported": 2}
+    cars = db.query(Car).filter(Car.id > last_id).order_by(Car.id).all()
+    assert [car.model_name for car in cars] == ["Foo", "Bar"]
+
+
+def test_create_cars_bulk_no_permissions(
+    client: TestClient, normal_user_token_headers: dict
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/cars/bulk",
+        headers={**normal_user_token_headers, "Content-Type": "text/csv"},
+        data="model_name\nFoo\n",
+    )
+    assert response.status_code == 401
@@ -1,7 +1,10 @@
+from _pytest.monkeypatch import MonkeyPatch
 from fastapi.testclient import TestClient
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.models import Customer
 from app.tests.utils.customer import create_test_customer
 
 
@@ -79,3 +82,107 @@ def test_delete_customer(
         headers=superuser_token_headers,
     )
     assert response.status_code == 404
+
+
+def test_get_customers_pages(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    customers = [create_test_customer(db) for _ in range(3)]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/customers/",
+        headers=superuser_token_headers,
+        params={"limit": 2, "after": customers[0].id - 1},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["id"] for item in content["items"]] == [
+        customers[0].id,
+        customers[1].id,
+    ]
+    assert content["next_cursor"] == customers[1].id
+
+    response = client.get(
+        f"{settings.API_V1_STR}/customers/",
+        headers=superuser_token_headers,
+        params={"limit": 2, "after": content["next_cursor"]},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["id"] for item in content["items"]] == [customers[2].id]
+    assert content["next_cursor"] is None
+
+
+def test_get_customers_page_limit_too_big(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/customers/",
+        headers=superuser_token_headers,
+        params={"limit": settings.MAX_PAGE_SIZE + 1},
+    )
+    assert response.status_code == 422
+
+
+def test_create_customers_bulk(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    last_id = db.query(func.max(Customer.id)).scalar() or 0
+    body = "full_name,address,phone_number\n" 'Foo,"Bar, 1",123\n' "Baz,,\n"
+    response = client.post(
+        f"{settings.API_V1_STR}/customers/bulk",
+        headers={**superuser_token_headers, "Content-Type": "text/csv"},
+        data=body,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"imported": 2}
+    customers = db.query(Customer).filter(Customer.id > last_id).order_by(Customer.id)
+    assert [(c.full_name, c.address, c.phone_number) for c in customers] == [
+        ("Foo", "Bar, 1", "123"),
+        ("Baz", None, None),
+    ]
+
+
+def test_create_customers_bulk_invalid_rows(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    count = db.query(Customer).count()
+    body = '{"full_name": "Foo"}\n\n{"address": "Bar"}\nnot json\n'
+    response = client.post(
+        f"{settings.API_V1_STR}/customers/bulk",
+        headers={**superuser_token_headers, "Content-Type": "application/x-ndjson"},
+        data=body,
+    )
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [
+        [2, "full_name"],
+        [3],
+    ]
+    # nothing is imported if any row is invalid
+    assert db.query(Customer).count() == count
+
+
+def test_create_customers_bulk_too_large(
+    client: TestClient, superuser_token_headers: dict, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "BULK_IMPORT_MAX_BYTES", 20)
+    headers = {**superuser_token_headers, "Content-Type": "text/csv"}
+    body = "full_name\n" + "Foo\n" * 5
+
+    # by Content-Length, and counted while reading body without it (chunked)
+    for data in (body, (line.encode() for line in body.splitlines(True))):
+        response = client.post(
+            f"{settings.API_V1_STR}/customers/bulk", headers=headers, data=data
+        )
+        assert response.status_code == 413
+
+
+def test_create_customers_bulk_unsupported_format(
+    client: TestClient, superuser_token_headers: dict
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/customers/bulk",
+        headers=superuser_token_headers,
+        json=[{"full_name": "Foo"}],
+    )
+    assert response.status_code == 415
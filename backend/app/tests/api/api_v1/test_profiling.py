@@ -0,0 +1,82 @@
+from pathlib import Path
+from typing import Dict
+
+from _pytest.monkeypatch import MonkeyPatch
+from fastapi.testclient import TestClient
+
+from app.api.profiling import PROFILE_HEADER
+from app.core.config import settings
+
+
+def test_profile_request(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    normal_user_token_headers: Dict[str, str],
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(settings, "PROFILES_DIR", str(tmp_path))
+
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/",
+        headers={**superuser_token_headers, PROFILE_HEADER: "1"},
+    )
+    assert r.status_code == 200
+    name = r.headers[PROFILE_HEADER]
+    assert (tmp_path / name).exists()
+
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/profiles/{name}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    for line in r.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack.split(";")[0] in ("event loop", "threadpool")
+        assert int(count) > 0
+
+    # only admins can profile requests and read profiles
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/",
+        headers={**normal_user_token_headers, PROFILE_HEADER: "1"},
+    )
+    assert r.status_code == 200
+    assert PROFILE_HEADER not in r.headers
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/profiles/{name}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 401
+
+    r = client.get(f"{settings.API_V1_STR}/customers/", headers=superuser_token_headers)
+    assert PROFILE_HEADER not in r.headers
+
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/profiles/..%2F{name}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 404
+
+
+def test_old_profiles_are_removed(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(settings, "PROFILES_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILES_MAX_COUNT", 2)
+    old_profiles = ["1000-0000000a.folded", "2000-0000000b.folded"]
+    for name in old_profiles:
+        (tmp_path / name).write_text("")
+    (tmp_path / "other.txt").write_text("")
+
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/",
+        headers={**superuser_token_headers, PROFILE_HEADER: "1"},
+    )
+    assert r.status_code == 200
+    assert {path.name for path in tmp_path.iterdir()} == {
+        old_profiles[1],
+        r.headers[PROFILE_HEADER],
+        "other.txt",
+    }
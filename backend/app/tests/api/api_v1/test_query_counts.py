@@ -0,0 +1,246 @@
+from typing import Dict, Generator
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.main import app
+from app.tests.utils.car import (
+    create_test_car,
+    get_test_car_create_dto,
+    get_test_image_base64,
+)
+from app.tests.utils.customer import create_test_customer, get_test_customer_create_dto
+from app.tests.utils.queries import (
+    assert_commits,
+    assert_max_queries,
+    get_counted_async_db,
+    get_counted_db,
+    get_counted_hot_read_db,
+)
+from app.tests.utils.rental import get_test_rental_create_dto
+from app.tests.utils.reservation import (
+    create_test_reservation,
+    get_test_reservation_create_dto,
+)
+from app.tests.utils.utils import get_datetime, random_email, random_lower_string
+
+# Maximum number of queries issued by each endpoint (including authentication),
+# duplicated lookups of the same entity within a request break these
+
+START_DATE = get_datetime(2030, 1, 1)
+END_DATE = get_datetime(2030, 1, 5)
+
+
+@pytest.fixture(autouse=True)
+def counted_db() -> Generator:
+    app.dependency_overrides[deps.get_db] = get_counted_db
+    app.dependency_overrides[deps.get_async_db] = get_counted_async_db
+    app.dependency_overrides[deps.get_read_db] = get_counted_db
+    app.dependency_overrides[deps.get_async_read_db] = get_counted_async_db
+    app.dependency_overrides[deps.get_hot_read_db] = get_counted_hot_read_db
+    yield
+    app.dependency_overrides.pop(deps.get_db)
+    app.dependency_overrides.pop(deps.get_async_db)
+    app.dependency_overrides.pop(deps.get_read_db)
+    app.dependency_overrides.pop(deps.get_async_read_db)
+    app.dependency_overrides.pop(deps.get_hot_read_db)
+
+
+def url(path: str) -> str:
+    return f"{settings.API_V1_STR}{path}"
+
+
+def test_login_queries(client: TestClient) -> None:
+    login_data = {
+        "username": settings.FIRST_SUPERUSER,
+        "password": settings.FIRST_SUPERUSER_PASSWORD,
+    }
+    with assert_max_queries(1):
+        r = client.post(url("/login/access-token"), data=login_data)
+    assert r.status_code == 200
+
+
+def test_users_queries(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    with assert_max_queries(2):
+        r = client.get(url("/users/"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+    # authenticated user is cached
+    with assert_max_queries(0):
+        r = client.get(url("/users/me"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+    data = {"email": random_email(), "password": random_lower_string()}
+    with assert_max_queries(4):
+        r = client.post(url("/users/"), headers=superuser_token_headers, json=data)
+    assert r.status_code == 200
+    user_id = r.json()["id"]
+
+    with assert_max_queries(2):
+        r = client.get(url(f"/users/{user_id}"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+
+def test_cars_queries(
+    client: TestClient, superuser_token_headers: Dict[str, str], db: Session
+) -> None:
+    with assert_max_queries(2):
+        r = client.get(url("/cars/"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+    query = {"availability_dates": {"start": START_DATE, "end": END_DATE}}
+    with assert_max_queries(2):
+        r = client.post(
+            url("/cars/query"),
+            headers=superuser_token_headers,
+            json=jsonable_encoder(query),
+        )
+    assert r.status_code == 200
+
+    data = jsonable_encoder(get_test_car_create_dto())
+    data["image_base64"] = get_test_image_base64(size=(10, 10))
+    with assert_max_queries(4):
+        r = client.post(url("/cars/"), headers=superuser_token_headers, json=data)
+    assert r.status_code == 200
+    car_id = r.json()["id"]
+
+    with assert_max_queries(2):
+        r = client.get(url(f"/cars/{car_id}"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+    with assert_max_queries(2):
+        r = client.get(url(f"/cars/{car_id}/image"))
+    assert r.status_code == 200
+
+    data["number_of_passengers"] = 2
+    with assert_max_queries(5):
+        r = client.put(
+            url(f"/cars/{car_id}"), headers=superuser_token_headers, json=data
+        )
+    assert r.status_code == 200
+
+    with assert_max_queries(5):
+        r = client.delete(url(f"/cars/{car_id}"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+
+def test_customers_queries(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    with assert_max_queries(2):
+        r = client.get(url("/customers/"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+    data = jsonable_encoder(get_test_customer_create_dto())
+    with assert_max_queries(3):
+        r = client.post(url("/customers/"), headers=superuser_token_headers, json=data)
+    assert r.status_code == 200
+    customer_id = r.json()["id"]
+
+    with assert_max_queries(2):
+        r = client.get(
+            url(f"/customers/{customer_id}"), headers=superuser_token_headers
+        )
+    assert r.status_code == 200
+
+    with assert_max_queries(3):
+        r = client.put(
+            url(f"/customers/{customer_id}"), headers=superuser_token_headers, json=data
+        )
+    assert r.status_code == 200
+
+    with assert_max_queries(5):
+        r = client.delete(
+            url(f"/customers/{customer_id}"), headers=superuser_token_headers
+        )
+    assert r.status_code == 200
+
+
+def test_reservations_queries(
+    client: TestClient, superuser_token_headers: Dict[str, str], db: Session
+) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+
+    with assert_max_queries(2):
+        r = client.get(url("/reservations/"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+    data = jsonable_encoder(
+        get_test_reservation_create_dto(car, customer, START_DATE, END_DATE)
+    )
+    with assert_max_queries(8):
+        r = client.post(
+            url("/reservations/"), headers=superuser_token_headers, json=data
+        )
+    assert r.status_code == 200
+    reservation_id = r.json()["id"]
+
+    with assert_max_queries(2):
+        r = client.get(
+            url(f"/reservations/{reservation_id}"), headers=superuser_token_headers
+        )
+    assert r.status_code == 200
+
+    data["end_date"] = jsonable_encoder(get_datetime(2030, 1, 6))
+    with assert_max_queries(7):
+        r = client.put(
+            url(f"/reservations/{reservation_id}"),
+            headers=superuser_token_headers,
+            json=data,
+        )
+    assert r.status_code == 200
+
+    with assert_max_queries(3):
+        r = client.delete(
+            url(f"/reservations/{reservation_id}"), headers=superuser_token_headers
+        )
+    assert r.status_code == 200
+
+
+def test_rentals_queries(
+    client: TestClient, superuser_token_headers: Dict[str, str], db: Session
+) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    reservation = create_test_reservation(db, car, customer, START_DATE, END_DATE)
+
+    with assert_max_queries(2), assert_commits(0):
+        r = client.get(url("/rentals/"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+    with assert_max_queries(2):
+        r = client.get(url("/rentals/overtime"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+    data = jsonable_encoder(
+        get_test_rental_create_dto(
+            car, customer, START_DATE, END_DATE, reservation=reservation
+        )
+    )
+    # reservation is marked as collected in the same transaction
+    with assert_max_queries(10), assert_commits(1):
+        r = client.post(url("/rentals/"), headers=superuser_token_headers, json=data)
+    assert r.status_code == 200
+    rental_id = r.json()["id"]
+
+    with assert_max_queries(2):
+        r = client.get(url(f"/rentals/{rental_id}"), headers=superuser_token_headers)
+    assert r.status_code == 200
+
+    data["end_date"] = jsonable_encoder(get_datetime(2030, 1, 6))
+    with assert_max_queries(7):
+        r = client.put(
+            url(f"/rentals/{rental_id}"), headers=superuser_token_headers, json=data
+        )
+    assert r.status_code == 200
+
+    with assert_max_queries(3):
+        r = client.delete(url(f"/rentals/{rental_id}"), headers=superuser_token_headers)
+    assert r.status_code == 200
@@ -0,0 +1,70 @@
+import logging
+from typing import Dict
+
+from _pytest.logging import LogCaptureFixture
+from _pytest.monkeypatch import MonkeyPatch
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.query_stats import (
+    QUERY_COUNT_HEADER,
+    SERVER_TIMING_HEADER,
+    QueryStats,
+    log_request,
+)
+from app.tests.utils.customer import create_test_customer
+
+
+def test_responses_carry_query_stats(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    db: Session,
+    caplog: LogCaptureFixture,
+) -> None:
+    customer = create_test_customer(db)
+
+    caplog.set_level(logging.INFO, logger="app.core.query_stats")
+    r = client.get(
+        f"{settings.API_V1_STR}/customers/{customer.id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    assert int(r.headers[QUERY_COUNT_HEADER]) >= 1
+    assert r.headers[SERVER_TIMING_HEADER].startswith("db;dur=")
+
+    record = caplog.records[-1]
+    assert getattr(record, "path") == f"{settings.API_V1_STR}/customers/{customer.id}"
+    assert getattr(record, "status_code") == 200
+    assert getattr(record, "query_count") == int(r.headers[QUERY_COUNT_HEADER])
+    assert "customer" in getattr(record, "slowest_statement")
+
+    # statements of async endpoints are counted as well
+    r = client.post(
+        f"{settings.API_V1_STR}/cars/query", headers=superuser_token_headers, json={}
+    )
+    assert r.status_code == 200
+    assert int(r.headers[QUERY_COUNT_HEADER]) >= 1
+
+
+def test_repeated_statements_are_logged(
+    caplog: LogCaptureFixture, monkeypatch: MonkeyPatch
+) -> None:
+    stats = QueryStats()
+    for _ in range(3):
+        stats.record("SELECT car", 0.001)
+    stats.record("SELECT customer", 0.002)
+    assert stats.count == 4
+    assert stats.slowest_statement == "SELECT customer"
+    assert stats.repeated(2) == [("SELECT car", 3)]
+
+    scope = {"method": "GET", "path": "/cars"}
+    caplog.set_level(logging.INFO, logger="app.core.query_stats")
+    log_request(scope, 200, stats)
+    assert not [r for r in caplog.records if r.levelno == logging.WARNING]
+
+    monkeypatch.setattr(settings, "QUERY_REPEAT_WARNING_THRESHOLD", 2)
+    log_request(scope, 200, stats)
+    (warning,) = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert getattr(warning, "repeated_statement") == "SELECT car"
+    assert getattr(warning, "repeat_count") == 3
@@ -0,0 +1,75 @@
+import time
+from typing import Any, Dict, List
+
+from _pytest.monkeypatch import MonkeyPatch
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.core.read_routing import READ_PRIMARY_UNTIL_HEADER
+from app.db.session import SessionLocal
+from app.tests.utils.customer import get_test_customer_create_dto
+
+
+def test_writes_return_read_primary_deadline(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    data = jsonable_encoder(get_test_customer_create_dto())
+    r = client.post(
+        f"{settings.API_V1_STR}/customers/", headers=superuser_token_headers, json=data
+    )
+    assert r.status_code == 200
+    deadline = float(r.headers[READ_PRIMARY_UNTIL_HEADER])
+    assert time.time() < deadline <= time.time() + settings.READ_PRIMARY_WINDOW_SECONDS
+
+    r = client.get(f"{settings.API_V1_STR}/customers/", headers=superuser_token_headers)
+    assert READ_PRIMARY_UNTIL_HEADER not in r.headers
+
+    # searching is not a write
+    r = client.post(
+        f"{settings.API_V1_STR}/cars/query", headers=superuser_token_headers, json={}
+    )
+    assert r.status_code == 200
+    assert READ_PRIMARY_UNTIL_HEADER not in r.headers
+
+
+def test_reads_after_write_use_primary(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    monkeypatch: MonkeyPatch,
+) -> None:
+    replica_sessions: List[Session] = []
+
+    def replica_session(**kwargs: Any) -> Session:
+        db = SessionLocal(**kwargs)
+        replica_sessions.append(db)
+        return db
+
+    monkeypatch.setattr(deps, "ReadSessionLocal", replica_session)
+
+    r = client.get(f"{settings.API_V1_STR}/customers/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert len(replica_sessions) == 1
+
+    headers = {
+        **superuser_token_headers,
+        READ_PRIMARY_UNTIL_HEADER: str(int(time.time()) + 5),
+    }
+    r = client.get(f"{settings.API_V1_STR}/customers/", headers=headers)
+    assert r.status_code == 200
+    assert len(replica_sessions) == 1
+
+    # expired deadline
+    headers[READ_PRIMARY_UNTIL_HEADER] = str(int(time.time()) - 1)
+    r = client.get(f"{settings.API_V1_STR}/customers/", headers=headers)
+    assert r.status_code == 200
+    assert len(replica_sessions) == 2
+
+    # deadline beyond the window is not one the server issued
+    for deadline in (time.time() + settings.READ_PRIMARY_WINDOW_SECONDS + 60, "inf"):
+        headers[READ_PRIMARY_UNTIL_HEADER] = str(deadline)
+        r = client.get(f"{settings.API_V1_STR}/customers/", headers=headers)
+        assert r.status_code == 200
+    assert len(replica_sessions) == 4
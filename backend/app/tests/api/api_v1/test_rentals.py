@@ -1,10 +1,15 @@
+import csv
+import io
+import json
 from datetime import datetime, timedelta
 
 import pytz
+from _pytest.monkeypatch import MonkeyPatch
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.models.rental import RentalStatus
 from app.tests.utils.car import create_test_car
 from app.tests.utils.customer import create_test_customer
 from app.tests.utils.rental import create_test_rental
@@ -137,6 +142,24 @@ def test_get_rentals(
     assert response.status_code == 200
 
 
+def test_get_active_rentals(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    rental = create_test_rental(
+        db, car, customer, get_datetime(2030, 10, 24), get_datetime(2030, 10, 25)
+    )
+
+    response = client.get(
+        f"{settings.API_V1_STR}/rentals/active", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert rental.id in [item["id"] for item in content]
+    assert all(item["status"] == "IN_PROGRESS" for item in content)
+
+
 def test_get_overtime_rentals(
     client: TestClient, superuser_token_headers: dict, db: Session
 ) -> None:
@@ -155,6 +178,61 @@ def test_get_overtime_rentals(
     assert len(response.json()) > 0
 
 
+def test_export_rentals(
+    client: TestClient,
+    superuser_token_headers: dict,
+    db: Session,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    # rows are fetched in more than one batch
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 1)
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    rentals = [
+        create_test_rental(
+            db,
+            car,
+            customer,
+            get_datetime(2031, 1, day, 9, 0),
+            get_datetime(2031, 1, day + 1, 12, 0),
+        )
+        for day in (1, 10, 20)
+    ]
+    rentals[1].status = RentalStatus.COMPLETED
+    db.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/rentals/export",
+        headers=superuser_token_headers,
+        params={"start": "2031-01-02T00:00:00Z", "end": "2031-01-31T00:00:00Z"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = [
+        row
+        for row in csv.DictReader(io.StringIO(response.text))
+        if row["car_id"] == str(car.id)
+    ]
+    assert [row["id"] for row in rows] == [str(rental.id) for rental in rentals]
+    assert rows[1]["status"] == "COMPLETED"
+    assert rows[1]["reservation_id"] == ""
+    assert "booked_dates" not in rows[1]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/rentals/export",
+        headers=superuser_token_headers,
+        params={
+            "format": "ndjson",
+            "status": "IN_PROGRESS",
+            "start": "2031-01-05T00:00:00Z",
+        },
+    )
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows if row["car_id"] == car.id] == [rentals[2].id]
+    assert rows[-1]["start_date"] == "2031-01-20T09:00:00+00:00"
+
+
 def test_get_rental_by_id(
     client: TestClient, superuser_token_headers: dict, db: Session
 ) -> None:
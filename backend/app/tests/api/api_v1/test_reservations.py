@@ -1,3 +1,6 @@
+import csv
+import io
+import json
 from datetime import datetime, timedelta
 
 import pytz
@@ -92,6 +95,24 @@ def test_get_reservations(
     assert response.status_code == 200
 
 
+def test_get_active_reservations(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    reservation = create_test_reservation(
+        db, car, customer, get_datetime(2030, 10, 24), get_datetime(2030, 10, 25)
+    )
+
+    response = client.get(
+        f"{settings.API_V1_STR}/reservations/active", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert reservation.id in [item["id"] for item in content]
+    assert all(item["status"] == "NEW" for item in content)
+
+
 def test_get_reservation_by_id(
     client: TestClient, superuser_token_headers: dict, db: Session
 ) -> None:
@@ -192,3 +213,44 @@ def test_update_reservation_not_existing(
         json=data,
     )
     assert response.status_code == 404
+
+
+def test_export_reservations(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    reservation = create_test_reservation(
+        db,
+        car,
+        customer,
+        get_datetime(2031, 2, 1, 9, 0),
+        get_datetime(2031, 2, 2, 9, 0),
+    )
+
+    response = client.get(
+        f"{settings.API_V1_STR}/reservations/export",
+        headers=superuser_token_headers,
+        params={"format": "ndjson", "status": "NEW", "end": "2031-02-01T12:00:00Z"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {
+        "id": reservation.id,
+        "car_id": car.id,
+        "customer_id": customer.id,
+        "start_date": "2031-02-01T09:00:00+00:00",
+        "end_date": "2031-02-02T09:00:00+00:00",
+        "status": "NEW",
+    } in rows
+
+    response = client.get(
+        f"{settings.API_V1_STR}/reservations/export",
+        headers=superuser_token_headers,
+        params={"status": "CANCELLED", "start": "2031-02-01T00:00:00Z"},
+    )
+    assert response.status_code == 200
+    assert str(reservation.id) not in [
+        row["id"] for row in csv.DictReader(io.StringIO(response.text))
+    ]
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from _pytest.monkeypatch import MonkeyPatch
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core import tracing
+from app.core.config import settings
+from app.tests.core.test_tracing import read_spans
+from app.tests.utils.car import create_test_car
+from app.tests.utils.customer import create_test_customer
+from app.tests.utils.utils import get_datetime
+
+
+def test_trace_rental_create(
+    client: TestClient,
+    superuser_token_headers: dict,
+    db: Session,
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1)
+    monkeypatch.setattr(settings, "TRACING_EXPORT_PATH", str(path))
+
+    data = {
+        "car_id": car.id,
+        "customer_id": customer.id,
+        "start_date": get_datetime(2030, 11, 24).isoformat(),
+        "end_date": get_datetime(2030, 11, 25).isoformat(),
+        "status": "IN_PROGRESS",
+    }
+    response = client.post(
+        f"{settings.API_V1_STR}/rentals/", headers=superuser_token_headers, json=data
+    )
+    assert response.status_code == 200
+
+    spans = read_spans(path)
+    assert len({span["traceId"] for span in spans}) == 1
+    by_name = {span["name"]: span for span in spans}
+    root = by_name[f"POST {settings.API_V1_STR}/rentals/"]
+    assert "parentSpanId" not in root
+    assert {"key": "http.status_code", "value": {"intValue": "200"}} in root[
+        "attributes"
+    ]
+    create = by_name["RentalService.create"]
+    assert create["parentSpanId"] == root["spanId"]
+    assert by_name["BaseService.create"]["parentSpanId"] == create["spanId"]
+    assert by_name["RentalService.validate_availability_on_create"]
+    assert by_name["validate_car_with_id_exists"]
+    assert by_name["is_colliding_with_other_rentals"]
+    statements = [span for span in spans if span["kind"] == tracing.SPAN_KIND_CLIENT]
+    insert = next(span for span in statements if span["name"] == "INSERT")
+    assert insert["parentSpanId"] == by_name["BaseService.create"]["spanId"]
+    assert {"key": "db.system", "value": {"stringValue": "postgresql"}} in insert[
+        "attributes"
+    ]
+
+    # collisions are errors of the spans raising them
+    response = client.post(
+        f"{settings.API_V1_STR}/rentals/", headers=superuser_token_headers, json=data
+    )
+    assert response.status_code == 400
+    root = read_spans(path)[-1]
+    errors = [span for span in read_spans(path) if "status" in span]
+    assert errors
+    assert all(span["traceId"] == root["traceId"] for span in errors)
@@ -106,7 +106,7 @@ def test_retrieve_users(
     services.user.create(db, obj_in=user_in2)
 
     r = client.get(f"{settings.API_V1_STR}/users/", headers=superuser_token_headers)
-    all_users = r.json()
+    all_users = r.json()["items"]
 
     assert len(all_users) > 1
     for item in all_users:
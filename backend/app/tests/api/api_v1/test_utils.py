@@ -0,0 +1,27 @@
+from typing import Dict
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_get_db_pool_status(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["sync_pool"]["size"] == settings.DB_POOL_SIZE
+    assert content["sync_pool"]["checkouts"] > 0
+    assert content["async_pool"]["size"] == settings.ASYNC_DB_POOL_SIZE
+
+
+def test_get_db_pool_status_normal_user(
+    client: TestClient, normal_user_token_headers: Dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool", headers=normal_user_token_headers
+    )
+    assert r.status_code == 401
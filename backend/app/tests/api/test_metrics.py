@@ -0,0 +1,52 @@
+from typing import Dict
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.tests.utils.car import create_test_car
+from app.tests.utils.customer import create_test_customer
+from app.tests.utils.reservation import create_test_reservation
+from app.tests.utils.utils import get_datetime
+
+
+def test_get_metrics(
+    client: TestClient, superuser_token_headers: Dict[str, str], db: Session
+) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    start_date = get_datetime(2031, 1, 10)
+    end_date = get_datetime(2031, 1, 12)
+    create_test_reservation(db, car, customer, start_date, end_date)
+
+    data = {
+        "car_id": car.id,
+        "customer_id": customer.id,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "status": "NEW",
+    }
+    r = client.post(
+        f"{settings.API_V1_STR}/reservations/",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert r.status_code == 400
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = r.text.splitlines()
+    assert (
+        'http_request_duration_seconds_count{method="POST",'
+        f'route="{settings.API_V1_STR}/reservations/",status="400"}}'
+    ) in {line.rsplit(" ", 1)[0] for line in lines}
+    assert any(
+        line.startswith(
+            'http_exceptions_total{exception="ReservationCollisionException"}'
+        )
+        for line in lines
+    )
+    assert f'db_pool_size{{pool="sync"}} {settings.DB_POOL_SIZE:.1f}' in lines
+    assert "http_requests_in_flight 1.0" in lines
+    assert "password_hashing_queue_depth 0.0" in lines
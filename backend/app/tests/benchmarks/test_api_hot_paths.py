@@ -0,0 +1,61 @@
+import json
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.benchmarks.api_hot_paths import (
+    BASELINE_PATH,
+    QUERIES_KEY,
+    TOLERATED_KEYS,
+    Fixtures,
+    benchmark,
+    compare,
+    get_scenarios,
+)
+from app.models import Car, Reservation
+
+
+def test_benchmark(client: TestClient, db: Session) -> None:
+    last_car_id = db.query(Car.id).order_by(Car.id.desc()).limit(1).scalar()
+
+    results = benchmark(
+        client, db, iterations=3, warmup=1, only=["cars_query", "reservation_create"]
+    )
+
+    assert set(results) == {"cars_query", "reservation_create"}
+    for result in results.values():
+        assert 0 < result["p50_ms"] <= result["p99_ms"]
+        assert result["queries"] >= 1
+        assert result["memory_kib"] > 0
+    # cars booked by the benchmark are deleted with their bookings
+    assert not db.query(Car).filter(Car.id > last_car_id).count()
+    assert not db.query(Reservation).filter(Reservation.car_id > last_car_id).count()
+
+
+def test_compare() -> None:
+    baseline = {
+        "login": {"p50_ms": 100, "p99_ms": 200, "queries": 1, "memory_kib": 50},
+        "cars_query": {"p50_ms": 10, "p99_ms": 20, "queries": 2, "memory_kib": 500},
+    }
+    results = {
+        "login": {"p50_ms": 110, "p99_ms": 250, "queries": 1, "memory_kib": 50},
+        "cars_query": {"p50_ms": 5, "p99_ms": 10, "queries": 3, "memory_kib": 400},
+        "cars_list": {"p50_ms": 10, "p99_ms": 20, "queries": 1, "memory_kib": 500},
+    }
+
+    assert compare(results, baseline, tolerance=0.2) == [
+        "login p99_ms: 250 (baseline 200)",
+        "cars_query queries: 3 (baseline 2)",
+    ]
+    assert compare(baseline, baseline, tolerance=0) == []
+
+
+def test_baseline_covers_scenarios(client: TestClient, db: Session) -> None:
+    baseline = json.loads(BASELINE_PATH.read_text())
+
+    # scenarios are only listed, fixtures aren't used
+    scenarios = get_scenarios(client, db, Fixtures(0, 0, 0, 0), datetime.now())
+    assert set(baseline) == {scenario.name for scenario in scenarios}
+    for result in baseline.values():
+        assert set(result) == {*TOLERATED_KEYS, QUERIES_KEY}
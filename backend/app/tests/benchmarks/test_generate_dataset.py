@@ -0,0 +1,98 @@
+from datetime import date
+from functools import partial
+from typing import Dict, Generator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.benchmarks.generate_dataset import TABLES, generate, generate_bookings
+from app.db.bulk_load import reset_sequences
+from app.models import Rental, Reservation
+from app.models.rental import RentalStatus
+from app.models.reservation import ReservationStatus
+from app.tests.utils.customer import create_test_customer
+from app.tests.utils.utils import get_datetime
+from app.utils.interval import Interval
+
+NOW = get_datetime(2026, 1, 1, 12, 0)
+
+
+def test_generate_bookings() -> None:
+    bookings = partial(
+        generate_bookings,
+        customers=10,
+        bookings_per_car=100,
+        first_day=date(2025, 1, 1),
+        days=400,
+        now=NOW,
+    )
+
+    generated = list(bookings(0, seed=1))
+    assert generated == list(bookings(0, seed=1))
+    assert generated != list(bookings(0, seed=2))
+    assert generated != list(bookings(1, seed=1))
+
+    assert len(generated) == 100
+    for previous, booking in zip(generated, generated[1:]):
+        assert not Interval(previous[0], previous[1]).is_intersecting(
+            Interval(booking[0], booking[1])
+        )
+    for start, end, customer, reservation_status, rental_status in generated:
+        assert start < end
+        assert 0 <= customer < 10
+        if start > NOW:
+            assert (reservation_status, rental_status) == ("NEW", None)
+        elif end < NOW:
+            assert rental_status != "IN_PROGRESS"
+            assert reservation_status != "NEW"
+
+
+@pytest.fixture
+def last_ids(db: Session) -> Generator[Dict[str, int], None, None]:
+    """
+    Highest ids before the test, generated rows (and rows created after them)
+    are deleted and sequences restored after the test
+    """
+    last_ids = {
+        table: db.execute(text(f'SELECT coalesce(max(id), 0) FROM "{table}"')).scalar()
+        for table in TABLES
+    }
+    yield last_ids
+
+    db.rollback()
+    for table in reversed(TABLES):
+        db.execute(
+            text(f'DELETE FROM "{table}" WHERE id > :id'), {"id": last_ids[table]}
+        )
+    reset_sequences(db, TABLES)
+    db.commit()
+
+
+@pytest.mark.ddl
+def test_generate(db: Session, last_ids: Dict[str, int]) -> None:
+    generated = generate(
+        db, cars=2, customers=3, bookings_per_car=50, years=1, seed=1, now=NOW
+    )
+
+    assert generated["car"] == 2
+    assert generated["customer"] == 3
+    reservations = db.query(Reservation).order_by(Reservation.id.desc()).limit(50).all()
+    assert {reservation.status for reservation in reservations} >= {
+        ReservationStatus.NEW,
+        ReservationStatus.COLLECTED,
+    }
+    rental = (
+        db.query(Rental)
+        .filter(Rental.reservation_id.isnot(None))
+        .order_by(Rental.id.desc())
+        .first()
+    )
+    assert rental is not None
+    assert rental.id > last_ids["rental"]
+    assert rental.status == RentalStatus.COMPLETED
+    assert rental.start_date == rental.reservation.start_date
+    assert rental.car_id == rental.reservation.car_id
+
+    # sequences continue after generated ids
+    assert create_test_customer(db).id > rental.customer_id
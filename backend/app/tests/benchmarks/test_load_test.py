@@ -0,0 +1,59 @@
+import argparse
+import json
+
+import pytest
+import requests
+
+from app.benchmarks.load_test import ERROR, OK, LoadStats, outcome, parse_mix
+from app.exceptions.reservation import ReservationCollisionException
+
+
+def test_load_stats_summary() -> None:
+    stats = LoadStats()
+    for latency in range(1, 101):
+        stats.record("search", latency / 1000, OK)
+    stats.record("reserve", 0.01, OK)
+    stats.record("reserve", 0.02, "reservation_collision")
+    stats.record("reserve", 0.03, "rental_collision")
+    stats.record("reserve", 0.04, ERROR)
+
+    summary = stats.summary(elapsed=2)
+
+    assert summary["throughput"] == 52
+    assert summary["operations"]["search"] == {
+        "requests": 100,
+        "p50_ms": 50,
+        "p90_ms": 90,
+        "p99_ms": 99,
+    }
+    assert summary["operations"]["reserve"] == {
+        "requests": 4,
+        "p50_ms": 20,
+        "p90_ms": 40,
+        "p99_ms": 40,
+        "error_rate": 0.25,
+        "reservation_collision_rate": 0.25,
+        "rental_collision_rate": 0.25,
+    }
+
+
+def test_outcome() -> None:
+    def response(status_code: int, content: bytes) -> requests.Response:
+        r = requests.Response()
+        r.status_code = status_code
+        r._content = content
+        return r
+
+    assert outcome(response(200, b"{}")) == OK
+    detail = ReservationCollisionException().detail
+    collision = response(400, json.dumps({"detail": detail}).encode())
+    assert outcome(collision) == "reservation_collision"
+    for body in (b'{"detail": "Other"}', b'{"detail": []}', b"[]", b"<html>"):
+        assert outcome(response(400, body)) == ERROR
+    assert outcome(response(502, b"<html>")) == ERROR
+
+
+def test_parse_mix() -> None:
+    assert parse_mix("search=10,reserve=1") == {"search": 10, "reserve": 1}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("search=10,delete=1")
@@ -1,14 +1,42 @@
-from typing import Dict, Generator
+from typing import Dict, Generator, List
 
 import pytest
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.nodes import Item
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.main import app
 from app.tests.utils.user import authentication_token_from_email
-from app.tests.utils.utils import get_superuser_token_headers
+from app.tests.utils.utils import get_superuser_token_headers, run_async
+
+
+def pytest_addoption(parser: Parser) -> None:
+    parser.addoption(
+        "--run-ddl",
+        action="store_true",
+        help="run tests marked ddl, they drop and recreate indexes and foreign keys"
+        " of the test database, which waits for (or deadlocks with) open sessions",
+    )
+
+
+def pytest_configure(config: Config) -> None:
+    config.addinivalue_line(
+        "markers", "ddl: drops and recreates indexes and foreign keys (--run-ddl)"
+    )
+
+
+def pytest_collection_modifyitems(config: Config, items: List[Item]) -> None:
+    if config.getoption("--run-ddl"):
+        return
+    skip_ddl = pytest.mark.skip(reason="changes schema of the test database, --run-ddl")
+    for item in items:
+        if "ddl" in item.keywords:
+            item.add_marker(skip_ddl)
 
 
 @pytest.fixture(scope="session")
@@ -16,6 +44,15 @@ def db() -> Generator:
     yield SessionLocal()
 
 
+@pytest.fixture
+def async_db() -> Generator[AsyncSession, None, None]:
+    # transactions left open would hold locks of later tests (e.g. DROP INDEX)
+    db = AsyncSessionLocal()
+    yield db
+    run_async(db.rollback())
+    run_async(db.close())
+
+
 @pytest.fixture(scope="module")
 def client() -> Generator:
     with TestClient(app) as c:
@@ -0,0 +1,32 @@
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache() -> None:
+    cache = TTLCache(max_size=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    # least recently used entry is evicted
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    cache.pop("a")
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_expiry() -> None:
+    cache = TTLCache(max_size=10, ttl=60)
+
+    cache.set("expired", 1, expires_at=time.time() - 1)
+    cache.set("later", 2, expires_at=time.time() + 3600)
+    assert cache.get("expired") is None
+    assert cache.get("later") == 2
+
+    cache = TTLCache(max_size=10, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.job_lease import acquire_job_lease
+from app.models import JobLease
+from app.tests.utils.utils import random_lower_string
+
+
+def test_acquire_job_lease(db: Session) -> None:
+    name = random_lower_string()
+
+    assert acquire_job_lease(db, name, timedelta(minutes=1))
+    # other instances skip the tick
+    assert not acquire_job_lease(db, name, timedelta(minutes=1))
+    assert acquire_job_lease(db, random_lower_string(), timedelta(minutes=1))
+
+
+def test_acquire_expired_job_lease(db: Session) -> None:
+    name = random_lower_string()
+
+    assert acquire_job_lease(db, name, timedelta(0))
+    assert acquire_job_lease(db, name, timedelta(minutes=1))
+
+    lease = db.query(JobLease).get(name)
+    assert lease.holder
+    assert not acquire_job_lease(db, name, timedelta(minutes=1))
@@ -0,0 +1,49 @@
+import math
+
+from app.core.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_render_metrics() -> None:
+    registry = Registry()
+    counter = registry.register(Counter("jobs_total", "Jobs run", ["job"]))
+    gauge = registry.register(Gauge("queue_depth", "Tasks waiting"))
+    registry.register(
+        Gauge("pool_size", "Pool size", ["pool"], function=lambda: {("sync",): 5})
+    )
+
+    counter.inc(job='say "hi"\n')
+    counter.inc(2, job="cleanup")
+    gauge.inc()
+    gauge.inc(3)
+    gauge.dec()
+
+    assert registry.render() == (
+        "# HELP jobs_total Jobs run\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{job="cleanup"} 2.0\n'
+        'jobs_total{job="say \\"hi\\"\\n"} 1.0\n'
+        "# HELP queue_depth Tasks waiting\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 3.0\n"
+        "# HELP pool_size Pool size\n"
+        "# TYPE pool_size gauge\n"
+        'pool_size{pool="sync"} 5.0\n'
+    )
+
+
+def test_render_histogram() -> None:
+    histogram = Histogram("duration_seconds", "Duration", ["route"], buckets=[0.1, 1])
+
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, route="/cars")
+
+    assert histogram.render() == [
+        "# HELP duration_seconds Duration",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{route="/cars",le="0.1"} 2.0',
+        'duration_seconds_bucket{route="/cars",le="1.0"} 3.0',
+        'duration_seconds_bucket{route="/cars",le="+Inf"} 4.0',
+        'duration_seconds_sum{route="/cars"} 3.65',
+        'duration_seconds_count{route="/cars"} 4.0',
+    ]
+    assert histogram.buckets[-1] == math.inf
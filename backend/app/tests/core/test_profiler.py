@@ -0,0 +1,53 @@
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.profiler import SamplingProfiler
+from app.tests.utils.utils import run_async
+
+
+def busy_request_work() -> None:
+    started_at = time.perf_counter()
+    while time.perf_counter() - started_at < 0.05:
+        pass
+
+
+def busy_other_work(stopped: threading.Event) -> None:
+    while not stopped.is_set():
+        pass
+
+
+def test_sampling_profiler() -> None:
+    stopped = threading.Event()
+    other = threading.Thread(target=busy_other_work, args=(stopped,))
+    other.start()
+
+    async def request() -> SamplingProfiler:
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        try:
+            await run_in_threadpool(busy_request_work)
+            busy_request_work()
+        finally:
+            profiler.stop()
+        return profiler
+
+    try:
+        profiler = run_async(request())
+    finally:
+        stopped.set()
+        other.join()
+
+    stacks = profiler.collapsed().splitlines()
+    assert profiler.duration >= 0.1
+    assert any(
+        stack.startswith("threadpool;") and "busy_request_work" in stack
+        for stack in stacks
+    )
+    assert any(
+        stack.startswith("event loop;") and "busy_request_work" in stack
+        for stack in stacks
+    )
+    # threads working on other requests are not sampled
+    assert not any("busy_other_work" in stack for stack in stacks)
@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from passlib.hash import bcrypt
+
+from app.core import security
+from app.exceptions.password_hashing import PasswordHashingOverloadedException
+
+
+def test_password_hashing() -> None:
+    hashed_password = security.get_password_hash("secret")
+    assert security.verify_password("secret", hashed_password)
+    assert not security.verify_password("other", hashed_password)
+    assert security.password_hashing_queue_depth() == 0
+
+
+def test_password_with_outdated_cost_is_rehashed() -> None:
+    outdated_hash = bcrypt.using(rounds=4).hash("secret")
+
+    valid, new_hash = security.verify_and_update_password("secret", outdated_hash)
+    assert valid
+    assert new_hash and f"${security.settings.BCRYPT_ROUNDS:02}$" in new_hash
+
+    valid, new_hash = security.verify_and_update_password("secret", new_hash)
+    assert valid
+    assert new_hash is None
+
+
+def test_password_hashing_overloaded(monkeypatch: pytest.MonkeyPatch) -> None:
+    exhausted = threading.BoundedSemaphore(1)
+    exhausted.acquire()
+    monkeypatch.setattr(security, "_hashing_slots", exhausted)
+
+    with pytest.raises(PasswordHashingOverloadedException) as e:
+        security.get_password_hash("secret")
+    assert e.value.status_code == 503
+    assert security.password_hashing_queue_depth() == 0
+
+
+def test_password_hashing_pool_is_recreated(monkeypatch: pytest.MonkeyPatch) -> None:
+    # pool whose worker died, as if killed when out of memory
+    broken = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+    monkeypatch.setattr(security, "_hashing_executor", broken)
+
+    hashed_password = security.get_password_hash("secret")
+    assert security.verify_password("secret", hashed_password)
+    assert security._hashing_executor is not broken
+    assert security.password_hashing_queue_depth() == 0
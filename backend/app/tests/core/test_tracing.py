@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from app.core import tracing
+from app.core.config import settings
+
+
+def read_spans(path: Path) -> List[Dict[str, Any]]:
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource_spans in json.loads(line)["resourceSpans"]:
+            for scope_spans in resource_spans["scopeSpans"]:
+                spans.extend(scope_spans["spans"])
+    return spans
+
+
+@tracing.traced
+def double(value: int) -> int:
+    return value * 2
+
+
+@tracing.traced
+async def fail() -> None:
+    raise ValueError("failed")
+
+
+def test_spans_of_sampled_trace(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1)
+    monkeypatch.setattr(settings, "TRACING_EXPORT_PATH", str(path))
+
+    with tracing.start_trace("root", answer=42) as root:
+        assert root is not None
+        assert double(2) == 4
+        with tracing.span("child"):
+            with pytest.raises(ValueError):
+                fail().send(None)
+
+    spans = {span["name"]: span for span in read_spans(path)}
+    assert set(spans) == {"root", "double", "child", "fail"}
+    assert {span["traceId"] for span in spans.values()} == {root.trace.trace_id}
+    assert "parentSpanId" not in spans["root"]
+    assert spans["root"]["kind"] == tracing.SPAN_KIND_SERVER
+    assert spans["root"]["attributes"] == [
+        {"key": "answer", "value": {"intValue": "42"}}
+    ]
+    assert spans["double"]["parentSpanId"] == spans["root"]["spanId"]
+    assert spans["child"]["parentSpanId"] == spans["root"]["spanId"]
+    assert spans["fail"]["parentSpanId"] == spans["child"]["spanId"]
+    assert spans["fail"]["status"] == {
+        "code": tracing.STATUS_ERROR,
+        "message": "failed",
+    }
+    assert "status" not in spans["child"]
+    for span in spans.values():
+        assert int(span["startTimeUnixNano"]) <= int(span["endTimeUnixNano"])
+
+
+def test_unsampled_trace(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 0)
+    monkeypatch.setattr(settings, "TRACING_EXPORT_PATH", str(path))
+
+    with tracing.start_trace("root") as root:
+        assert root is None
+        assert double(2) == 4
+        with tracing.span("child") as child:
+            assert child is None
+    assert not path.exists()
@@ -0,0 +1,118 @@
+import base64
+import hashlib
+from pathlib import Path
+from typing import Generator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import services
+from app.db.bulk_load import reset_sequences
+from app.db.load_dump import DUMP_COLUMNS, DUMP_REVISION, DumpError, load_dump
+from app.models.rental import RentalStatus
+from app.models.reservation import ReservationStatus
+from app.tests.utils.customer import create_test_customer
+
+IMAGE_BASE64 = "data:image/png;base64," + base64.b64encode(b"dump").decode()
+
+
+@pytest.fixture
+def dump_id(db: Session) -> Generator[int, None, None]:
+    """
+    Id of dumped rows (above ids of all tables), loaded rows and rows created
+    after them are deleted and sequences restored after the test
+    """
+    tables = list(DUMP_COLUMNS)
+    ids = " UNION ALL ".join(f'SELECT max(id) FROM "{table}"' for table in tables)
+    dump_id = db.execute(
+        text(f"SELECT coalesce(max(max), 0) + 1 FROM ({ids}) i")
+    ).scalar()
+    yield dump_id
+
+    db.rollback()
+    for table in reversed(tables):
+        db.execute(text(f'DELETE FROM "{table}" WHERE id >= :id'), {"id": dump_id})
+    db.execute(
+        text("DELETE FROM car_image WHERE hash = :hash"),
+        {"hash": hashlib.sha256(b"dump").hexdigest()},
+    )
+    reset_sequences(db, tables)
+    db.commit()
+
+
+def write_dump(
+    path: Path,
+    dump_id: int,
+    revision: str = DUMP_REVISION,
+    image_base64: str = IMAGE_BASE64,
+) -> None:
+    files = {
+        "alembic_version": f"{revision}\n",
+        "user": f"{dump_id},,dump@example.com,hash,false\n",
+        "car": f"{dump_id},Dumped car,CAR,EV,AUTO,MANUAL,4,FRONT,,4,,43.00,,,"
+        f'"{image_base64}",,,,,,,\n',
+        "customer": f'{dump_id},"Dumped, customer",,\n',
+        "reservation": f"{dump_id},{dump_id},{dump_id},"
+        "2020-12-27 18:05:00,2020-12-31 18:04:00,COLLECTED\n",
+        "rental": f"{dump_id},{dump_id},{dump_id},{dump_id},2020-12-27 18:05:00.000000,"
+        "2020-12-31 18:04:00.000000,COMPLETED\n",
+    }
+    for table, content in files.items():
+        (path / f"rentally_public_{table}.csv").write_text(content)
+
+
+def test_load_dump(db: Session, tmp_path: Path, dump_id: int) -> None:
+    write_dump(tmp_path, dump_id)
+
+    loaded = load_dump(db, tmp_path)
+
+    assert loaded == {
+        "user": 1,
+        "car": 1,
+        "customer": 1,
+        "reservation": 1,
+        "rental": 1,
+    }
+    car = services.car.get(db, dump_id)
+    assert car.model_name == "Dumped car"
+    assert car.image_hash == hashlib.sha256(b"dump").hexdigest()
+    assert services.car.get_image(db, car.image_hash).data == b"dump"
+    customer = services.customer.get(db, dump_id)
+    assert customer.full_name == "Dumped, customer"
+    assert customer.address is None
+    assert services.user.get(db, dump_id).email == "dump@example.com"
+    assert services.reservation.get(db, dump_id).status == ReservationStatus.COLLECTED
+    rental = services.rental.get(db, dump_id)
+    assert rental.status == RentalStatus.COMPLETED
+    assert rental.start_date.isoformat() == "2020-12-27T18:05:00+00:00"
+
+    # sequences continue after loaded ids, indexes and foreign keys are back
+    assert create_test_customer(db).id > dump_id
+    assert db.execute(
+        text("SELECT 1 FROM pg_indexes WHERE indexname = 'ix_customer_full_name'")
+    ).scalar()
+    assert db.execute(
+        text("SELECT 1 FROM pg_constraint WHERE conname = 'rental_car_id_fkey'")
+    ).scalar()
+
+
+def test_load_dump_unsupported_revision(
+    db: Session, tmp_path: Path, dump_id: int
+) -> None:
+    write_dump(tmp_path, dump_id, revision="9f3e7a1c2d4b")
+
+    with pytest.raises(DumpError):
+        load_dump(db, tmp_path)
+
+
+def test_load_dump_invalid_image(db: Session, tmp_path: Path, dump_id: int) -> None:
+    for image_base64 in ("not a data URL", "data:image/png;base64,ZHVtcA="):
+        write_dump(tmp_path, dump_id, image_base64=image_base64)
+
+        with pytest.raises(DumpError) as e:
+            load_dump(db, tmp_path)
+        assert str(dump_id) in str(e.value)
+        # nothing is loaded
+        assert services.car.get(db, dump_id) is None
+        assert services.user.get(db, dump_id) is None
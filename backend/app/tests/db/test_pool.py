@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.config import settings
+from app.db.pool import TimedQueuePool, pool_status
+
+
+def test_pool_status() -> None:
+    engine = create_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    try:
+        connection = engine.connect()
+        status = pool_status(engine)
+        assert status["size"] == 1
+        assert status["checked_out"] == 1
+        assert status["idle"] == 0
+        assert status["checkouts"] == 1
+
+        # pool is exhausted
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        status = pool_status(engine)
+        assert status["timeouts"] == 1
+        assert status["waiting"] == 0
+        assert status["wait_time_max_ms"] > 0
+
+        connection.close()
+        status = pool_status(engine)
+        assert status["checked_out"] == 0
+        assert status["idle"] == 1
+
+        # statistics survive disposing of the pool
+        engine.dispose()
+        assert pool_status(engine)["checkouts"] == 1
+    finally:
+        engine.dispose()
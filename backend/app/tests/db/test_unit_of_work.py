@@ -0,0 +1,48 @@
+from typing import List
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app import services
+from app.db.session import SessionLocal
+from app.db.unit_of_work import after_commit, unit_of_work
+from app.models import Customer
+from app.tests.utils.customer import get_test_customer_create_dto
+
+
+def test_unit_of_work_commits_once(db: Session) -> None:
+    committed: List[int] = []
+
+    with unit_of_work(db):
+        first = services.customer.create(db, obj_in=get_test_customer_create_dto())
+        second = services.customer.create(db, obj_in=get_test_customer_create_dto())
+        after_commit(db, lambda: committed.append(first.id))
+
+        # nested units of work only flush
+        other_db = SessionLocal()
+        assert other_db.query(Customer).get(first.id) is None
+        other_db.close()
+        assert not committed
+
+    assert committed == [first.id]
+    other_db = SessionLocal()
+    assert other_db.query(Customer).get(first.id)
+    assert other_db.query(Customer).get(second.id)
+    other_db.close()
+
+
+def test_unit_of_work_rolls_back(db: Session) -> None:
+    committed: List[int] = []
+
+    with pytest.raises(ValueError):
+        with unit_of_work(db):
+            customer = services.customer.create(
+                db, obj_in=get_test_customer_create_dto()
+            )
+            customer_id = customer.id
+            after_commit(db, lambda: committed.append(customer_id))
+            raise ValueError()
+
+    assert db.query(Customer).get(customer_id) is None
+    db.commit()
+    assert not committed
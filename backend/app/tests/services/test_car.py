@@ -1,8 +1,21 @@
+import hashlib
+import time
 from decimal import Decimal
-
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from PIL import Image
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import services
+from app.core import image_variants
+from app.core.config import settings
+from app.core.image_variants import ImageVariant, generate_variants, get_variant
+from app.models import Car
 from app.models.car import AcType, CarType, DriveType, FuelType, GearboxType
 from app.schemas import CarCreateDto, CarUpdateDto
 from app.schemas.cars_search_query import (
@@ -11,11 +24,17 @@ from app.schemas.cars_search_query import (
     NumberOfPassengersRange,
     PricePerDayRange,
 )
-from app.tests.utils.car import create_test_car, get_test_car_create_dto
+from app.tests.utils.car import (
+    create_test_car,
+    get_test_car_create_dto,
+    get_test_image_base64,
+)
 from app.tests.utils.customer import create_test_customer
 from app.tests.utils.rental import create_test_rental
 from app.tests.utils.reservation import create_test_reservation
-from app.tests.utils.utils import get_datetime
+from app.tests.utils.utils import get_datetime, run_async
+from app.utils import data_url
+from app.utils.data_url import decode_data_url
 
 
 def test_create_car(db: Session) -> None:
@@ -63,6 +82,96 @@ def test_update_car(db: Session) -> None:
     assert updated_car.deposit_amount == car_update_dto.deposit_amount
 
 
+def test_update_car_image(db: Session, monkeypatch: MonkeyPatch) -> None:
+    car = create_test_car(db)
+    image_base64 = get_test_image_base64(size=(20, 10), image_format="JPEG")
+    _, data = decode_data_url(image_base64)
+
+    car_update_dto = CarUpdateDto(
+        **get_test_car_create_dto().dict(exclude={"image_base64"}),
+        image_base64=image_base64,
+    )
+
+    # image is decoded and verified once, when the DTO is validated
+    def decode_again(data_url: str) -> None:
+        raise AssertionError("image decoded again")
+
+    monkeypatch.setattr(data_url, "decode_image_data_url", decode_again)
+    updated_car = services.car.update(db=db, db_obj=car, obj_in=car_update_dto)
+    other_car = services.car.create(db=db, obj_in=car_update_dto)
+
+    # content-addressed, same image is stored once
+    assert updated_car.image_hash == hashlib.sha256(data).hexdigest()
+    assert other_car.image_hash == updated_car.image_hash
+    image = services.car.get_image(db, updated_car.image_hash)
+    assert image.data == data
+    assert image.content_type == "image/jpeg"
+
+    # image is kept if not given on update
+    car_update_dto.image_base64 = None
+    updated_car = services.car.update(db=db, db_obj=car, obj_in=car_update_dto)
+    assert updated_car.image_hash == image.hash
+
+
+def test_create_cars_bulk(db: Session) -> None:
+    image_base64 = get_test_image_base64(size=(30, 10), image_format="JPEG")
+    _, data = decode_data_url(image_base64)
+    objs_in = [
+        get_test_car_create_dto(),
+        CarCreateDto(
+            **get_test_car_create_dto().dict(exclude={"type", "image_base64"}),
+            type=CarType.TRUCK,
+            image_base64=image_base64,
+        ),
+    ]
+    last_id = db.query(func.max(Car.id)).scalar() or 0
+
+    assert services.car.create_bulk(db, objs_in=objs_in) == 2
+    car, truck = db.query(Car).filter(Car.id > last_id).order_by(Car.id).all()
+    assert car.type == CarType.CAR
+    assert car.price_per_day == objs_in[0].price_per_day
+    assert car.average_consumption is None
+    assert car.image_hash is None
+    assert truck.type == CarType.TRUCK
+    assert truck.image_hash == hashlib.sha256(data).hexdigest()
+
+
+def test_generate_image_variants(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "CAR_IMAGE_VARIANTS_DIR", str(tmp_path))
+    _, data = decode_data_url(get_test_image_base64(size=(1600, 1200)))
+
+    generate_variants("abc", data)
+
+    thumbnail = Image.open(BytesIO(get_variant("abc", ImageVariant.THUMBNAIL)))
+    preview = Image.open(BytesIO(get_variant("abc", ImageVariant.PREVIEW)))
+    # fits bounding box, aspect ratio is kept
+    assert thumbnail.format == "JPEG"
+    assert thumbnail.size == (333, 250)
+    assert preview.size == (667, 500)
+    assert get_variant("def", ImageVariant.THUMBNAIL) is None
+
+
+def test_schedule_image_variants(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(image_variants, "_pending", set())
+    monkeypatch.setattr(image_variants, "_failed", set())
+    monkeypatch.setattr(settings, "IMAGE_VARIANTS_QUEUE_SIZE", 1)
+
+    future = image_variants.schedule_variants("abc", b"not an image")
+    assert future is not None
+    # scheduled once at a time, the queue holds a single image
+    assert image_variants.schedule_variants("abc", b"not an image") is None
+    assert image_variants.schedule_variants("def", b"not an image") is None
+
+    with pytest.raises(Exception):
+        future.result(timeout=60)
+    deadline = time.monotonic() + 10
+    while "abc" not in image_variants._failed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # failed images are not scheduled again
+    assert image_variants.schedule_variants("abc", b"not an image") is None
+    assert "abc" not in image_variants._pending
+
+
 def test_delete_car(db: Session) -> None:
     car = create_test_car(db)
 
@@ -201,3 +310,52 @@ def test_get_by_criteria_availability(db: Session) -> None:
 
     available_cars = services.car.get_by_criteria(db, query)
     assert car.id not in [car.id for car in available_cars]
+
+
+def test_get_by_criteria_availability_returns_available_cars(db: Session) -> None:
+    available_car = create_test_car(db)
+    touching_car = create_test_car(db)
+    cancelled_reservation_car = create_test_car(db)
+    customer = create_test_customer(db)
+
+    create_test_reservation(
+        db,
+        touching_car,
+        customer,
+        get_datetime(2031, 1, 5, 18),
+        get_datetime(2031, 1, 7, 9),
+    )
+    reservation = create_test_reservation(
+        db,
+        cancelled_reservation_car,
+        customer,
+        get_datetime(2031, 1, 2, 9),
+        get_datetime(2031, 1, 3, 9),
+    )
+    services.reservation.mark_cancelled(db, reservation.id)
+
+    query = CarsSearchQuery()
+    query.availability_dates = AvailabilityDatesRange(
+        start=get_datetime(2031, 1, 1, 9), end=get_datetime(2031, 1, 5, 9)
+    )
+
+    available_car_ids = [car.id for car in services.car.get_by_criteria(db, query)]
+    assert available_car.id in available_car_ids
+    assert cancelled_reservation_car.id in available_car_ids
+    assert touching_car.id not in available_car_ids
+
+
+def test_get_by_criteria_async(db: Session, async_db: AsyncSession) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    start_date = get_datetime(2031, 2, 1)
+    end_date = get_datetime(2031, 2, 2)
+    create_test_reservation(db, car, customer, start_date, end_date)
+
+    query = CarsSearchQuery(model_name=car.model_name)
+    found_cars = run_async(services.car.get_by_criteria_async(async_db, query))
+    assert car.id in [found_car.id for found_car in found_cars]
+
+    query.availability_dates = AvailabilityDatesRange(start=start_date, end=end_date)
+    found_cars = run_async(services.car.get_by_criteria_async(async_db, query))
+    assert car.id not in [found_car.id for found_car in found_cars]
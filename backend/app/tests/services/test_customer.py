@@ -1,7 +1,9 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app import services
-from app.schemas import CustomerUpdateDto
+from app.models import Customer
+from app.schemas import CustomerCreateDto, CustomerUpdateDto
 from app.tests.utils.customer import create_test_customer, get_test_customer_create_dto
 
 
@@ -51,3 +53,33 @@ def test_delete_customer(db: Session) -> None:
     assert deleted_customer.full_name == customer.full_name
     assert deleted_customer.address == customer.address
     assert deleted_customer.phone_number == customer.phone_number
+
+
+def test_get_customers_page(db: Session) -> None:
+    customers = [create_test_customer(db) for _ in range(3)]
+
+    page, next_cursor = services.customer.get_page(
+        db, limit=2, after=customers[0].id - 1
+    )
+    assert [customer.id for customer in page] == [customers[0].id, customers[1].id]
+    assert next_cursor == customers[1].id
+
+    page, next_cursor = services.customer.get_page(db, limit=2, after=next_cursor)
+    assert [customer.id for customer in page] == [customers[2].id]
+    assert next_cursor is None
+
+
+def test_create_customers_bulk(db: Session) -> None:
+    full_name = "Bulk \\ customer\twith\nescapes"
+    objs_in = [
+        CustomerCreateDto(full_name=full_name, address=None, phone_number=""),
+        get_test_customer_create_dto(),
+    ]
+    last_id = db.query(func.max(Customer.id)).scalar() or 0
+
+    assert services.customer.create_bulk(db, objs_in=objs_in) == 2
+    customers = db.query(Customer).filter(Customer.id > last_id).order_by(Customer.id)
+    customer, _ = customers.all()
+    assert customer.full_name == full_name
+    assert customer.address is None
+    assert customer.phone_number == ""
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 
 import pytest
 import pytz
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app import services
@@ -15,7 +16,7 @@ from app.exceptions.reservation import (
     ReservationCollisionException,
     StartDateNotBeforeEndDateException,
 )
-from app.models.rental import RentalStatus
+from app.models.rental import Rental, RentalStatus
 from app.schemas.rental import RentalUpdateDto
 from app.tests.utils.car import create_test_car
 from app.tests.utils.customer import create_test_customer
@@ -223,3 +224,32 @@ def test_get_overtime_rentals_no_overtime(db: Session) -> None:
 
     overtime = services.rental.get_overtime(db)
     assert rental.id not in [rental.id for rental in overtime]
+
+
+def test_overlapping_rentals_rejected_by_database(db: Session) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+
+    db.add(
+        Rental(
+            car_id=car.id,
+            customer_id=customer.id,
+            start_date=get_datetime(2030, 12, 1, 9),
+            end_date=get_datetime(2030, 12, 3, 9),
+            status=RentalStatus.IN_PROGRESS,
+        )
+    )
+    db.commit()
+
+    db.add(
+        Rental(
+            car_id=car.id,
+            customer_id=customer.id,
+            start_date=get_datetime(2030, 12, 2, 9),
+            end_date=get_datetime(2030, 12, 5, 9),
+            status=RentalStatus.IN_PROGRESS,
+        )
+    )
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
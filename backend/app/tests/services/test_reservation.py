@@ -1,9 +1,13 @@
 from datetime import timedelta
 
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import services
+from app.core.config import settings
 from app.exceptions.instance_not_found import ReservationNotFoundException
 from app.exceptions.rental import RentalCollisionException
 from app.exceptions.reservation import (
@@ -13,13 +17,14 @@ from app.exceptions.reservation import (
     UpdatingCancelledReservationException,
     UpdatingCollectedReservationException,
 )
-from app.models.reservation import ReservationStatus
+from app.models.rental import Rental, RentalStatus
+from app.models.reservation import Reservation, ReservationStatus
 from app.schemas import ReservationUpdateDto
 from app.tests.utils.car import create_test_car
 from app.tests.utils.customer import create_test_customer
 from app.tests.utils.rental import create_test_rental
 from app.tests.utils.reservation import create_test_reservation
-from app.tests.utils.utils import get_datetime
+from app.tests.utils.utils import get_datetime, run_async
 
 
 def test_create_reservation(db: Session) -> None:
@@ -442,3 +447,113 @@ def test_mark_reservation_collected(db: Session) -> None:
 def test_mark_reservation_collected_on_not_existing_will_throw(db: Session) -> None:
     with pytest.raises(ReservationNotFoundException):
         services.reservation.mark_collected(db=db, reservation_id=999999999)
+
+
+def test_cancel_missed_reservations(db: Session, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "CANCEL_MISSED_RESERVATIONS_BATCH_SIZE", 2)
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+
+    missed = [
+        Reservation(
+            car_id=car.id,
+            customer_id=customer.id,
+            start_date=get_datetime(2020, 1, day),
+            end_date=get_datetime(2020, 1, day),
+            status=ReservationStatus.NEW,
+        )
+        for day in (1, 3, 5)
+    ]
+    with_rental = Reservation(
+        car_id=car.id,
+        customer_id=customer.id,
+        start_date=get_datetime(2020, 1, 7),
+        end_date=get_datetime(2020, 1, 7),
+        status=ReservationStatus.NEW,
+    )
+    upcoming = create_test_reservation(
+        db, car, customer, get_datetime(2030, 12, 1), get_datetime(2030, 12, 2)
+    )
+    db.add_all(missed + [with_rental])
+    db.flush()
+    db.add(
+        Rental(
+            car_id=car.id,
+            customer_id=customer.id,
+            reservation_id=with_rental.id,
+            start_date=with_rental.start_date,
+            end_date=with_rental.end_date,
+            status=RentalStatus.COMPLETED,
+        )
+    )
+    db.commit()
+
+    cancelled = services.reservation.cancel_missed_reservations(db)
+
+    assert cancelled >= len(missed)
+    for _reservation in missed:
+        assert _reservation.status == ReservationStatus.CANCELLED
+    assert with_rental.status == ReservationStatus.NEW
+    assert upcoming.status == ReservationStatus.NEW
+    assert services.reservation.cancel_missed_reservations(db) == 0
+
+
+def test_overlapping_reservations_rejected_by_database(db: Session) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+
+    db.add(
+        Reservation(
+            car_id=car.id,
+            customer_id=customer.id,
+            start_date=get_datetime(2030, 12, 1, 9),
+            end_date=get_datetime(2030, 12, 3, 9),
+            status=ReservationStatus.NEW,
+        )
+    )
+    db.commit()
+
+    db.add(
+        Reservation(
+            car_id=car.id,
+            customer_id=customer.id,
+            start_date=get_datetime(2030, 12, 3, 18),
+            end_date=get_datetime(2030, 12, 4, 9),
+            status=ReservationStatus.NEW,
+        )
+    )
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+
+def test_get_reservations_page_async(db: Session, async_db: AsyncSession) -> None:
+    car = create_test_car(db)
+    customer = create_test_customer(db)
+    reservations = [
+        create_test_reservation(
+            db,
+            car,
+            customer,
+            get_datetime(2032, 1, day),
+            get_datetime(2032, 1, day + 1),
+        )
+        for day in (1, 3, 5)
+    ]
+
+    page, next_cursor = run_async(
+        services.reservation.get_page_async(
+            async_db, limit=2, after=reservations[0].id - 1
+        )
+    )
+    assert [r.id for r in page] == [reservations[0].id, reservations[1].id]
+    assert next_cursor == reservations[1].id
+    # relations are loaded eagerly, lazy loading isn't possible in async sessions
+    assert page[0].car.id == car.id
+    assert page[0].customer.id == customer.id
+
+    page, next_cursor = run_async(
+        services.reservation.get_page_async(async_db, limit=2, after=next_cursor)
+    )
+    assert [r.id for r in page] == [reservations[2].id]
+    assert next_cursor is None
@@ -1,10 +1,14 @@
 from fastapi.encoders import jsonable_encoder
+from passlib.hash import bcrypt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import services
 from app.core.security import verify_password
+from app.db.session import SessionLocal
 from app.schemas.user import UserCreateDto, UserUpdateDto
-from app.tests.utils.utils import random_email, random_lower_string
+from app.tests.utils.queries import count_queries, counted_engine
+from app.tests.utils.utils import random_email, random_lower_string, run_async
 
 
 def test_create_user(db: Session) -> None:
@@ -74,3 +78,63 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_get_cached_user(db: Session) -> None:
+    user_in = UserCreateDto(email=random_email(), password=random_lower_string())
+    user = services.user.create(db, obj_in=user_in)
+    services.user.get_cached(db, _id=user.id)
+
+    other_db = SessionLocal(bind=counted_engine)
+    with count_queries() as statements:
+        cached_user = services.user.get_cached(other_db, _id=user.id)
+    assert not statements
+    assert cached_user in other_db
+    assert cached_user.email == user.email
+
+    # updated user is not served from the cache
+    user_in_update = UserUpdateDto(full_name="Updated", password=None)
+    services.user.update(db, db_obj=user, obj_in=user_in_update)
+    other_db.close()
+    other_db = SessionLocal()
+    assert services.user.get_cached(other_db, _id=user.id).full_name == "Updated"
+
+    services.user.remove(db, _id=user.id)
+    other_db.close()
+    other_db = SessionLocal()
+    assert services.user.get_cached(other_db, _id=user.id) is None
+    other_db.close()
+
+
+def test_authenticate_rehashes_outdated_password(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreateDto(email=email, password=password)
+    user = services.user.create(db, obj_in=user_in)
+    user.hashed_password = bcrypt.using(rounds=4).hash(password)
+    db.commit()
+
+    authenticated_user = services.user.authenticate(db, email=email, password=password)
+    assert authenticated_user
+    assert not authenticated_user.hashed_password.startswith("$2b$04$")
+    assert verify_password(password, authenticated_user.hashed_password)
+
+
+def test_get_cached_user_async(db: Session, async_db: AsyncSession) -> None:
+    user_in = UserCreateDto(email=random_email(), password=random_lower_string())
+    user = services.user.create(db, obj_in=user_in)
+
+    cached_user = run_async(services.user.get_cached_async(async_db, _id=user.id))
+    assert cached_user.email == user.email
+    cached_user = run_async(services.user.get_cached_async(async_db, _id=user.id))
+    assert cached_user in async_db
+
+    user_in_update = UserUpdateDto(full_name="Updated", password=random_lower_string())
+    updated_user = run_async(
+        services.user.update_async(async_db, db_obj=cached_user, obj_in=user_in_update)
+    )
+    assert updated_user.full_name == "Updated"
+    assert verify_password(user_in_update.password, updated_user.hashed_password)
+
+    run_async(services.user.remove_async(async_db, _id=user.id))
+    assert run_async(services.user.get_cached_async(async_db, _id=user.id)) is None
@@ -1,5 +1,9 @@
+import base64
 from decimal import Decimal
+from io import BytesIO
+from typing import Tuple
 
+from PIL import Image
 from sqlalchemy.orm import Session
 
 from app import models, services
@@ -25,3 +29,15 @@ def get_test_car_create_dto() -> CarCreateDto:
 def create_test_car(db: Session) -> models.Car:
     car_create_dto = get_test_car_create_dto()
     return services.car.create(db=db, obj_in=car_create_dto)
+
+
+def get_test_image_base64(
+    size: Tuple[int, int] = (1600, 1200), image_format: str = "PNG"
+) -> str:
+    buffer = BytesIO()
+    image = Image.new("RGBA", size, (200, 0, 0, 128))
+    if image_format == "JPEG":
+        image = image.convert("RGB")
+    image.save(buffer, image_format)
+    content_type = f"image/{image_format.lower()}"
+    return f"data:{content_type};base64," + base64.b64encode(buffer.getvalue()).decode()
@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Generator, Iterator, List
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api import deps
+from app.core import query_stats
+from app.core.config import settings
+
+# requests are counted on a separate engine, so that queries of background tasks
+# running at the same time are not
+counted_engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+counted_async_engine = create_async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URI)
+
+
+def get_counted_db(request: Request) -> Generator:
+    """
+    Replacement of deps.get_db dependency binding sessions to counted engine
+    """
+    for db in deps.get_db(request):
+        db.bind = counted_engine
+        yield db
+
+
+async def get_counted_async_db(request: Request) -> AsyncGenerator:
+    """
+    Replacement of deps.get_async_db dependency binding sessions to counted engine
+    """
+    async for db in deps.get_async_db(request):
+        db.sync_session.bind = counted_async_engine.sync_engine
+        yield db
+
+
+async def get_counted_hot_read_db(request: Request) -> AsyncGenerator:
+    """
+    Replacement of deps.get_hot_read_db dependency binding sessions to counted engine
+    """
+    async for db in deps.get_hot_read_db(request):
+        if isinstance(db, AsyncSession):
+            db.sync_session.bind = counted_async_engine.sync_engine
+        else:
+            db.bind = counted_engine
+        yield db
+
+
+@contextmanager
+def count_queries() -> Iterator[List[str]]:
+    """
+    Collects SQL statements executed on counted engine within the block
+    """
+    with query_stats.count_queries(
+        [counted_engine, counted_async_engine.sync_engine]
+    ) as statements:
+        yield statements
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[None]:
+    with count_queries() as statements:
+        yield
+    assert len(statements) <= max_queries, "\n\n".join(statements)
+
+
+@contextmanager
+def assert_commits(expected: int) -> Iterator[None]:
+    """
+    Asserts number of transactions committed on counted engine within the block
+    """
+    commits: List[Any] = []
+
+    def commit(conn: Any) -> None:
+        commits.append(conn)
+
+    engines = [counted_engine, counted_async_engine.sync_engine]
+    for engine in engines:
+        event.listen(engine, "commit", commit)
+    try:
+        yield
+    finally:
+        for engine in engines:
+            event.remove(engine, "commit", commit)
+    assert len(commits) == expected
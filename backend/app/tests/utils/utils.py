@@ -1,7 +1,8 @@
+import asyncio
 import random
 import string
 from datetime import datetime
-from typing import Dict
+from typing import Any, Awaitable, Dict
 
 import pytz
 from fastapi.testclient import TestClient
@@ -13,6 +14,14 @@ def get_datetime(year, month, day, hour=0, minute=0):
     return datetime(year, month, day, hour=hour, minute=minute, tzinfo=pytz.UTC)
 
 
+def run_async(awaitable: Awaitable) -> Any:
+    """
+    Runs coroutine in the event loop of TestClient (connections of async engine
+    are bound to the loop they were opened in)
+    """
+    return asyncio.get_event_loop().run_until_complete(awaitable)
+
+
 def random_lower_string() -> str:
     return "".join(random.choices(string.ascii_lowercase, k=32))
 
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+CSV_CONTENT_TYPE = "text/csv"
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonlines")
+
+
+def parse_rows(body: bytes, content_type: str) -> Iterator[Any]:
+    """
+    Returns rows of CSV (with header) or NDJSON body. Empty CSV fields are None,
+    blank NDJSON lines are skipped and malformed ones are returned as ValueError.
+    Raises ValueError on unsupported content type, iteration raises ValueError
+    or csv.Error on malformed body
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type == CSV_CONTENT_TYPE:
+        return _parse_csv(body)
+    if media_type in NDJSON_CONTENT_TYPES:
+        return _parse_ndjson(body)
+    raise ValueError(f"unsupported content type {content_type}")
+
+
+def _parse_csv(body: bytes) -> Iterator[Dict[str, Any]]:
+    for row in csv.DictReader(io.StringIO(body.decode("utf-8-sig"), newline="")):
+        yield {key: value if value != "" else None for key, value in row.items()}
+
+
+def _parse_ndjson(body: bytes) -> Iterator[Any]:
+    for line in body.decode("utf-8-sig").splitlines():
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def validate_rows(
+    rows: Iterator[Any], schema: Type[ModelType], max_errors: int
+) -> Tuple[List[ModelType], List[Dict[str, Any]]]:
+    """
+    Returns rows parsed with schema and errors of invalid rows (up to max_errors),
+    errors are located by row number (1-based, CSV header is not counted)
+    """
+    objs: List[ModelType] = []
+    errors: List[Dict[str, Any]] = []
+    for number, row in enumerate(rows, start=1):
+        error: Optional[List[Dict[str, Any]]] = None
+        try:
+            if isinstance(row, ValueError):
+                raise row
+            if not isinstance(row, dict):
+                raise TypeError("row is not an object")
+            objs.append(schema(**row))
+        except ValidationError as e:
+            error = e.errors()
+        except (TypeError, ValueError) as e:
+            error = [{"loc": (), "msg": str(e), "type": "value_error"}]
+        if error is not None and len(errors) < max_errors:
+            errors.extend(
+                {**row_error, "loc": (number, *row_error["loc"])} for row_error in error
+            )
+    return objs, errors
@@ -0,0 +1,95 @@
+import base64
+import binascii
+import re
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from PIL import Image
+
+DATA_URL_PATTERN = re.compile(
+    r"^data:(?P<content_type>[\w.+-]+/[\w.+-]+);base64,(?P<data>.*)$", re.DOTALL
+)
+
+
+def decode_data_url(data_url: str) -> Tuple[str, bytes]:
+    """
+    Returns content type and data of base64 encoded data URL
+    (as produced by FileReader.readAsDataURL)
+    """
+    match = DATA_URL_PATTERN.match(data_url)
+    if not match:
+        raise ValueError("expected base64 encoded data URL")
+    try:
+        data = base64.b64decode(match.group("data"), validate=True)
+    except binascii.Error:
+        raise ValueError("invalid base64 data")
+
+    return match.group("content_type"), data
+
+
+# images are served back with their content type, other types (e.g. text/html,
+# image/svg+xml) would run scripts on the API origin
+IMAGE_CONTENT_TYPES = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+
+
+def decode_image_data_url(data_url: str) -> Tuple[str, bytes]:
+    """
+    Returns content type and data of base64 encoded image data URL. The data
+    must be a PNG, JPEG, WebP or GIF image of the content type of the data URL
+    """
+    content_type, data = decode_data_url(data_url)
+    if content_type not in IMAGE_CONTENT_TYPES.values():
+        raise ValueError(
+            f"unsupported image type {content_type}, expected one of "
+            + ", ".join(IMAGE_CONTENT_TYPES.values())
+        )
+    try:
+        with Image.open(BytesIO(data)) as image:
+            image_format = image.format
+            image.verify()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        raise ValueError("invalid image data")
+    if IMAGE_CONTENT_TYPES.get(image_format or "") != content_type:
+        raise ValueError(f"image data is not {content_type}")
+
+    return content_type, data
+
+
+class ImageDataUrl(str):
+    """
+    Image data URL (see decode_image_data_url) as a pydantic field type, it is
+    decoded and verified once, when validated, and keeps its content type and data
+    """
+
+    content_type: str
+    data: bytes
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable[..., Any]]:
+        yield cls.validate
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type="string", format="data-url")
+
+    @classmethod
+    def validate(cls, v: Any) -> "ImageDataUrl":
+        if not isinstance(v, str):
+            raise TypeError("string required")
+        if isinstance(v, cls):
+            return v
+        image = cls(v)
+        image.content_type, image.data = decode_image_data_url(v)
+        return image
+
+
+def encode_data_url(content_type: str, data: bytes) -> str:
+    """
+    Returns base64 encoded data URL of given data
+    """
+    return f"data:{content_type};base64,{base64.b64encode(data).decode()}"
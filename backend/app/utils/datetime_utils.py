@@ -1,4 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
+
+import pytz
 
 
 def datetime_without_seconds(date: datetime) -> datetime:
@@ -6,3 +8,12 @@ def datetime_without_seconds(date: datetime) -> datetime:
     Returns given datetime with seconds and microseconds set to 0
     """
     return date.replace(second=0, microsecond=0)
+
+
+def date_in_utc(_datetime: datetime) -> date:
+    """
+    Returns calendar date of given datetime in UTC, naive datetimes are treated as UTC
+    """
+    if _datetime.tzinfo is None:
+        _datetime = _datetime.replace(tzinfo=pytz.UTC)
+    return _datetime.astimezone(pytz.UTC).date()
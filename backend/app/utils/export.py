@@ -0,0 +1,54 @@
+import csv
+import enum
+import io
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, Sequence
+
+from app.schemas.export import ExportFormat
+from app.utils.bulk_import import CSV_CONTENT_TYPE, NDJSON_CONTENT_TYPES
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: CSV_CONTENT_TYPE,
+    ExportFormat.NDJSON: NDJSON_CONTENT_TYPES[0],
+}
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def format_rows(
+    columns: Sequence[str],
+    batches: Iterable[Iterable[Sequence[Any]]],
+    export_format: ExportFormat,
+) -> Iterator[str]:
+    """
+    Returns chunks of CSV (with header, None is an empty field) or NDJSON document,
+    one chunk per batch of rows, so that rows are never all held in memory
+    """
+    if export_format == ExportFormat.CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows([_export_value(value) for value in row] for row in batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # header of empty export
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for batch in batches:
+            yield "".join(
+                json.dumps(dict(zip(columns, map(_export_value, row)))) + "\n"
+                for row in batch
+            )
@@ -1,97 +1,120 @@
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Iterator, Type
 
+from fastapi import HTTPException
+from sqlalchemy import Column, and_, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import BinaryExpression, BooleanClauseList
 
-from app import services
+from app.core.tracing import traced
+from app.models import Car, Rental, Reservation
+from app.models.rental import RentalStatus
+from app.models.reservation import ReservationStatus
+from app.utils.datetime_utils import date_in_utc
 from app.utils.interval import Interval
 
+# SQLSTATE of exclusion constraint violation
+EXCLUSION_VIOLATION = "23P01"
 
-def is_car_available_in_dates(
-    db: Session,
-    car_id: int,
-    start_date: datetime,
-    end_date: datetime,
-    rental_id: int = None,
-    reservation_id: int = None,
-) -> bool:
+# first key of advisory locks taken on car's bookings
+CAR_BOOKINGS_LOCK = 1
+
+
+def car_available_in_dates_condition(
+    start_date: datetime, end_date: datetime
+) -> BooleanClauseList:
     """
-    Returns True if car with given dates is available, False otherwise
+    Returns SQLAlchemy condition matching cars that have no active rental
+    and no active reservation in given dates (anti-joins, evaluated in a single query)
     """
-    available = True
     timeframe = Interval(start_date, end_date)
 
-    if is_colliding_with_other_rentals(db, car_id, timeframe, rental_id):
-        available = False
+    return and_(
+        ~Car.rentals.any(
+            and_(
+                Rental.status == RentalStatus.IN_PROGRESS,
+                intersecting_condition(Rental.booked_dates, timeframe),
+            )
+        ),
+        ~Car.reservations.any(
+            and_(
+                Reservation.status == ReservationStatus.NEW,
+                intersecting_condition(Reservation.booked_dates, timeframe),
+            )
+        ),
+    )
 
-    if is_colliding_with_other_reservations(db, car_id, timeframe, reservation_id):
-        available = False
 
-    return available
+def intersecting_condition(
+    booked_dates: Column, timeframe: Interval
+) -> BinaryExpression:
+    """
+    SQL counterpart of Interval.is_intersecting,
+    intervals sharing a calendar day (in UTC) are intersecting as well
+    """
+    return booked_dates.overlaps(
+        func.daterange(date_in_utc(timeframe.start), date_in_utc(timeframe.end), "[]")
+    )
 
 
+@traced
 def is_colliding_with_other_rentals(
     db: Session, car_id: int, timeframe: Interval, rental_id: int = None
-):
+) -> bool:
     """
-    Returns True if car has other rentals in given timeframe
+    Returns True if car has other active rentals in given timeframe
     """
-    available = True
-
-    rentals_for_this_car = get_rentals_for_this_car(db, car_id, rental_id)
-    for other_rental in rentals_for_this_car:
-        other_rental_timeframe = Interval(
-            other_rental.start_date, other_rental.end_date
-        )
-        if timeframe.is_intersecting(other_rental_timeframe):
-            available = False
-            break
+    query = db.query(Rental.id).filter(
+        Rental.car_id == car_id,
+        Rental.status == RentalStatus.IN_PROGRESS,
+        intersecting_condition(Rental.booked_dates, timeframe),
+    )
+    if rental_id:
+        query = query.filter(Rental.id != rental_id)
 
-    return not available
+    return db.query(query.exists()).scalar()
 
 
+@traced
 def is_colliding_with_other_reservations(
     db: Session, car_id: int, timeframe: Interval, reservation_id: int = None
-):
+) -> bool:
     """
-    Returns True if car has other reservations in given timeframe
+    Returns True if car has other active reservations in given timeframe
     """
-    available = True
-
-    reservations_for_this_car = get_reservations_for_this_car(
-        db, car_id, reservation_id
+    query = db.query(Reservation.id).filter(
+        Reservation.car_id == car_id,
+        Reservation.status == ReservationStatus.NEW,
+        intersecting_condition(Reservation.booked_dates, timeframe),
     )
-    for other_reservation in reservations_for_this_car:
-        other_reservation_timeframe = Interval(
-            other_reservation.start_date, other_reservation.end_date
-        )
-        if timeframe.is_intersecting(other_reservation_timeframe):
-            available = False
-            break
+    if reservation_id:
+        query = query.filter(Reservation.id != reservation_id)
 
-    return not available
+    return db.query(query.exists()).scalar()
 
 
-def get_rentals_for_this_car(db: Session, car_id: int, rental_id: int = None):
+@traced
+def lock_car_bookings(db: Session, car_id: int) -> None:
     """
-    Returns list of rentals for given car_id, omits rental with rental_id if given
+    Serializes bookings of given car until the end of current transaction.
+    Exclusion constraints cover collisions within one table only,
+    this keeps checks between rentals and reservations correct under concurrent writers
     """
-    rentals_for_this_car = services.rental.get_active_by_car_id(db, car_id)
-    if rental_id:
-        rentals_for_this_car = [
-            rental for rental in rentals_for_this_car if rental.id != rental_id
-        ]
-    return rentals_for_this_car
+    db.execute(select([func.pg_advisory_xact_lock(CAR_BOOKINGS_LOCK, car_id)]))
 
 
-def get_reservations_for_this_car(db: Session, car_id: int, reservation_id: int = None):
+@contextmanager
+def raise_on_collision(db: Session, exception: Type[HTTPException]) -> Iterator[None]:
     """
-    Returns list of reservations for given car_id, omits reservation with reservation_id if given
+    Rolls back and raises given exception if the database rejected a booking
+    because of exclusion constraint on booked dates
     """
-    reservations_for_this_car = services.reservation.get_active_by_car_id(db, car_id)
-    if reservation_id:
-        reservations_for_this_car = [
-            reservation
-            for reservation in reservations_for_this_car
-            if reservation.id != reservation_id
-        ]
-    return reservations_for_this_car
+    try:
+        yield
+    except IntegrityError as e:
+        if getattr(e.orig, "pgcode", None) != EXCLUSION_VIOLATION:
+            raise
+        db.rollback()
+        raise exception()
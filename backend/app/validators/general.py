@@ -5,6 +5,7 @@ import pytz
 from sqlalchemy.orm import Session
 
 from app import services
+from app.core.tracing import traced
 from app.exceptions.instance_not_found import (
     CarNotFoundException,
     CustomerNotFoundException,
@@ -14,6 +15,7 @@ from app.exceptions.reservation import StartDateNotBeforeEndDateException
 from app.utils.datetime_utils import datetime_without_seconds
 
 
+@traced
 def validate_car_with_id_exists(db: Session, car_id: int) -> None:
     """
     Raises CarNotFoundException if car by given id doesn't exist
@@ -23,6 +25,7 @@ def validate_car_with_id_exists(db: Session, car_id: int) -> None:
         raise CarNotFoundException()
 
 
+@traced
 def validate_customer_with_id_exists(db: Session, customer_id: int) -> None:
     """
     Raises CustomerNotFoundException if customer by given id doesn't exist
@@ -32,6 +35,7 @@ def validate_customer_with_id_exists(db: Session, customer_id: int) -> None:
         raise CustomerNotFoundException()
 
 
+@traced
 def validate_reservation_with_id_exists(
     db: Session, reservation_id: Optional[int] = None
 ) -> None:
@@ -44,6 +48,7 @@ def validate_reservation_with_id_exists(
             raise ReservationNotFoundException()
 
 
+@traced
 def validate_start_date_before_end_date(
     start_date: datetime, end_date: datetime
 ) -> None:
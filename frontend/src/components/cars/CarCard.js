@@ -19,6 +19,7 @@ import AttachMoneyIcon from "@material-ui/icons/AttachMoney";
 import AcUnitIcon from "@material-ui/icons/AcUnit";
 import { Link } from "react-router-dom";
 import { APP_CARS_URL } from "../../config";
+import { getCarImageUrl } from "../../service/carsService";
 
 const EMPTY_IMG_BASE64 =
   "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII=";
@@ -50,7 +51,7 @@ const CarCard = ({ className, car, ...rest }) => {
         <Box display="flex" justifyContent="center" mb={3}>
           <Paper variant="outlined">
             <img
-              src={car.image_base64 || EMPTY_IMG_BASE64}
+              src={getCarImageUrl(car, "thumbnail") || EMPTY_IMG_BASE64}
               alt={car.model_name}
               width="500px"
               height="250px"
@@ -22,6 +22,7 @@ import {
   createCar,
   deleteCar,
   getCarById,
+  getCarImageUrl,
   updateCar,
 } from "../../service/carsService";
 import convertFileToBase64 from "../../utils/convertFileToBase64";
@@ -188,9 +189,9 @@ const CreateUpdateCarForm = ({ carId }) => {
                 className={classes.uploadImageBox}
               >
                 <Paper variant="outlined">
-                  {car.image_base64 && (
+                  {(car.image_base64 || car.image_hash) && (
                     <img
-                      src={emptyIfNull(car.image_base64)}
+                      src={car.image_base64 || getCarImageUrl(car, "preview")}
                       alt={car.model_name}
                       width="500px"
                       height="250px"
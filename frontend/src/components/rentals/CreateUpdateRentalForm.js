@@ -13,7 +13,7 @@ import clsx from "clsx";
 import { Link, useNavigate } from "react-router-dom";
 import PropTypes from "prop-types";
 import Loading from "../utils/Loading";
-import { getReservations } from "../../service/reservationsService";
+import { getAllReservations } from "../../service/reservationsService";
 
 import {
   APP_CARS_URL,
@@ -23,8 +23,8 @@ import {
 } from "../../config";
 import { DateTimePicker } from "@material-ui/pickers";
 import moment from "moment";
-import { getCars } from "../../service/carsService";
-import { getCustomers } from "../../service/customersService";
+import { getAllCars } from "../../service/carsService";
+import { getAllCustomers } from "../../service/customersService";
 import Select from "@material-ui/core/Select";
 import InputLabel from "@material-ui/core/InputLabel";
 import FormControl from "@material-ui/core/FormControl";
@@ -112,15 +112,15 @@ const CreateUpdateRentalForm = ({
   }, [isInEditMode, rentalId]);
 
   useEffect(() => {
-    getCars().then((cars) => {
+    getAllCars().then((cars) => {
       setAvailableCars(cars);
     });
 
-    getCustomers().then((customers) => {
+    getAllCustomers().then((customers) => {
       setAvailableCustomers(customers);
     });
 
-    getReservations().then((reservations) => {
+    getAllReservations().then((reservations) => {
       setAvailableReservations(reservations);
     });
   }, []);
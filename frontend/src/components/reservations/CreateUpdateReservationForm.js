@@ -29,8 +29,8 @@ import {
 } from "../../config";
 import { DateTimePicker } from "@material-ui/pickers";
 import moment from "moment";
-import { getCars } from "../../service/carsService";
-import { getCustomers } from "../../service/customersService";
+import { getAllCars } from "../../service/carsService";
+import { getAllCustomers } from "../../service/customersService";
 import Select from "@material-ui/core/Select";
 import InputLabel from "@material-ui/core/InputLabel";
 import FormControl from "@material-ui/core/FormControl";
@@ -101,11 +101,11 @@ const CreateUpdateReservationForm = ({ reservationId, carId }) => {
   }, [isInEditMode, reservationId]);
 
   useEffect(() => {
-    getCars().then((cars) => {
+    getAllCars().then((cars) => {
       setAvailableCars(cars);
     });
 
-    getCustomers().then((customers) => {
+    getAllCustomers().then((customers) => {
       setAvailableCustomers(customers);
     });
   }, []);
@@ -0,0 +1,23 @@
+import React from "react";
+import PropTypes from "prop-types";
+import { Box, Button } from "@material-ui/core";
+
+const LoadMoreButton = ({ hasNextPage, onClick }) => {
+  if (!hasNextPage) {
+    return null;
+  }
+  return (
+    <Box display="flex" justifyContent="center" mt={3}>
+      <Button variant="contained" onClick={onClick}>
+        Load more
+      </Button>
+    </Box>
+  );
+};
+
+LoadMoreButton.propTypes = {
+  hasNextPage: PropTypes.bool.isRequired,
+  onClick: PropTypes.func.isRequired,
+};
+
+export default LoadMoreButton;
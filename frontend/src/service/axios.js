@@ -1,5 +1,9 @@
 import axios from "axios";
 
+// Deadline (unix time) until which the API serves our reads from the primary
+// database, so that we see our own writes despite replication lag
+const READ_PRIMARY_UNTIL_HEADER = "X-Read-Primary-Until";
+
 const axiosService = () => {
   let instance = axios.create();
 
@@ -7,9 +11,24 @@ const axiosService = () => {
   instance.interceptors.request.use(function (config) {
     const token = localStorage.getItem("access_token");
     config.headers.Authorization = token ? `Bearer ${token}` : "";
+
+    const readPrimaryUntil = localStorage.getItem("read_primary_until");
+    if (readPrimaryUntil && readPrimaryUntil > Date.now() / 1000) {
+      config.headers[READ_PRIMARY_UNTIL_HEADER] = readPrimaryUntil;
+    }
     return config;
   });
 
+  // Remember the deadline returned after writes
+  instance.interceptors.response.use(function (response) {
+    const readPrimaryUntil =
+      response.headers[READ_PRIMARY_UNTIL_HEADER.toLowerCase()];
+    if (readPrimaryUntil) {
+      localStorage.setItem("read_primary_until", readPrimaryUntil);
+    }
+    return response;
+  });
+
   return instance;
 };
 
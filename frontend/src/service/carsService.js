@@ -1,6 +1,7 @@
 import axios from "./axios";
 import { CARS_URL } from "../config";
 import cleanupFalsyFields from "../utils/cleanupFalsyFields";
+import getAllPages from "../utils/getAllPages";
 
 const mapRangeCriterion = (range) => {
   return range[0] && range[1] ? { start: range[0], end: range[1] } : null;
@@ -29,8 +30,14 @@ const mapSearchQuery = (search_query) => {
   };
 };
 
-const getCars = async () => {
-  return await axios.get(`${CARS_URL}/`).then((response) => response.data);
+const getCars = async (after) => {
+  return await axios
+    .get(`${CARS_URL}/`, { params: after ? { after } : {} })
+    .then((response) => response.data);
+};
+
+const getAllCars = async () => {
+  return await getAllPages(`${CARS_URL}/`);
 };
 
 const getCarsWithSearchQuery = async (search_query) => {
@@ -57,6 +64,15 @@ const updateCar = async (car) => {
     .then((response) => response.data);
 };
 
+const getCarImageUrl = (car, variant) => {
+  // versioned with image hash, so that browsers can cache it forever
+  if (!car.image_hash) {
+    return null;
+  }
+  const url = `${CARS_URL}/${car.id}/image?v=${car.image_hash}`;
+  return variant ? `${url}&variant=${variant}` : url;
+};
+
 const deleteCar = async (carId) => {
   return await axios
     .delete(`${CARS_URL}/${carId}`)
@@ -65,9 +81,11 @@ const deleteCar = async (carId) => {
 
 export {
   getCars,
+  getAllCars,
   getCarById,
   updateCar,
   deleteCar,
   createCar,
   getCarsWithSearchQuery,
+  getCarImageUrl,
 };
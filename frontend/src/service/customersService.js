@@ -1,9 +1,16 @@
 import axios from "./axios";
 import { CUSTOMERS_URL } from "../config";
 import cleanupFalsyFields from "../utils/cleanupFalsyFields";
+import getAllPages from "../utils/getAllPages";
 
-const getCustomers = async () => {
-  return await axios.get(`${CUSTOMERS_URL}/`).then((response) => response.data);
+const getCustomers = async (after) => {
+  return await axios
+    .get(`${CUSTOMERS_URL}/`, { params: after ? { after } : {} })
+    .then((response) => response.data);
+};
+
+const getAllCustomers = async () => {
+  return await getAllPages(`${CUSTOMERS_URL}/`);
 };
 
 const getCustomerById = async (customerId) => {
@@ -32,6 +39,7 @@ const deleteCustomer = async (customerId) => {
 
 export {
   getCustomers,
+  getAllCustomers,
   getCustomerById,
   updateCustomer,
   deleteCustomer,
@@ -1,9 +1,22 @@
 import axios from "./axios";
 import { RENTALS_URL } from "../config";
 import cleanupFalsyFields from "../utils/cleanupFalsyFields";
+import getAllPages from "../utils/getAllPages";
 
-const getRentals = async () => {
-  return await axios.get(`${RENTALS_URL}/`).then((response) => response.data);
+const getRentals = async (after) => {
+  return await axios
+    .get(`${RENTALS_URL}/`, { params: after ? { after } : {} })
+    .then((response) => response.data);
+};
+
+const getAllRentals = async () => {
+  return await getAllPages(`${RENTALS_URL}/`);
+};
+
+const getActiveRentals = async () => {
+  return await axios
+    .get(`${RENTALS_URL}/active`)
+    .then((response) => response.data);
 };
 
 const getOvertimeRentals = async () => {
@@ -44,6 +57,8 @@ const deleteRental = async (rentalId) => {
 
 export {
   getRentals,
+  getAllRentals,
+  getActiveRentals,
   getRentalById,
   updateRental,
   deleteRental,
@@ -1,10 +1,21 @@
 import axios from "./axios";
 import { RESERVATIONS_URL } from "../config";
 import cleanupFalsyFields from "../utils/cleanupFalsyFields";
+import getAllPages from "../utils/getAllPages";
 
-const getReservations = async () => {
+const getReservations = async (after) => {
   return await axios
-    .get(`${RESERVATIONS_URL}/`)
+    .get(`${RESERVATIONS_URL}/`, { params: after ? { after } : {} })
+    .then((response) => response.data);
+};
+
+const getAllReservations = async () => {
+  return await getAllPages(`${RESERVATIONS_URL}/`);
+};
+
+const getActiveReservations = async () => {
+  return await axios
+    .get(`${RESERVATIONS_URL}/active`)
     .then((response) => response.data);
 };
 
@@ -43,6 +54,8 @@ const deleteReservation = async (reservationId) => {
 
 export {
   getReservations,
+  getAllReservations,
+  getActiveReservations,
   getReservationById,
   updateReservation,
   deleteReservation,
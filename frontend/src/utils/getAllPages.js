@@ -0,0 +1,18 @@
+import axios from "../service/axios";
+
+const getAllPages = async (url) => {
+  // list endpoints are paginated, follow next_cursor until the last page
+  let items = [];
+  let after = null;
+  do {
+    const params = after ? { after } : {};
+    const page = await axios
+      .get(url, { params })
+      .then((response) => response.data);
+    items = items.concat(page.items);
+    after = page.next_cursor;
+  } while (after);
+  return items;
+};
+
+export default getAllPages;
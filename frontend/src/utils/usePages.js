@@ -0,0 +1,39 @@
+import { useCallback, useEffect, useState } from "react";
+
+const usePages = (getPage) => {
+  // list views show the first page and follow next_cursor on demand
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+
+  const loadFirstPage = useCallback(() => {
+    getPage().then((page) => {
+      setItems(page.items);
+      setNextCursor(page.next_cursor);
+    });
+  }, [getPage]);
+
+  const loadNextPage = () => {
+    getPage(nextCursor).then((page) => {
+      setItems((_items) => _items.concat(page.items));
+      setNextCursor(page.next_cursor);
+    });
+  };
+
+  // items not fetched page by page (e.g. search results) have no next page
+  const showItems = (_items) => {
+    setItems(_items);
+    setNextCursor(null);
+  };
+
+  useEffect(loadFirstPage, [loadFirstPage]);
+
+  return {
+    items,
+    hasNextPage: nextCursor !== null && nextCursor !== undefined,
+    loadNextPage,
+    loadFirstPage,
+    showItems,
+  };
+};
+
+export default usePages;
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useState } from "react";
 import {
   Box,
   Button,
@@ -20,6 +20,8 @@ import { APP_CARS_URL } from "../../../config";
 import Slider from "@material-ui/core/Slider";
 import Typography from "@material-ui/core/Typography";
 import { DateTimePicker } from "@material-ui/pickers";
+import LoadMoreButton from "../../../components/utils/LoadMoreButton";
+import usePages from "../../../utils/usePages";
 
 const searchQueryInitialState = {
   model_name: "",
@@ -49,15 +51,15 @@ const useStyles = makeStyles((theme) => ({
 const CarsList = () => {
   const classes = useStyles();
   const navigate = useNavigate();
-  const [cars, setCars] = useState([]);
+  const {
+    items: cars,
+    hasNextPage,
+    loadNextPage,
+    loadFirstPage,
+    showItems,
+  } = usePages(getCars);
   const [searchQuery, setSearchQuery] = useState(searchQueryInitialState);
 
-  useEffect(() => {
-    getCars().then((_cars) => {
-      setCars(_cars);
-    });
-  }, []);
-
   const handleAddCar = () => {
     navigate(`${APP_CARS_URL}/new`);
   };
@@ -91,14 +93,12 @@ const CarsList = () => {
 
   const handleResetFilter = () => {
     setSearchQuery(searchQueryInitialState);
-    getCars().then((_cars) => {
-      setCars(_cars);
-    });
+    loadFirstPage();
   };
 
   const handleFilter = () => {
     getCarsWithSearchQuery(searchQuery).then((_cars) => {
-      setCars(_cars);
+      showItems(_cars);
     });
   };
 
@@ -288,6 +288,7 @@ const CarsList = () => {
           ))}
         </Grid>
       </Box>
+      <LoadMoreButton hasNextPage={hasNextPage} onClick={loadNextPage} />
     </Container>
   );
 };
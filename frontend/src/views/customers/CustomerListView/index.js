@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useState } from "react";
 import {
   Box,
   Button,
@@ -15,6 +15,8 @@ import SearchIcon from "@material-ui/icons/Search";
 import { getCustomers } from "../../../service/customersService";
 import { useNavigate } from "react-router";
 import { APP_CUSTOMERS_URL } from "../../../config";
+import LoadMoreButton from "../../../components/utils/LoadMoreButton";
+import usePages from "../../../utils/usePages";
 
 const useStyles = makeStyles((theme) => ({
   root: {
@@ -28,15 +30,12 @@ const useStyles = makeStyles((theme) => ({
 const CustomersListView = () => {
   const classes = useStyles();
   const navigate = useNavigate();
-  const [customers, setCustomers] = useState([]);
+  // search filters customers of the pages loaded so far
+  const { items: customers, hasNextPage, loadNextPage } = usePages(
+    getCustomers
+  );
   const [searchPhrase, setSearchPhrase] = useState("");
 
-  useEffect(() => {
-    getCustomers().then((_customers) => {
-      setCustomers(_customers);
-    });
-  }, []);
-
   const handleAddCustomer = () => {
     navigate(`${APP_CUSTOMERS_URL}/new`);
   };
@@ -81,6 +80,7 @@ const CustomersListView = () => {
       <Box mt={3}>
         <CustomersList customers={filterCustomersBasedOnSearchPhrase()} />
       </Box>
+      <LoadMoreButton hasNextPage={hasNextPage} onClick={loadNextPage} />
     </Container>
   );
 };
@@ -12,7 +12,7 @@ import {
 import ArrowRightIcon from "@material-ui/icons/ArrowRight";
 import { Link } from "react-router-dom";
 import { APP_RENTALS_URL } from "../../../config";
-import { getRentals } from "../../../service/rentalsService";
+import { getActiveRentals } from "../../../service/rentalsService";
 import RentalsList from "../../../components/rentals/RentalsList";
 
 const useStyles = makeStyles(() => ({
@@ -32,17 +32,13 @@ const sortRentalsByDate = (rentals) => {
   });
 };
 
-const filterActiveRentals = (_rentals) => {
-  return _rentals.filter((rental) => rental.status !== "COMPLETED");
-};
-
 const ActiveRentalsListView = ({ className, ...rest }) => {
   const classes = useStyles();
   const [rentals, setRentals] = useState([]);
 
   useEffect(() => {
-    getRentals().then((_rentals) => {
-      setRentals(filterActiveRentals(_rentals));
+    getActiveRentals().then((_rentals) => {
+      setRentals(_rentals);
     });
   }, []);
 
@@ -1,9 +1,11 @@
-import React, { useEffect, useState } from "react";
+import React from "react";
 import { Box, Button, Container, makeStyles } from "@material-ui/core";
 import { useNavigate } from "react-router";
 import { APP_RENTALS_URL } from "../../../config";
 import { getRentals } from "../../../service/rentalsService";
 import RentalsList from "../../../components/rentals/RentalsList";
+import LoadMoreButton from "../../../components/utils/LoadMoreButton";
+import usePages from "../../../utils/usePages";
 
 const useStyles = makeStyles((theme) => ({
   root: {
@@ -17,13 +19,7 @@ const useStyles = makeStyles((theme) => ({
 const RentalsListView = () => {
   const classes = useStyles();
   const navigate = useNavigate();
-  const [rentals, setRentals] = useState([]);
-
-  useEffect(() => {
-    getRentals().then((_rentals) => {
-      setRentals(_rentals);
-    });
-  }, []);
+  const { items: rentals, hasNextPage, loadNextPage } = usePages(getRentals);
 
   const handleAddRental = () => {
     navigate(`${APP_RENTALS_URL}/new`);
@@ -39,6 +35,7 @@ const RentalsListView = () => {
       <Box mt={3}>
         <RentalsList rentals={rentals} />
       </Box>
+      <LoadMoreButton hasNextPage={hasNextPage} onClick={loadNextPage} />
     </Container>
   );
 };
@@ -10,7 +10,7 @@ import {
   makeStyles,
 } from "@material-ui/core";
 import ArrowRightIcon from "@material-ui/icons/ArrowRight";
-import { getReservations } from "../../../service/reservationsService";
+import { getActiveReservations } from "../../../service/reservationsService";
 import ReservationsList from "../../../components/reservations/ReservationsList";
 import { Link } from "react-router-dom";
 import { APP_RESERVATIONS_URL } from "../../../config";
@@ -29,17 +29,13 @@ const sortReservationsByDate = (reservations) => {
   });
 };
 
-const filterActiveReservations = (_reservations) => {
-  return _reservations.filter((reservation) => reservation.status === "NEW");
-};
-
 const NewestReservationsListView = ({ className, ...rest }) => {
   const classes = useStyles();
   const [reservations, setReservations] = useState([]);
 
   useEffect(() => {
-    getReservations().then((_reservations) => {
-      setReservations(filterActiveReservations(_reservations));
+    getActiveReservations().then((_reservations) => {
+      setReservations(_reservations);
     });
   }, []);
 
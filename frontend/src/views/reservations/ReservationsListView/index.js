@@ -1,9 +1,11 @@
-import React, { useEffect, useState } from "react";
+import React from "react";
 import { Box, Button, Container, makeStyles } from "@material-ui/core";
 import { useNavigate } from "react-router";
 import { getReservations } from "../../../service/reservationsService";
 import ReservationsList from "../../../components/reservations/ReservationsList";
 import { APP_RESERVATIONS_URL } from "../../../config";
+import LoadMoreButton from "../../../components/utils/LoadMoreButton";
+import usePages from "../../../utils/usePages";
 
 const useStyles = makeStyles((theme) => ({
   root: {
@@ -17,13 +19,9 @@ const useStyles = makeStyles((theme) => ({
 const ReservationsListView = () => {
   const classes = useStyles();
   const navigate = useNavigate();
-  const [reservations, setReservations] = useState([]);
-
-  useEffect(() => {
-    getReservations().then((_reservations) => {
-      setReservations(_reservations);
-    });
-  }, []);
+  const { items: reservations, hasNextPage, loadNextPage } = usePages(
+    getReservations
+  );
 
   const handleAddReservation = () => {
     navigate(`${APP_RESERVATIONS_URL}/new`);
@@ -43,6 +41,7 @@ const ReservationsListView = () => {
       <Box mt={3}>
         <ReservationsList reservations={reservations} />
       </Box>
+      <LoadMoreButton hasNextPage={hasNextPage} onClick={loadNextPage} />
     </Container>
   );
 };